@@ -1,11 +1,13 @@
 import click
 from loguru import logger
+import copy
 import json
+import time
 from mcp.server.fastmcp import FastMCP
 from typing import Optional
 
 try:
-    from transformers import AutoTokenizer, AutoModelForCausalLM, LlamaForCausalLM, PreTrainedTokenizer
+    from transformers import AutoTokenizer, AutoModelForCausalLM, LlamaConfig, LlamaForCausalLM, PreTrainedTokenizer
     from peft import PeftModel
     from trl import apply_chat_template
     import torch
@@ -18,6 +20,16 @@ except (ImportError, ModuleNotFoundError) as e:
     )
 
 from charge.servers.server_utils import update_mcp_network, get_hostname
+from charge.servers.batching import MicroBatcher
+
+# Beam search settings shared by every generate call
+NUM_BEAMS = 3
+MAX_NEW_TOKENS = 2048
+
+DEVICES = ("auto", "cpu", "cuda")
+# Weight formats of the CPU execution path: bf16 weights, int8 dynamically
+# quantized linear layers (float32 elsewhere), or plain float32
+CPU_DTYPES = ("bf16", "int8", "fp32")
 
 def format_rxn_prompt(data: dict, forward: bool) -> dict:
     required_keys = ['reactants', 'products', 'agents', 'solvents', 'catalysts', 'atmospheres']
@@ -32,35 +44,230 @@ def format_rxn_prompt(data: dict, forward: bool) -> dict:
     return data
 
 
-def predict_reaction_internal(molecules: list[str], retrosynthesis: bool) -> list[str]:
-    if not HAS_FLASKV2:
-        raise ImportError(
-            "Please install the [flask] optional packages to use this module."
-        )
-    model = retro_model if retrosynthesis else fwd_model
+def build_prompt(molecules: list[str], retrosynthesis: bool) -> str:
+    """Chat-templated model prompt for a forward or retrosynthesis prediction."""
     data = {'products': molecules} if retrosynthesis else {'reactants': molecules}
+    prompt = format_rxn_prompt(data, forward=(not retrosynthesis))
+    return apply_chat_template(prompt, tokenizer=tokenizer)["prompt"]
+
+
+def generate_batch(model, prompts: list[str]) -> list[list[str]]:
+    """
+    Run one beam-search generate call for a batch of prompts.
+
+    The prompts are left-padded to the longest one, so every generated
+    sequence starts at the same position, and the NUM_BEAMS returned
+    sequences of each prompt are consecutive rows of the output.
+
+    Args:
+        model: The forward or retrosynthesis model.
+        prompts (list[str]): Chat-templated prompts, see build_prompt.
+    Returns:
+        list[list[str]]: The NUM_BEAMS decoded predictions of each prompt.
+    """
     with torch.inference_mode():
-        prompt = format_rxn_prompt(data, forward=(not retrosynthesis))
-        prompt = apply_chat_template(prompt, tokenizer=tokenizer)
-        inputs = tokenizer(prompt["prompt"], return_tensors="pt", padding="longest").to('cuda')
+        inputs = tokenizer(prompts, return_tensors="pt", padding="longest").to(model.device)
         prompt_length = inputs["input_ids"].size(1)
         outputs = model.generate(
             **inputs,
-            max_new_tokens=2048,
-            num_return_sequences=3,
+            max_new_tokens=MAX_NEW_TOKENS,
+            num_return_sequences=NUM_BEAMS,
             # do_sample=True,
-            num_beams=3,
+            num_beams=NUM_BEAMS,
             pad_token_id=tokenizer.pad_token_id,
             eos_token_id=tokenizer.eos_token_id,
             use_cache=True,  # enable KV cache
         )
-        processed_outputs = [tokenizer.decode(out[prompt_length:], skip_special_tokens=True) for out in outputs]
-    logger.debug(f'Model input: {prompt["prompt"]}')
+    decoded = tokenizer.batch_decode(outputs[:, prompt_length:], skip_special_tokens=True)
+    return [decoded[i:i + NUM_BEAMS] for i in range(0, len(decoded), NUM_BEAMS)]
+
+
+def _generate(direction: str, prompts: list[str]) -> list[list[str]]:
+    model = retro_model if direction == "retro" else fwd_model
+    logger.debug(f'Generating {direction} predictions for a batch of {len(prompts)} prompts')
+    return generate_batch(model, prompts)
+
+
+# Concurrent requests to a model are batched into one generate call. The
+# batch size and wait are set from the command line, see main.
+FLASK_BATCHER = MicroBatcher(_generate, max_batch_size=8, max_wait=0.02)
+
+
+def _check_flask():
+    if not HAS_FLASKV2:
+        raise ImportError(
+            "Please install the [flask] optional packages to use this module."
+        )
+
+
+def predict_reaction_internal(molecules: list[str], retrosynthesis: bool) -> list[str]:
+    _check_flask()
+    model = retro_model if retrosynthesis else fwd_model
+    prompt = build_prompt(molecules, retrosynthesis)
+    processed_outputs = generate_batch(model, [prompt])[0]
+    logger.debug(f'Model input: {prompt}')
+    processed_outs = "\n".join(processed_outputs)
+    logger.debug(f'Model output: {processed_outs}')
+    return processed_outputs
+
+
+async def predict_reaction_batched(molecules: list[str], retrosynthesis: bool) -> list[str]:
+    """
+    Same as predict_reaction_internal, but the request waits (at most the
+    batcher's max_wait) for concurrent requests to the same model and is
+    generated together with them in one left-padded batch.
+    """
+    _check_flask()
+    prompt = build_prompt(molecules, retrosynthesis)
+    processed_outputs = await FLASK_BATCHER.submit("retro" if retrosynthesis else "fwd", prompt)
+    logger.debug(f'Model input: {prompt}')
     processed_outs = "\n".join(processed_outputs)
     logger.debug(f'Model output: {processed_outs}')
     return processed_outputs
 
 
+def resolve_device(device: str) -> str:
+    """Map "auto" to cuda if a GPU is available, else cpu."""
+    if device == "auto":
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    if device == "cuda" and not torch.cuda.is_available():
+        raise ValueError("--device cuda was requested but no GPU is available")
+    return device
+
+
+def prepare_cpu_model(model, cpu_dtype: str = "bf16"):
+    """
+    Convert a model for CPU inference.
+
+    Args:
+        model: A causal language model.
+        cpu_dtype (str): "bf16" casts the weights to bfloat16, "int8" applies
+            dynamic int8 quantization to the linear layers (weights stored as
+            int8, activations quantized on the fly) and "fp32" keeps float32.
+    Returns:
+        The converted model on the CPU, in eval mode.
+    """
+    if cpu_dtype not in CPU_DTYPES:
+        raise ValueError(f"Invalid CPU dtype '{cpu_dtype}'. Must be one of {CPU_DTYPES}.")
+    model = model.to("cpu")
+    if cpu_dtype == "bf16":
+        model = model.to(torch.bfloat16)
+    else:
+        model = model.float()
+        if cpu_dtype == "int8":
+            model = torch.ao.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+    return model.eval()
+
+
+def load_model(model_dir: str, adapter_weights: Optional[str], device: str, cpu_dtype: str = "bf16"):
+    """
+    Load a FLASKv2 model (merging its LoRA adapter, if any) for inference.
+
+    Args:
+        model_dir (str): Path to the model checkpoint.
+        adapter_weights (str, optional): LoRA adapter weights.
+        device (str): "cuda" or "cpu", see resolve_device.
+        cpu_dtype (str): Weight format on the CPU, see prepare_cpu_model.
+    Returns:
+        The model, in eval mode with the KV cache enabled.
+    """
+    if device == "cuda":
+        model = AutoModelForCausalLM.from_pretrained(
+            model_dir,
+            device_map='cuda',
+            torch_dtype=torch.bfloat16,
+        )
+    else:
+        # Quantization needs float32 weights
+        model = AutoModelForCausalLM.from_pretrained(
+            model_dir,
+            torch_dtype=torch.bfloat16 if cpu_dtype == "bf16" else torch.float32,
+        )
+    if adapter_weights is not None:
+        model = PeftModel.from_pretrained(model, adapter_weights)
+        model = model.merge_and_unload()
+    if device == "cpu":
+        model = prepare_cpu_model(model, cpu_dtype)
+
+    # Enable model optimizations
+    model.eval()
+    if hasattr(model, "config") and hasattr(model.config, "use_cache"):
+        model.config.use_cache = True  # enable KV caching
+    return model
+
+
+def tiny_llama(vocab_size: int = 1024, hidden_size: int = 128, num_layers: int = 2):
+    """A small randomly initialized Llama model (the FLASKv2 architecture) for benchmarks."""
+    config = LlamaConfig(
+        vocab_size=vocab_size,
+        hidden_size=hidden_size,
+        intermediate_size=4 * hidden_size,
+        num_hidden_layers=num_layers,
+        num_attention_heads=4,
+        num_key_value_heads=4,
+        max_position_embeddings=4096,
+    )
+    return LlamaForCausalLM(config).eval()
+
+
+def benchmark_generate(
+    model,
+    batch_size: int = 4,
+    prompt_length: int = 64,
+    new_tokens: int = 64,
+    num_beams: int = NUM_BEAMS,
+    repeats: int = 3,
+) -> dict:
+    """
+    Measure the generation throughput of a model on random prompts.
+
+    Every sequence generates exactly new_tokens tokens, so runs are comparable
+    across models and weight formats.
+
+    Args:
+        model: A causal language model.
+        batch_size (int): Number of prompts per generate call.
+        prompt_length (int): Number of prompt tokens.
+        new_tokens (int): Number of generated tokens per sequence.
+        num_beams (int): Number of beams.
+        repeats (int): Number of timed generate calls (after one warm-up call).
+    Returns:
+        dict: Generated tokens (per returned sequence), elapsed seconds and
+            tokens per second.
+    """
+    generator = torch.Generator().manual_seed(0)
+    input_ids = torch.randint(
+        3, model.config.vocab_size, (batch_size, prompt_length), generator=generator
+    ).to(model.device)
+
+    def generate():
+        with torch.inference_mode():
+            model.generate(
+                input_ids=input_ids,
+                attention_mask=torch.ones_like(input_ids),
+                min_new_tokens=new_tokens,
+                max_new_tokens=new_tokens,
+                num_beams=num_beams,
+                do_sample=False,
+                pad_token_id=0,
+                use_cache=True,
+            )
+
+    generate()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        generate()
+    elapsed = time.perf_counter() - start
+    tokens = batch_size * new_tokens * repeats
+    return {
+        "tokens": tokens,
+        "seconds": elapsed,
+        "tokens_per_second": tokens / elapsed if elapsed > 0 else 0.0,
+    }
+
+
 @click.command()
 @click.option("--model-dir-fwd", envvar="FLASKV2_MODEL_FWD", help="Path to flaskv2 model")
 @click.option("--model-dir-retro", envvar="FLASKV2_MODEL_RETRO", help="Path to flaskv2 model for retrosynthesis")
@@ -69,13 +276,27 @@ def predict_reaction_internal(molecules: list[str], retrosynthesis: bool) -> lis
 @click.option("--transport", type=click.Choice(['stdio', 'streamable-http', 'sse']), help="MCP transport type", default="sse")
 @click.option("--port", type=int, default=8125, help="Port to run the server on")
 @click.option("--host", type=str, default=None, help="Host to run the server on")
-def main(model_dir_fwd: str, model_dir_retro: str, adapter_weights_fwd: str, adapter_weights_retro: str, transport: str, port: str, host: Optional[str]):
-    if not HAS_FLASKV2:
-        raise ImportError(
-            "Please install the [flask] optional packages to use this module."
-        )
+@click.option("--max-batch-size", type=int, default=8, help="Maximum number of concurrent requests to a model generated as one batch")
+@click.option("--max-wait-ms", type=float, default=20.0, help="Maximum time a request waits for other requests to fill its batch")
+@click.option("--device", type=click.Choice(DEVICES), default="auto", help="Device to run the models on (auto: cuda if available)")
+@click.option("--cpu-dtype", type=click.Choice(CPU_DTYPES), default="bf16", help="Weight format on the CPU: bf16, int8 (dynamically quantized linear layers) or fp32")
+@click.option("--num-threads", type=int, default=None, help="Number of CPU threads used by torch (default: torch default)")
+@click.option("--cpu-model-dir-fwd", envvar="FLASKV2_CPU_MODEL_FWD", help="Smaller (distilled) forward model used instead of --model-dir-fwd on the CPU")
+@click.option("--cpu-model-dir-retro", envvar="FLASKV2_CPU_MODEL_RETRO", help="Smaller (distilled) retrosynthesis model used instead of --model-dir-retro on the CPU")
+def main(model_dir_fwd: str, model_dir_retro: str, adapter_weights_fwd: str, adapter_weights_retro: str, transport: str, port: str, host: Optional[str], max_batch_size: int, max_wait_ms: float, device: str, cpu_dtype: str, num_threads: Optional[int], cpu_model_dir_fwd: Optional[str], cpu_model_dir_retro: Optional[str]):
+    _check_flask()
+    device = resolve_device(device)
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    if device == "cpu":
+        # Adapters belong to the full models, distilled checkpoints are used as is
+        if cpu_model_dir_fwd:
+            model_dir_fwd, adapter_weights_fwd = cpu_model_dir_fwd, None
+        if cpu_model_dir_retro:
+            model_dir_retro, adapter_weights_retro = cpu_model_dir_retro, None
     if not model_dir_fwd and not model_dir_retro:
         raise ValueError("At least one model has to be given to the MCP server")
+    logger.info(f"Running FLASKv2 models on {device}" + (f" ({cpu_dtype})" if device == "cpu" else ""))
 
     if host is None:
         _, host = get_hostname()
@@ -97,33 +318,12 @@ def main(model_dir_fwd: str, model_dir_retro: str, adapter_weights_fwd: str, ada
     tokenizer = AutoTokenizer.from_pretrained(model_dir_fwd or model_dir_retro, padding_side="left")
     tokenizer.add_special_tokens({"pad_token": "<|finetune_right_pad_id|>"})
     if model_dir_fwd:
-        fwd_model = AutoModelForCausalLM.from_pretrained(
-            model_dir_fwd,
-            device_map='cuda',
-            torch_dtype=torch.bfloat16,
-        )
-        if adapter_weights_fwd is not None:
-            fwd_model = PeftModel.from_pretrained(fwd_model, adapter_weights_fwd)
-            fwd_model = fwd_model.merge_and_unload()
+        fwd_model = load_model(model_dir_fwd, adapter_weights_fwd, device, cpu_dtype)
     if model_dir_retro:
-        retro_model = AutoModelForCausalLM.from_pretrained(
-            model_dir_retro,
-            device_map='cuda',
-            torch_dtype=torch.bfloat16,
-        )
-        if adapter_weights_retro is not None:
-            retro_model = PeftModel.from_pretrained(retro_model, adapter_weights_retro)
-            retro_model = retro_model.merge_and_unload()
+        retro_model = load_model(model_dir_retro, adapter_weights_retro, device, cpu_dtype)
 
-    # Enable model optimizations
-    if fwd_model is not None:
-        fwd_model.eval()
-        if hasattr(fwd_model, "config") and hasattr(fwd_model.config, "use_cache"):
-            fwd_model.config.use_cache = True  # enable KV caching
-    if retro_model is not None:
-        retro_model.eval()
-        if hasattr(retro_model, "config") and hasattr(retro_model.config, "use_cache"):
-            retro_model.config.use_cache = True  # enable KV caching
+    FLASK_BATCHER.max_batch_size = max_batch_size
+    FLASK_BATCHER.max_wait = max_wait_ms / 1000.0
 
     # Dynamic tool creation based on input models
     available_tools = []
@@ -131,7 +331,7 @@ def main(model_dir_fwd: str, model_dir_retro: str, adapter_weights_fwd: str, ada
         available_tools.append("Forward Prediction")
 
         @mcp.tool()
-        def predict_reaction_products(reactants: list[str]) -> list[str]:
+        async def predict_reaction_products(reactants: list[str]) -> list[str]:
             """
             Given a set of reactant molecules, predict the likely product molecule(s).
 
@@ -141,13 +341,13 @@ def main(model_dir_fwd: str, model_dir_retro: str, adapter_weights_fwd: str, ada
                 list[str]: a list of predictions, each of which is a json string listing the predicted product molecule(s) in SMILES.
             """
             logger.debug('Calling `predict_reaction_products`')
-            return predict_reaction_internal(reactants, False)
+            return await predict_reaction_batched(reactants, False)
 
     if retro_model is not None:
         available_tools.append("Single-Step Retrosynthesis")
 
         @mcp.tool()
-        def predict_reaction_reactants(products: list[str]) -> list[str]:
+        async def predict_reaction_reactants(products: list[str]) -> list[str]:
             """
             Given a product molecule, predict the likely reactants and other chemical species (e.g., agents, solvents).
 
@@ -158,7 +358,7 @@ def main(model_dir_fwd: str, model_dir_retro: str, adapter_weights_fwd: str, ada
                     as well as potential (re)agents and solvents used in the reaction.
             """
             logger.debug('Calling `predict_reaction_reactants`')
-            return predict_reaction_internal(products, True)
+            return await predict_reaction_batched(products, True)
 
     logger.info(f"Available tools: {', '.join(available_tools)}")
 
@@ -166,5 +366,35 @@ def main(model_dir_fwd: str, model_dir_retro: str, adapter_weights_fwd: str, ada
     mcp.run(transport=transport)
 
 
+@click.command()
+@click.option("--model-dir", default=None, help="Model to benchmark (default: a tiny random Llama model)")
+@click.option("--cpu-dtype", "cpu_dtypes", multiple=True, type=click.Choice(CPU_DTYPES), help="Weight format to benchmark (default: all)")
+@click.option("--num-threads", type=int, default=None, help="Number of CPU threads used by torch")
+@click.option("--batch-size", type=int, default=4, help="Number of prompts per generate call")
+@click.option("--prompt-length", type=int, default=64, help="Number of prompt tokens")
+@click.option("--new-tokens", type=int, default=64, help="Number of generated tokens per sequence")
+@click.option("--num-beams", type=int, default=NUM_BEAMS, help="Number of beams")
+def benchmark(model_dir: Optional[str], cpu_dtypes: tuple, num_threads: Optional[int], batch_size: int, prompt_length: int, new_tokens: int, num_beams: int):
+    """
+    Report the CPU generation throughput (tokens/second) of a FLASKv2 model,
+    or of a tiny model of the same architecture, for each weight format.
+    """
+    _check_flask()
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    torch.manual_seed(0)
+    reference = None if model_dir else tiny_llama()
+    for cpu_dtype in cpu_dtypes or CPU_DTYPES:
+        if reference is None:
+            model = load_model(model_dir, None, "cpu", cpu_dtype)
+        else:
+            model = prepare_cpu_model(copy.deepcopy(reference), cpu_dtype)
+        result = benchmark_generate(model, batch_size, prompt_length, new_tokens, num_beams)
+        click.echo(
+            f"{cpu_dtype}\t{result['tokens_per_second']:.1f} tokens/s "
+            f"({result['tokens']} tokens in {result['seconds']:.2f} s, {torch.get_num_threads()} threads)"
+        )
+
+
 if __name__ == "__main__":
     main()
@@ -20,11 +20,25 @@ except (ImportError, ModuleNotFoundError) as e:
     )
 
 from charge.servers.server_utils import add_server_arguments
+from charge.servers.server_logging import configure_server_logging
 import argparse
 
 parser = argparse.ArgumentParser()
 add_server_arguments(parser)
+parser.add_argument(
+    "--max-products",
+    type=int,
+    default=None,
+    help="Maximum number of reaction outcomes enumerated by verify_reaction",
+)
+parser.add_argument(
+    "--reaction-timeout",
+    type=float,
+    default=None,
+    help="Wall-clock budget in seconds per verify_reaction call (0 disables)",
+)
 args = parser.parse_args()
+configure_server_logging(args.log_mode, args.log_sample_every, args.log_enqueue)
 
 SMARTS_mcp = FastMCP(
     "[RDKit-SMARTS] Chemistry and reaction verification MCP Server",
@@ -37,8 +51,12 @@ logger.info("[RDKit-SMARTS] Starting Chemistry and reaction verification MCP Ser
 import charge.servers.SMARTS_reactions_utils as smarts
 import charge.servers.SMILES_utils as smiles
 
+smarts.set_reaction_limits(args.max_products, args.reaction_timeout)
+
 SMARTS_mcp.tool()(smarts.verify_reaction_SMARTS)
 
 SMARTS_mcp.tool()(smiles.verify_smiles)
 
 SMARTS_mcp.tool()(smarts.verify_reaction)
+
+SMARTS_mcp.tool()(smarts.verify_reactions_batch)
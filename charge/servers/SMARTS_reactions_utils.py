@@ -18,7 +18,122 @@ except (ImportError, ModuleNotFoundError) as e:
         "Install it with: pip install charge[rdkit]",
     )
 
-from typing import Tuple
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional, Tuple
+import multiprocessing
+import os
+import threading
+import time
+from charge.servers.cache_utils import LRUCache, get_mol
+from charge.servers.server_logging import log_call
+
+
+@dataclass
+class CompiledReaction:
+    """
+    A reaction SMARTS parsed once, together with its validation outcome.
+
+    Attributes:
+        reaction: The initialized ChemicalReaction as parsed from the SMARTS
+            (not sanitized), or None if the SMARTS could not be parsed.
+        valid (bool): Whether the SMARTS passed verify_reaction_SMARTS.
+        message (str): The verify_reaction_SMARTS message.
+        parse_error (str, optional): The exception raised while parsing, if any.
+    """
+
+    reaction: Any
+    valid: bool
+    message: str
+    parse_error: Optional[str] = None
+
+
+# Compiled reactions keyed by SMARTS string, shared by all verification tools.
+REACTION_CACHE = LRUCache(maxsize=int(os.getenv("CHARGE_REACTION_CACHE_SIZE", "1024")))
+
+# Batches of at least this many reactions are split over several worker processes.
+BATCH_PARALLEL_THRESHOLD = 64
+BATCH_WORKERS = int(os.getenv("CHARGE_REACTION_WORKERS", "0")) or None
+
+# Limits for verify_reaction: maximum number of RunReactants outcomes, and
+# wall-clock budget in seconds per reaction (0 disables it, and reactions are
+# then run in this process except in parallel batches).
+MAX_PRODUCTS = int(os.getenv("CHARGE_REACTION_MAX_PRODUCTS", "1000"))
+REACTION_TIMEOUT = float(os.getenv("CHARGE_REACTION_TIMEOUT", "10"))
+
+
+def _compile_reaction(smarts: str) -> CompiledReaction:
+    try:
+        rxn = AllChem.ReactionFromSmarts(smarts)
+    except Exception as e:
+        return CompiledReaction(
+            None, False, f"Invalid Syntax for SMARTS string. The error is: {e}", str(e)
+        )
+    if not rxn:
+        return CompiledReaction(None, False, "Invalid reaction SMARTS.")
+    try:
+        # Initialize up front so the shared reaction is never lazily
+        # initialized by concurrent RunReactants calls.
+        rxn.Initialize()
+    except Exception:
+        pass
+    try:
+        # Sanitization modifies the templates, so validate a copy and keep
+        # the reaction as written for RunReactants.
+        checked = rdChemReactions.ChemicalReaction(rxn)
+        checked.Initialize()
+        if not checked.IsInitialized():
+            return CompiledReaction(rxn, False, "Reaction SMARTS could not be initialized.")
+        rdChemReactions.SanitizeRxn(checked)
+        if not rdChemReactions.ReactionToSmarts(checked):
+            return CompiledReaction(rxn, False, "Sanitized SMARTS is empty.")
+        return CompiledReaction(rxn, True, "SMARTS is valid.")
+    except Exception as e:
+        return CompiledReaction(
+            rxn, False, f"Invalid Syntax for SMARTS string. The error is: {e}"
+        )
+
+
+def get_compiled_reaction(smarts: str) -> CompiledReaction:
+    """
+    Return the compiled reaction and validation outcome for a SMARTS string,
+    reusing previous results from the process-wide reaction cache.
+
+    The returned reaction is shared between callers and must not be modified.
+
+    Args:
+        smarts (str): The reaction SMARTS string.
+    Returns:
+        CompiledReaction: The parsed reaction and its validation outcome.
+    """
+    if not HAS_SMARTS:
+        raise ImportError("Please install the rdkit support packages to use this module.")
+    return REACTION_CACHE.get_or_compute(smarts, lambda: _compile_reaction(smarts))
+
+
+def reaction_cache_stats() -> dict:
+    """
+    Return the size and hit/miss/eviction counters of the compiled reaction
+    cache, the run/timeout/restart counters of the verify_reaction worker
+    process under "worker", and the summed counters of the parallel batch
+    workers under "batch_workers". Reactions are parsed in this process, so the
+    cache counters cover every verification tool.
+
+    Returns:
+        dict: Cache statistics.
+    """
+    with _BATCH_REACTION_WORKERS_LOCK:
+        batch_workers = list(_BATCH_REACTION_WORKERS)
+    batch_stats = {"runs": 0, "timeouts": 0, "restarts": 0}
+    for worker in batch_workers:
+        for key, value in worker.stats().items():
+            batch_stats[key] += value
+    return {
+        **REACTION_CACHE.stats(),
+        "worker": _REACTION_WORKER.stats(),
+        "batch_workers": batch_stats,
+    }
+
 
 def verify_reaction_SMARTS(smarts: str) -> Tuple[bool, str]:
     """
@@ -35,29 +150,150 @@ def verify_reaction_SMARTS(smarts: str) -> Tuple[bool, str]:
     """
     if not HAS_SMARTS:
         raise ImportError("Please install the rdkit support packages to use this module.")
-    try:
-        logger.info(f"Verifying SMARTS: {smarts}")
-        rxn = AllChem.ReactionFromSmarts(smarts)
+    compiled = get_compiled_reaction(smarts)
+    if not compiled.valid:
+        logger.error("Invalid SMARTS {}: {}", smarts, compiled.message)
+        return False, compiled.message
+    log_call("verify_reaction_SMARTS", "SMARTS {} is valid.", smarts)
+    return True, compiled.message
+
+def set_reaction_limits(
+    max_products: Optional[int] = None, timeout: Optional[float] = None
+) -> None:
+    """
+    Set the limits applied by verify_reaction.
+
+    Args:
+        max_products (int, optional): Maximum number of reaction outcomes
+            enumerated by RunReactants.
+        timeout (float, optional): Wall-clock budget per reaction in seconds,
+            also applied to each reaction of verify_reactions_batch. The
+            reaction is run in a separate worker process that is killed when
+            the budget is exceeded. 0 runs it in the calling process instead.
+    """
+    global MAX_PRODUCTS, REACTION_TIMEOUT
+    if max_products is not None:
+        if max_products < 1:
+            raise ValueError("max_products must be at least 1")
+        MAX_PRODUCTS = max_products
+    if timeout is not None:
+        if timeout < 0:
+            raise ValueError("timeout must be non-negative")
+        REACTION_TIMEOUT = timeout
+
+
+def _reaction_worker_loop(conn, run) -> None:
+    while True:
+        try:
+            args = conn.recv()
+        except EOFError:
+            return
+        try:
+            result = run(*args)
+        except Exception as e:
+            result = (False, f"Error verifying reaction: {e}")
+        conn.send(result)
+
+
+class _ReactionWorker:
+    """
+    Long-lived child process that runs reactions for verify_reaction, so a
+    combinatorial blowup can be stopped by killing the process. The process is
+    restarted on the next call after it has been killed.
+
+    Only the already parsed reaction and molecules are sent to the worker;
+    parsing and its caches stay in the calling process.
+
+    Args:
+        run (Callable): Called in the worker as run(*args), see _run_reaction.
+    """
+
+    def __init__(self, run=None):
+        self._run = run or _run_reaction
+        self._process = None
+        self._conn = None
+        self._owner_pid = None
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.timeouts = 0
+        self.restarts = 0
+
+    def _start(self) -> None:
+        parent_conn, child_conn = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_reaction_worker_loop, args=(child_conn, self._run), daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        self._owner_pid = os.getpid()
+        self.restarts += 1
+
+    def _stop(self) -> None:
+        self._process.kill()
+        self._process.join()
+        self._conn.close()
+        self._process = None
+        self._conn = None
+
+    def _ensure_started(self) -> None:
+        if self._owner_pid != os.getpid():
+            # Inherited from a parent process through fork, not ours to use
+            self._process = None
+            self._conn = None
+        if self._process is None or not self._process.is_alive():
+            self._start()
+
+    def start(self) -> None:
+        """Start the worker process now rather than on the first run."""
+        with self._lock:
+            self._ensure_started()
+
+    def run(self, args: tuple, timeout: Optional[float]) -> Tuple[bool, str]:
+        """
+        Run run(*args) in the worker process.
+
+        Raises:
+            TimeoutError: If no result is available within timeout seconds
+                (None waits without a limit).
+        """
+        with self._lock:
+            self._ensure_started()
+            self.runs += 1
+            try:
+                self._conn.send(args)
+                if self._conn.poll(timeout):
+                    return self._conn.recv()
+            except (EOFError, OSError) as e:
+                self._stop()
+                raise RuntimeError(f"Reaction worker failed: {e}") from e
+            self._stop()
+            self.timeouts += 1
+            raise TimeoutError(f"Reaction took longer than {timeout} s")
+
+    def stats(self) -> dict:
+        """Return the number of reactions run, timed out and worker (re)starts."""
+        with self._lock:
+            return {"runs": self.runs, "timeouts": self.timeouts, "restarts": self.restarts}
+
+
+def _too_slow(smarts: str, timeout: float) -> Tuple[bool, str]:
+    logger.error("Reaction {} exceeded the {} s time budget", smarts, timeout)
+    return (
+        False,
+        f"Reaction too slow: verification exceeded the time budget of {timeout} s. "
+        "The SMARTS is likely too permissive; use a more specific reaction SMARTS.",
+    )
+
+
+def _batch_budget_exceeded(smarts: str, budget: float) -> Tuple[bool, str]:
+    logger.error("Reaction {} skipped, the batch time budget of {} s was used up", smarts, budget)
+    return (
+        False,
+        f"Reaction not verified: the batch used up its time budget of {budget:g} s "
+        "before reaching it. Verify it again separately.",
+    )
 
-        if not rxn:
-            logger.error("Invalid reaction SMARTS.")
-            return False, "Invalid reaction SMARTS."
-        rxn.Initialize()
-        if not rxn.IsInitialized():
-            logger.error("Reaction SMARTS could not be initialized.")
-            return False, "Reaction SMARTS could not be initialized."
-        rdChemReactions.SanitizeRxn(rxn)
-        logger.info("Reaction SMARTS is valid and sanitized.")
-        sanitized_smarts = rdChemReactions.ReactionToSmarts(rxn)
-        logger.info(f"Sanitized SMARTS: {sanitized_smarts}")
-        if not sanitized_smarts:
-            logger.error("Sanitized SMARTS is empty.")
-            return False, "Sanitized SMARTS is empty."
-        logger.info("SMARTS is valid.")
-        return True, "SMARTS is valid."
-    except Exception as e:
-        logger.error(f"Invalid SMARTS string: {e}")
-        return False, f"Invalid Syntax for SMARTS string. The error is: {e}"
 
 def verify_reaction(
     smarts: str, reactants: list[str], products: list[str]
@@ -67,6 +303,8 @@ def verify_reaction(
     Returns a tuple of (bool, str).
     The bool indicates if the reaction can be performed, and
     the str is an error message if it cannot be performed.
+    Reactions that generate too many outcomes or take too long are rejected;
+    use a more specific SMARTS in that case.
 
     Args:
         smarts (str): The input SMARTS string.
@@ -80,55 +318,203 @@ def verify_reaction(
     """
     if not HAS_SMARTS:
         raise ImportError("Please install the rdkit support packages to use this module.")
+    return _verify_reaction(
+        smarts, reactants, products, MAX_PRODUCTS, REACTION_TIMEOUT, _default_worker()
+    )
+
+
+def _prepare_reaction(smarts: str, reactants: list[str], products: list[str]):
+    """
+    Parse the reaction and molecules through the process-wide caches.
+
+    Returns:
+        tuple: (reaction, reactant mols, product mols, None), or
+            (None, None, None, error message) if anything is invalid.
+    """
+    compiled = get_compiled_reaction(smarts)
+    if compiled.parse_error is not None:
+        raise ValueError(compiled.parse_error)
+    reaction = compiled.reaction
+    if not reaction:
+        logger.error("Invalid reaction SMARTS.")
+        return None, None, None, "Invalid reaction SMARTS."
+
+    reactant_mols = [get_mol(r) for r in reactants]
+    product_mols = [get_mol(p) for p in products]
+    for i, r in enumerate(reactant_mols):
+        if r is None:
+            logger.error("Invalid reactant SMILES: {}", reactants[i])
+            return None, None, None, f"Invalid reactant SMILES: {reactants[i]}"
+    for i, p in enumerate(product_mols):
+        if p is None:
+            logger.error("Invalid product SMILES: {}", products[i])
+            return None, None, None, f"Invalid product SMILES: {products[i]}"
+    return reaction, reactant_mols, product_mols, None
+
+
+def _run_reaction(reaction, reactant_mols: list, product_mols: list, max_products: int) -> Tuple[bool, str]:
+    """Run the reaction and check whether one outcome contains all the products."""
+    results = reaction.RunReactants(reactant_mols, max_products)
+    if not results:
+        logger.error("Reaction cannot be applied to the given reactants.")
+        return False, "Reaction cannot be applied to the given reactants."
+
+    # Canonical keys of the expected products, computed once
+    expected = {Chem.MolToSmiles(prod) for prod in product_mols}
+    canonical = {}
+    first_outcome = None
+    for result in results:
+        outcome = []
+        for mol in result:
+            smiles = Chem.MolToSmiles(mol)
+            if smiles not in canonical:
+                parsed = Chem.MolFromSmiles(smiles)
+                canonical[smiles] = Chem.MolToSmiles(parsed) if parsed else None
+            outcome.append(canonical[smiles])
+        if expected.issubset(outcome):
+            logger.debug("Reaction verified successfully.")
+            return True, "Reaction verified successfully."
+        if first_outcome is None:
+            first_outcome = outcome
+
+    if len(results) >= max_products:
+        logger.error("Reaction reached the limit of {} outcomes", max_products)
+        return (
+            False,
+            f"Too many products: the reaction generated at least {max_products} outcomes "
+            "without matching the products. The SMARTS is likely too permissive; "
+            "use a more specific reaction SMARTS.",
+        )
+    missing = sorted(expected - set(first_outcome))[0]
+    logger.error("No matching products found from the reaction.")
+    return (
+        False,
+        f"Product {missing} not found in predicted products: {first_outcome}",
+    )
+
+
+def _verify_reaction(
+    smarts: str,
+    reactants: list[str],
+    products: list[str],
+    max_products: int,
+    timeout: float = 0.0,
+    worker: Optional[_ReactionWorker] = None,
+) -> Tuple[bool, str]:
+    # worker: run RunReactants in that worker process, killed after timeout
+    # seconds (no limit if timeout <= 0). Without one it runs here, bounded
+    # only by max_products.
     try:
-        logger.info(
-            f"Verifying reaction with SMARTS: {smarts}, Reactants: {reactants}, Products: {products}"
+        log_call(
+            "verify_reaction",
+            "Verifying reaction with SMARTS: {}, Reactants: {}, Products: {}",
+            smarts,
+            reactants,
+            products,
+        )
+        reaction, reactant_mols, product_mols, error = _prepare_reaction(
+            smarts, reactants, products
         )
-        reaction = AllChem.ReactionFromSmarts(smarts)
-        if not reaction:
-            logger.error("Invalid reaction SMARTS.")
-            return False, "Invalid reaction SMARTS."
-
-        reactant_mols = [Chem.MolFromSmiles(r) for r in reactants]
-        product_mols = [Chem.MolFromSmiles(p) for p in products]
-
-        if not all(reactant_mols) or not all(product_mols):
-            for i, r in enumerate(reactant_mols):
-                if r is None:
-                    logger.error(f"Invalid reactant SMILES: {reactants[i]}")
-                    return False, f"Invalid reactant SMILES: {reactants[i]}"
-            for i, p in enumerate(product_mols):
-                if p is None:
-                    logger.error(f"Invalid product SMILES: {products[i]}")
-                    return False, f"Invalid product SMILES: {products[i]}"
-
-        results = reaction.RunReactants(reactant_mols)
-        if not results:
-            logger.error("Reaction cannot be applied to the given reactants.")
-            return False, "Reaction cannot be applied to the given reactants."
-
-        for result in results:
-            result_smiles = [
-                Chem.MolToSmiles(Chem.MolFromSmiles(Chem.MolToSmiles(mol)))
-                for mol in result
-            ]
-
-            check_products = True
-            for prod in set(product_mols):
-                prod_smiles = Chem.MolToSmiles(prod)
-                if prod_smiles not in result_smiles:
-                    check_products = False
-                    return (
-                        False,
-                        f"Product {prod_smiles} not found in predicted products: {result_smiles}",
-                    )
-            if check_products:
-                logger.info("Reaction verified successfully.")
-                return True, "Reaction verified successfully."
-
-        logger.error("No matching products found from the reaction.")
-        return False, "No matching products found from the reaction."
+        if error is not None:
+            return False, error
+        if worker is None:
+            return _run_reaction(reaction, reactant_mols, product_mols, max_products)
+        try:
+            return worker.run(
+                (reaction, reactant_mols, product_mols, max_products),
+                timeout if timeout > 0 else None,
+            )
+        except TimeoutError:
+            return _too_slow(smarts, timeout)
     except Exception as e:
-        logger.error(f"Error verifying reaction: {e}")
+        logger.error("Error verifying reaction: {}", e)
         return False, f"Error verifying reaction: {e}"
-    
+
+
+_REACTION_WORKER = _ReactionWorker()
+
+# Worker processes of parallel batches, one per concurrent chunk, kept
+# between calls.
+_BATCH_REACTION_WORKERS: list[_ReactionWorker] = []
+_BATCH_REACTION_WORKERS_LOCK = threading.Lock()
+
+
+def _default_worker() -> Optional[_ReactionWorker]:
+    # The verify_reaction worker, None if reactions run in this process
+    return _REACTION_WORKER if REACTION_TIMEOUT > 0 else None
+
+
+def _batch_reaction_workers(count: int) -> list[_ReactionWorker]:
+    # Started here rather than from the chunk threads, so the worker
+    # processes are not forked while those threads run
+    with _BATCH_REACTION_WORKERS_LOCK:
+        while len(_BATCH_REACTION_WORKERS) < count:
+            _BATCH_REACTION_WORKERS.append(_ReactionWorker())
+        workers = _BATCH_REACTION_WORKERS[:count]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def _verify_reaction_chunk(
+    reactions: list[dict],
+    max_products: int,
+    timeout: float,
+    worker: Optional[_ReactionWorker] = None,
+) -> list[dict]:
+    # Each reaction runs in worker (if given) and is killed after timeout
+    # seconds. With a time budget, the chunk also gets timeout seconds per
+    # reaction in total, and the reactions not started before that deadline
+    # are reported as skipped.
+    deadline = time.monotonic() + timeout * len(reactions) if timeout > 0 else None
+    results = []
+    for item in reactions:
+        if deadline is not None and time.monotonic() > deadline:
+            valid, message = _batch_budget_exceeded(item["smarts"], timeout * len(reactions))
+        else:
+            valid, message = _verify_reaction(
+                item["smarts"], item["reactants"], item["products"], max_products, timeout, worker
+            )
+        results.append({"valid": valid, "message": message})
+    return results
+
+
+def verify_reactions_batch(reactions: list[dict]) -> list[dict]:
+    """
+    Verify several reactions in a single call. Each reaction is a dictionary
+    with the keys "smarts" (the reaction SMARTS string), "reactants" (list of
+    reactant SMILES strings) and "products" (list of expected product SMILES
+    strings), checked as in verify_reaction, with the same per-reaction time
+    budget. Large batches are split over several worker processes.
+
+    Args:
+        reactions (list[dict]): The reactions to verify.
+    Returns:
+        list[dict]: One entry per reaction, in input order, with the keys
+            "valid" (bool, True if the reaction produces the expected products)
+            and "message" (str, explanation or error message).
+    """
+    if not HAS_SMARTS:
+        raise ImportError("Please install the rdkit support packages to use this module.")
+    log_call("verify_reactions_batch", "Verifying batch of {} reactions", len(reactions))
+    if len(reactions) < BATCH_PARALLEL_THRESHOLD:
+        return _verify_reaction_chunk(
+            reactions, MAX_PRODUCTS, REACTION_TIMEOUT, _default_worker()
+        )
+
+    # Reactions are parsed here, through the shared caches, by one thread per
+    # chunk; each thread runs its reactions in its own worker process.
+    workers = BATCH_WORKERS or os.cpu_count() or 1
+    chunk_size = -(-len(reactions) // workers)
+    chunks = [reactions[i : i + chunk_size] for i in range(0, len(reactions), chunk_size)]
+    results = []
+    with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+        for chunk_results in executor.map(
+            _verify_reaction_chunk,
+            chunks,
+            [MAX_PRODUCTS] * len(chunks),
+            [REACTION_TIMEOUT] * len(chunks),
+            _batch_reaction_workers(len(chunks)),
+        ):
+            results.extend(chunk_results)
+    return results
@@ -21,11 +21,21 @@ except (ImportError, ModuleNotFoundError) as e:
     )
 
 from charge.servers.server_utils import add_server_arguments
+from charge.servers.server_logging import configure_server_logging
+from charge.servers.property_cache import set_property_cache
+from charge.servers.conformer_store import set_conformer_store
 import argparse
 
 parser = argparse.ArgumentParser()
 add_server_arguments(parser)
+parser.add_argument(
+    "--known-smiles-db",
+    type=str,
+    default=None,
+    help="SQLite database used to persist the molecules seen by known_smiles",
+)
 args = parser.parse_args()
+configure_server_logging(args.log_mode, args.log_sample_every, args.log_enqueue)
 
 SMILES_mcp = FastMCP(
     "[RDKit-SMILES] Chem and BioInformatics MCP Server",
@@ -36,6 +46,14 @@ SMILES_mcp = FastMCP(
 logger.info("[RDKit-SMILES] Starting Chem and BioInformatics MCP Server")
 
 import charge.servers.SMILES_utils as smiles
+import charge.servers.molecular_property_utils as properties
+
+if args.known_smiles_db:
+    smiles.set_known_smiles_db(args.known_smiles_db)
+if args.property_cache:
+    set_property_cache(args.property_cache)
+if args.conformer_store:
+    set_conformer_store(args.conformer_store)
 
 SMILES_mcp.tool()(smiles.canonicalize_smiles)
 
@@ -44,3 +62,17 @@ SMILES_mcp.tool()(smiles.verify_smiles)
 SMILES_mcp.tool()(smiles.get_synthesizability)
 
 SMILES_mcp.tool()(smiles.known_smiles)
+
+SMILES_mcp.tool()(smiles.canonicalize_smiles_batch)
+
+SMILES_mcp.tool()(smiles.verify_smiles_batch)
+
+SMILES_mcp.tool()(smiles.get_synthesizability_batch)
+
+SMILES_mcp.tool()(smiles.known_smiles_batch)
+
+SMILES_mcp.tool()(smiles.is_similar_to_known_smiles)
+
+SMILES_mcp.tool()(smiles.find_similar_known_smiles)
+
+SMILES_mcp.tool()(properties.compute_properties)
@@ -0,0 +1,246 @@
+################################################################################
+## Copyright 2025 Lawrence Livermore National Security, LLC. and Binghamton University.
+## See the top-level LICENSE file for details.
+##
+## SPDX-License-Identifier: Apache-2.0
+################################################################################
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain, islice
+from typing import Iterable, Iterator, Optional, TextIO
+import csv
+import json
+import os
+import time
+
+import click
+from loguru import logger
+
+try:
+    from rdkit import Chem, RDLogger
+    from rdkit.Contrib.SA_Score import sascorer
+    HAS_SMILES = True
+except (ImportError, ModuleNotFoundError) as e:
+    HAS_SMILES = False
+    logger.warning(
+        "Please install the rdkit support packages to use this module."
+        "Install it with: pip install charge[rdkit]",
+    )
+
+OUTPUT_FIELDS = ["id", "smiles", "valid", "canonical_smiles", "sascore"]
+
+# Seconds between throughput reports
+REPORT_INTERVAL = 10.0
+
+
+def _file_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".smi", ".txt"):
+        return "smi"
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Unsupported file format '{ext}'. Use .smi, .csv or .jsonl")
+
+
+def iter_smiles(path: str, smiles_column: str = "smiles") -> Iterator[tuple[str, str]]:
+    """
+    Stream (id, SMILES) pairs from a .smi, .csv or .jsonl file, one line at a time.
+
+    For .smi files the first whitespace-separated token is the SMILES string and
+    the optional second token is the molecule id. For .csv and .jsonl files the
+    SMILES string is read from ``smiles_column`` and the id from an "id" column
+    or key if present. Molecules without an id are numbered by line.
+
+    Args:
+        path (str): The input file.
+        smiles_column (str): Column (or JSON key) holding the SMILES strings.
+    Yields:
+        tuple[str, str]: The molecule id and its SMILES string.
+    """
+    fmt = _file_format(path)
+    with open(path, newline="") as f:
+        if fmt == "smi":
+            for i, line in enumerate(f):
+                tokens = line.split()
+                if not tokens or tokens[0].startswith("#"):
+                    continue
+                yield (tokens[1] if len(tokens) > 1 else str(i)), tokens[0]
+        elif fmt == "csv":
+            for i, row in enumerate(csv.DictReader(f)):
+                yield row.get("id") or str(i), row[smiles_column]
+        else:
+            for i, line in enumerate(f):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                yield str(record.get("id", i)), record[smiles_column]
+
+
+def _chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def process_chunk(chunk: list[tuple[str, str]], compute_sascore: bool = True) -> list[dict]:
+    """
+    Validate, canonicalize and (optionally) score a chunk of molecules.
+
+    Args:
+        chunk (list[tuple[str, str]]): (id, SMILES) pairs.
+        compute_sascore (bool): Whether to compute the synthesizability score.
+    Returns:
+        list[dict]: One record per molecule with the fields in OUTPUT_FIELDS.
+            Invalid molecules have an empty canonical SMILES and a score of 10.0.
+    """
+    RDLogger.DisableLog("rdApp.*")
+    records = []
+    for mol_id, smiles in chunk:
+        record = {"id": mol_id, "smiles": smiles, "valid": False,
+                  "canonical_smiles": "", "sascore": None}
+        try:
+            mol = Chem.MolFromSmiles(smiles)
+        except Exception:
+            mol = None
+        if mol is not None:
+            record["valid"] = True
+            record["canonical_smiles"] = Chem.MolToSmiles(mol)
+        if compute_sascore:
+            try:
+                record["sascore"] = 10.0 if mol is None else sascorer.calculateScore(mol)
+            except Exception:
+                record["sascore"] = 10.0
+        records.append(record)
+    return records
+
+
+class _RecordWriter:
+    """Incremental CSV or JSONL writer for the processed records."""
+
+    def __init__(self, f: TextIO, fmt: str):
+        self.f = f
+        self.fmt = fmt
+        if fmt == "csv":
+            self.writer = csv.DictWriter(f, fieldnames=OUTPUT_FIELDS)
+            self.writer.writeheader()
+        elif fmt != "jsonl":
+            raise ValueError("Output must be a .csv or .jsonl file")
+
+    def write(self, records: list[dict]) -> None:
+        if self.fmt == "csv":
+            self.writer.writerows(records)
+        else:
+            self.f.writelines(json.dumps(r) + "\n" for r in records)
+
+
+def run_bulk(
+    input_path: str,
+    output_path: str,
+    smiles_column: str = "smiles",
+    workers: Optional[int] = None,
+    chunk_size: int = 1000,
+    compute_sascore: bool = True,
+) -> dict:
+    """
+    Stream molecules from input_path through a process pool and write the
+    validation, canonicalization and SA score results to output_path.
+
+    At most two chunks per worker are in flight at any time, so memory use
+    does not grow with the size of the input. Results are written in input
+    order as soon as they are available.
+
+    Args:
+        input_path (str): Input .smi, .csv or .jsonl file.
+        output_path (str): Output .csv or .jsonl file.
+        smiles_column (str): Column (or JSON key) holding the SMILES strings.
+        workers (int, optional): Number of worker processes (default: CPU count).
+        chunk_size (int): Number of molecules sent to a worker at a time.
+        compute_sascore (bool): Whether to compute the synthesizability score.
+    Returns:
+        dict: Number of molecules, number of valid molecules, elapsed seconds
+            and throughput in molecules per second.
+    Raises:
+        ValueError: If a file format or chunk_size is invalid, or the output
+            file is the input file.
+        KeyError: If the first input record has no smiles_column.
+    """
+    if not HAS_SMILES:
+        raise ImportError("Please install the rdkit support packages to use this module.")
+    # Validate everything before the output file is opened (and truncated)
+    output_format = _file_format(output_path)
+    if output_format not in ("csv", "jsonl"):
+        raise ValueError("Output must be a .csv or .jsonl file")
+    _file_format(input_path)
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if os.path.exists(output_path) and os.path.samefile(input_path, output_path):
+        raise ValueError("The output file must not be the input file")
+    molecules = iter_smiles(input_path, smiles_column)
+    # Reading the first record checks that the input opens and has smiles_column
+    first = list(islice(molecules, 1))
+    workers = workers or os.cpu_count() or 1
+    worker_fn = partial(process_chunk, compute_sascore=compute_sascore)
+    chunks = _chunked(chain(first, molecules), chunk_size)
+    num_molecules = 0
+    num_valid = 0
+    start = last_report = time.perf_counter()
+    with open(output_path, "w", newline="") as out, ProcessPoolExecutor(workers) as executor:
+        writer = _RecordWriter(out, output_format)
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(worker_fn, chunk))
+            while pending and (len(pending) >= 2 * workers or pending[0].done()):
+                records = pending.popleft().result()
+                writer.write(records)
+                num_molecules += len(records)
+                num_valid += sum(r["valid"] for r in records)
+            now = time.perf_counter()
+            if now - last_report >= REPORT_INTERVAL:
+                last_report = now
+                logger.info(
+                    "Processed {} molecules ({:.0f} molecules/s)",
+                    num_molecules,
+                    num_molecules / (now - start),
+                )
+        for future in pending:
+            records = future.result()
+            writer.write(records)
+            num_molecules += len(records)
+            num_valid += sum(r["valid"] for r in records)
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "molecules": num_molecules,
+        "valid": num_valid,
+        "seconds": elapsed,
+        "molecules_per_second": num_molecules / elapsed if elapsed > 0 else 0.0,
+    }
+    logger.info(
+        "Done: {molecules} molecules ({valid} valid) in {seconds:.1f} s, "
+        "{molecules_per_second:.0f} molecules/s",
+        **stats,
+    )
+    return stats
+
+
+@click.command()
+@click.argument("input_path", type=click.Path(exists=True, dir_okay=False))
+@click.argument("output_path", type=click.Path(dir_okay=False))
+@click.option("--smiles-column", default="smiles", help="CSV column or JSON key holding the SMILES strings")
+@click.option("--workers", type=int, default=None, help="Number of worker processes (default: CPU count)")
+@click.option("--chunk-size", type=int, default=1000, help="Number of molecules per worker task")
+@click.option("--sascore/--no-sascore", default=True, help="Compute the synthesizability (SA) score")
+def main(input_path: str, output_path: str, smiles_column: str, workers: Optional[int], chunk_size: int, sascore: bool):
+    """
+    Validate, canonicalize and score the molecules in INPUT_PATH (.smi, .csv or
+    .jsonl), streaming the results to OUTPUT_PATH (.csv or .jsonl).
+    """
+    run_bulk(input_path, output_path, smiles_column, workers, chunk_size, sascore)
+
+
+if __name__ == "__main__":
+    main()
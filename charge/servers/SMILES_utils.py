@@ -9,9 +9,10 @@ from mcp.server.fastmcp import FastMCP
 from loguru import logger
 
 try:
-    from rdkit import Chem
+    from rdkit import Chem, rdBase
     from rdkit.Chem import AllChem, Descriptors
     from rdkit.Contrib.SA_Score import sascorer
+    import numpy as np
     HAS_SMILES = True
 except (ImportError, ModuleNotFoundError) as e:
     HAS_SMILES = False
@@ -20,6 +21,18 @@ except (ImportError, ModuleNotFoundError) as e:
         "Install it with: pip install charge[rdkit]",
     )
 
+from charge.servers.cache_utils import get_mol
+from charge.servers.novelty_store import NoveltyStore
+from charge.servers.similarity_index import FingerprintIndex
+from charge.servers.server_logging import log_call
+from charge.servers.property_cache import cached_compute, method_key
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+import os
+
+# Property cache method key of the SA score, changes with the RDKit version
+SASCORE_METHOD = method_key("sascorer", rdkit=rdBase.rdkitVersion) if HAS_SMILES else None
+
 def canonicalize_smiles(smiles: str) -> str:
     """
     Canonicalize a SMILES string. Returns the canonical SMILES.
@@ -31,19 +44,14 @@ def canonicalize_smiles(smiles: str) -> str:
         str: The canonicalized SMILES string.
     """
     try:
-        logger.info(f"Canonicalizing SMILES: {smiles}")
-        mol = Chem.MolFromSmiles(smiles)
+        log_call("canonicalize_smiles", "Canonicalizing SMILES: {}", smiles)
+        mol = get_mol(smiles)
         return Chem.MolToSmiles(mol)
     except Exception as e:
-        logger.error(f"Error canonicalizing SMILES: {smiles}")
+        logger.error("Error canonicalizing SMILES: {}", smiles)
         return "Invalid SMILES"
 
 
-#        return smiles
-
-# Persistent counter to demonstrate statefulness
-SMILES_VERIFICATION_COUNTER = 0
-
 
 def verify_smiles(smiles: str) -> bool:
     """
@@ -57,23 +65,25 @@ def verify_smiles(smiles: str) -> bool:
     if not HAS_SMILES:
         raise ImportError("Please install the rdkit support packages to use this module.")
     try:
-        global SMILES_VERIFICATION_COUNTER
-        SMILES_VERIFICATION_COUNTER += 1
-        logger.info(
-            f"Verifying SMILES: {smiles} used {SMILES_VERIFICATION_COUNTER} times"
-        )
-        mol = Chem.MolFromSmiles(smiles)
+        mol = get_mol(smiles)
         if mol is not None:
-            logger.info(f"SMILES is valid: {smiles}")
+            log_call("verify_smiles", "SMILES is valid: {}", smiles)
             return True
         else:
-            logger.error(f"SMILES is invalid: {smiles}")
+            log_call("verify_smiles", "SMILES is invalid: {}", smiles, level="ERROR")
             return False
     except Exception as e:
-        logger.error(f"SMILES is invalid: {smiles}")
+        logger.error("SMILES is invalid: {}", smiles)
         return False
 
 
+def _cached_sascore(smiles: str, mol) -> float:
+    # SA score through the property cache, shared by the single and batch calls
+    return cached_compute(
+        smiles, "sascore", SASCORE_METHOD, lambda: sascorer.calculateScore(mol)
+    )
+
+
 def get_synthesizability(smiles: str) -> float:
     """
     Calculate the synthesizability of a molecule given its SMILES string.
@@ -87,21 +97,109 @@ def get_synthesizability(smiles: str) -> float:
     if not HAS_SMILES:
         raise ImportError("Please install the rdkit support packages to use this module.")
     try:
-        # logger.info(f"Calculating synthesizability for SMILES: {smiles}")
-        mol = Chem.MolFromSmiles(smiles)
+        mol = get_mol(smiles)
         if mol is None:
             logger.warning("Invalid SMILES string or molecule could not be created.")
             return 10.0  # Default value for invalid SMILES
-        score = sascorer.calculateScore(mol)
-        logger.info(f"Synthesizability score for SMILES {smiles}: {score}")
+        score = _cached_sascore(smiles, mol)
+        log_call(
+            "get_synthesizability", "Synthesizability score for SMILES {}: {}", smiles, score
+        )
         return score
     except Exception as e:
-        logger.error(f"Error creating molecule from SMILES: {e}")
+        logger.error("Error creating molecule from SMILES: {}", e)
         return 10.0
 
 
-database_of_smiles = []
-NUM_HITS = 1
+def _synthesizability_chunk(smiles_chunk: list[str]) -> list[float]:
+    # Worker-side scoring for get_synthesizability_bulk. Parses directly rather
+    # than through the molecule cache, since bulk inputs are rarely repeated.
+    scores = []
+    for smiles in smiles_chunk:
+        try:
+            mol = Chem.MolFromSmiles(smiles)
+            scores.append(10.0 if mol is None else sascorer.calculateScore(mol))
+        except Exception:
+            scores.append(10.0)
+    return scores
+
+
+def get_synthesizability_bulk(
+    smiles_list: list[str], max_workers: Optional[int] = None, chunk_size: int = 1000
+) -> "np.ndarray":
+    """
+    Calculate the synthesizability (SA score) of many molecules in parallel.
+    The input is split into chunks of chunk_size SMILES strings that are scored
+    in a process pool. Invalid SMILES are scored 10.0, as in get_synthesizability.
+
+    Args:
+        smiles_list (list[str]): The input SMILES strings.
+        max_workers (int, optional): Number of worker processes. Defaults to the
+            number of CPUs; 1 scores the molecules in the calling process.
+        chunk_size (int): Number of molecules sent to a worker at a time.
+    Returns:
+        np.ndarray: The synthesizability scores, in input order.
+    """
+    if not HAS_SMILES:
+        raise ImportError("Please install the rdkit support packages to use this module.")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    smiles_list = list(smiles_list)
+    chunks = [
+        smiles_list[i : i + chunk_size] for i in range(0, len(smiles_list), chunk_size)
+    ]
+    scores = np.full(len(smiles_list), 10.0)
+    if max_workers == 1 or len(chunks) <= 1:
+        chunk_scores = map(_synthesizability_chunk, chunks)
+        for i, chunk in enumerate(chunk_scores):
+            scores[i * chunk_size : i * chunk_size + len(chunk)] = chunk
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            chunk_scores = executor.map(_synthesizability_chunk, chunks)
+            for i, chunk in enumerate(chunk_scores):
+                scores[i * chunk_size : i * chunk_size + len(chunk)] = chunk
+    logger.info(f"Calculated synthesizability for {len(smiles_list)} molecules")
+    return scores
+
+
+# Known molecules, keyed by canonical isomeric SMILES. Set CHARGE_KNOWN_SMILES_DB
+# (or call set_known_smiles_db) to persist the set in a SQLite database.
+database_of_smiles = NoveltyStore(os.getenv("CHARGE_KNOWN_SMILES_DB"))
+
+# Fingerprint similarity index over the known molecules, built on first use.
+_similarity_index: Optional[FingerprintIndex] = None
+
+
+def get_similarity_index() -> FingerprintIndex:
+    """
+    Return the fingerprint similarity index over the known molecules, building
+    it from the known molecule set on first use.
+
+    Returns:
+        FingerprintIndex: The similarity index.
+    """
+    global _similarity_index
+    if _similarity_index is None:
+        index = FingerprintIndex()
+        index.add_many(database_of_smiles)
+        logger.info("Built similarity index over {} known molecules", len(index))
+        _similarity_index = index
+    return _similarity_index
+
+
+def set_known_smiles_db(db_path: Optional[str]) -> None:
+    """
+    Replace the known molecule set used by known_smiles with one backed by the
+    SQLite database at db_path (loading any molecules already stored there).
+
+    Args:
+        db_path (str, optional): Path to the SQLite database. If None, an empty
+            in-memory set is used.
+    """
+    global database_of_smiles, _similarity_index
+    database_of_smiles.close()
+    database_of_smiles = NoveltyStore(db_path)
+    _similarity_index = None
 
 
 def known_smiles(smiles: str) -> bool:
@@ -117,20 +215,165 @@ def known_smiles(smiles: str) -> bool:
     if not HAS_SMILES:
         raise ImportError("Please install the rdkit support packages to use this module.")
     try:
-        global NUM_HITS
-        logger.info(f"Tool has been call: {NUM_HITS} times")
-
-        NUM_HITS += 1
-        logger.info(f"Checking if SMILES is known: {smiles}")
-        mol = Chem.MolFromSmiles(smiles)
+        mol = get_mol(smiles)
         smiles = Chem.MolToSmiles(mol, isomericSmiles=True)
 
-        if smiles in database_of_smiles:
+        if not database_of_smiles.add(smiles):
+            log_call("known_smiles", "SMILES found in the database: {}", smiles)
             return True
         else:
-            database_of_smiles.append(smiles)
-            logger.info(f"SMILES not found in the database: {smiles}")
+            if _similarity_index is not None:
+                _similarity_index.add(smiles)
+            log_call("known_smiles", "SMILES not found in the database: {}", smiles)
             return False
 
     except Exception as e:
         return False
+
+
+def is_similar_to_known_smiles(smiles: str, threshold: float = 0.8) -> dict:
+    """
+    Check if any known molecule, other than the molecule itself, has a Tanimoto
+    similarity (Morgan fingerprints, radius 2) of at least threshold to the given
+    molecule. Use this to reject trivial analogs of known molecules; use
+    known_smiles to check for exact matches.
+
+    Args:
+        smiles (str): The input SMILES string.
+        threshold (float): Similarity threshold between 0.0 and 1.0.
+    Returns:
+        dict: "similar" (bool) is True if a known molecule reaches the threshold,
+            "nearest_smiles" (str or None) is the most similar known molecule
+            that could reach the threshold (None if no known molecule has a
+            compatible number of fingerprint bits) and "similarity" (float) its
+            similarity to the input.
+    """
+    if not HAS_SMILES:
+        raise ImportError("Please install the rdkit support packages to use this module.")
+    similar, nearest, similarity = get_similarity_index().any_similar(
+        smiles, threshold, exclude_self=True
+    )
+    log_call(
+        "is_similar_to_known_smiles",
+        "Nearest known molecule to {}: {} ({})",
+        smiles,
+        nearest,
+        similarity,
+    )
+    return {"similar": similar, "nearest_smiles": nearest, "similarity": similarity}
+
+
+def find_similar_known_smiles(smiles: str, k: int = 5) -> list[dict]:
+    """
+    Find the k known molecules most similar to the given molecule (Tanimoto
+    similarity of Morgan fingerprints, radius 2), excluding the molecule itself.
+
+    Args:
+        smiles (str): The input SMILES string.
+        k (int): Number of similar molecules to return.
+    Returns:
+        list[dict]: Up to k entries with keys "smiles" and "similarity", most
+            similar first.
+    """
+    if not HAS_SMILES:
+        raise ImportError("Please install the rdkit support packages to use this module.")
+    neighbors = get_similarity_index().most_similar(smiles, k, exclude_self=True)
+    log_call(
+        "find_similar_known_smiles", "Found {} similar molecules to {}", len(neighbors), smiles
+    )
+    return [{"smiles": s, "similarity": sim} for s, sim in neighbors]
+
+
+def _apply_to_batch(smiles_list: list[str], compute, default) -> list[dict]:
+    """
+    Apply ``compute(mol, smiles)`` to every SMILES string in a list, collecting
+    per-item results and errors instead of failing the whole batch.
+
+    Args:
+        smiles_list (list[str]): The input SMILES strings.
+        compute (Callable): Function of the parsed molecule and its SMILES string.
+        default: Result reported for items that could not be processed.
+    Returns:
+        list[dict]: One ``{"smiles", "result", "error"}`` record per input, in order.
+    """
+    if not HAS_SMILES:
+        raise ImportError("Please install the rdkit support packages to use this module.")
+    results = []
+    for smiles in smiles_list:
+        try:
+            mol = get_mol(smiles)
+            if mol is None:
+                results.append({"smiles": smiles, "result": default, "error": "Invalid SMILES"})
+                continue
+            results.append({"smiles": smiles, "result": compute(mol, smiles), "error": None})
+        except Exception as e:
+            results.append({"smiles": smiles, "result": default, "error": str(e)})
+    log_call("smiles_batch", "Processed batch of {} SMILES", len(smiles_list))
+    return results
+
+
+def canonicalize_smiles_batch(smiles_list: list[str]) -> list[dict]:
+    """
+    Canonicalize a list of SMILES strings in a single call.
+    Each entry of the returned list has the keys "smiles" (the input string),
+    "result" (the canonical SMILES, or "Invalid SMILES") and "error"
+    (None on success, otherwise a short error message).
+
+    Args:
+        smiles_list (list[str]): The input SMILES strings.
+    Returns:
+        list[dict]: Per-item canonicalization results, in input order.
+    """
+    return _apply_to_batch(
+        smiles_list, lambda mol, smiles: Chem.MolToSmiles(mol), "Invalid SMILES"
+    )
+
+
+def verify_smiles_batch(smiles_list: list[str]) -> list[dict]:
+    """
+    Verify a list of SMILES strings in a single call.
+    Each entry of the returned list has the keys "smiles" (the input string),
+    "result" (True if valid, False otherwise) and "error"
+    (None on success, otherwise a short error message).
+
+    Args:
+        smiles_list (list[str]): The input SMILES strings.
+    Returns:
+        list[dict]: Per-item verification results, in input order.
+    """
+    return _apply_to_batch(smiles_list, lambda mol, smiles: True, False)
+
+
+def get_synthesizability_batch(smiles_list: list[str]) -> list[dict]:
+    """
+    Calculate the synthesizability of a list of molecules in a single call.
+    Values range from 1.0 (highly synthesizable) to 10.0 (not synthesizable).
+    Each entry of the returned list has the keys "smiles" (the input string),
+    "result" (the synthesizability score, 10.0 on error) and "error"
+    (None on success, otherwise a short error message).
+
+    Args:
+        smiles_list (list[str]): The input SMILES strings.
+    Returns:
+        list[dict]: Per-item synthesizability scores, in input order.
+    """
+    return _apply_to_batch(
+        smiles_list, lambda mol, smiles: _cached_sascore(smiles, mol), 10.0
+    )
+
+
+def known_smiles_batch(smiles_list: list[str]) -> list[dict]:
+    """
+    Check if each SMILES string in a list is already known, in a single call.
+    Unknown molecules are added to the known set in input order, so a repeated
+    molecule later in the same list is reported as known.
+    Each entry of the returned list has the keys "smiles" (the input string),
+    "result" (True if known, False otherwise) and "error"
+    (None on success, otherwise a short error message).
+
+    Args:
+        smiles_list (list[str]): The input SMILES strings.
+    Returns:
+        list[dict]: Per-item results, in input order.
+    """
+    return _apply_to_batch(smiles_list, lambda mol, smiles: known_smiles(smiles), False)
@@ -0,0 +1,130 @@
+################################################################################
+## Copyright 2025 Lawrence Livermore National Security, LLC. and Binghamton University.
+## See the top-level LICENSE file for details.
+##
+## SPDX-License-Identifier: Apache-2.0
+################################################################################
+
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional
+import asyncio
+import threading
+
+from loguru import logger
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent asynchronous requests into batches.
+
+    Requests are put in one asyncio queue per key (e.g. per model). A worker
+    task per key takes the first waiting request and keeps collecting until
+    max_batch_size requests are gathered or max_wait seconds have passed, then
+    calls process_batch(key, items) once for the whole batch in an executor
+    thread, and hands each result back to its caller. Requests arriving while
+    a batch is being processed wait for the next batch, so batches grow with
+    the load.
+
+    Args:
+        process_batch (Callable): Called as process_batch(key, items) and
+            returns one result per item, in order. Exceptions are raised to
+            every caller of the batch.
+        max_batch_size (int): Maximum number of requests per batch.
+        max_wait (float): Maximum time in seconds the first request of a batch
+            waits for more requests.
+        executor (Executor, optional): Where batches run. Defaults to a single
+            thread, so batches never compete for the CPU.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[Hashable, list], list],
+        max_batch_size: int = 64,
+        max_wait: float = 0.01,
+        executor: Optional[Executor] = None,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._executor = executor or ThreadPoolExecutor(max_workers=1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queues: dict[Hashable, asyncio.Queue] = {}
+        self._workers: dict[Hashable, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, key: Hashable, item: Any) -> Any:
+        """
+        Queue an item for the next batch of key and wait for its result.
+
+        Args:
+            key (Hashable): The batch key; only items with the same key are batched.
+            item (Any): The item passed to process_batch.
+        Returns:
+            The result of process_batch for this item.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Queues and workers are bound to the event loop they were made in
+            self._loop = loop
+            self._queues = {}
+            self._workers = {}
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = asyncio.Queue()
+            self._workers[key] = loop.create_task(self._worker(key, queue))
+        future = loop.create_future()
+        await queue.put((item, future))
+        return await future
+
+    async def _collect(self, queue: asyncio.Queue) -> list:
+        loop = asyncio.get_running_loop()
+        batch = [await queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _worker(self, key: Hashable, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect(queue)
+            items = [item for item, _ in batch]
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, self.process_batch, key, items
+                )
+                if len(results) != len(items):
+                    raise RuntimeError(
+                        f"process_batch returned {len(results)} results for {len(items)} items"
+                    )
+            except Exception as e:
+                logger.error("Batch of {} items for {} failed: {}", len(items), key, e)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            with self._lock:
+                self.batches += 1
+                self.items += len(items)
+
+    def stats(self) -> dict:
+        """Return the number of batches and items processed and the mean batch size."""
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            }
@@ -0,0 +1,140 @@
+################################################################################
+## Copyright 2025 Lawrence Livermore National Security, LLC. and Binghamton University.
+## See the top-level LICENSE file for details.
+##
+## SPDX-License-Identifier: Apache-2.0
+################################################################################
+
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+import os
+import threading
+
+from loguru import logger
+
+try:
+    from rdkit import Chem
+    HAS_RDKIT = True
+except (ImportError, ModuleNotFoundError) as e:
+    HAS_RDKIT = False
+    logger.warning(
+        "Please install the rdkit support packages to use this module."
+        "Install it with: pip install charge[rdkit]",
+    )
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded least-recently-used cache with hit, miss and
+    eviction counters.
+
+    Args:
+        maxsize (int): Maximum number of entries kept in the cache. A value of
+            0 disables caching (every lookup is a miss).
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        if maxsize < 0:
+            raise ValueError("maxsize must be non-negative")
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for ``key`` (and mark it as recently used)."""
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Insert or refresh ``key``, evicting the least recently used entries if full."""
+        if self.maxsize == 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for ``key``, computing and storing it on a miss.
+        ``compute`` is called outside of the lock, so two threads missing on the
+        same key may both compute it; the last result wins.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict:
+        """Return the cache size and hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Process-wide cache of parsed and sanitized molecules keyed by input SMILES.
+MOL_CACHE = LRUCache(maxsize=int(os.getenv("CHARGE_MOL_CACHE_SIZE", "4096")))
+
+
+def get_mol(smiles: str):
+    """
+    Parse a SMILES string into a sanitized RDKit molecule, reusing previously
+    parsed molecules from the process-wide LRU cache.
+
+    The returned molecule is shared between callers and must not be modified
+    in place; use ``Chem.Mol(mol)`` or ``Chem.AddHs(mol)`` to get a copy first.
+
+    Args:
+        smiles (str): The input SMILES string.
+    Returns:
+        Chem.Mol or None: The parsed molecule, or None if the SMILES is invalid.
+    """
+    if not HAS_RDKIT:
+        raise ImportError("Please install the rdkit support packages to use this module.")
+    return MOL_CACHE.get_or_compute(smiles, lambda: Chem.MolFromSmiles(smiles))
+
+
+def mol_cache_stats() -> dict:
+    """
+    Return the size and hit/miss/eviction counters of the parsed molecule cache.
+
+    Returns:
+        dict: Cache statistics.
+    """
+    return MOL_CACHE.stats()
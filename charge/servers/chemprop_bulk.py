@@ -0,0 +1,275 @@
+################################################################################
+## Copyright 2025 Lawrence Livermore National Security, LLC. and Binghamton University.
+## See the top-level LICENSE file for details.
+##
+## SPDX-License-Identifier: Apache-2.0
+################################################################################
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+import json
+import os
+import sys
+import time
+
+import click
+from loguru import logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except (ImportError, ModuleNotFoundError) as e:
+    HAS_PYARROW = False
+    logger.warning(
+        "Please install the chemprop support packages to use this module."
+        "Install it with: pip install charge[chemprop]",
+    )
+
+try:
+    from rdkit import Chem, RDLogger
+    HAS_RDKIT = True
+except (ImportError, ModuleNotFoundError) as e:
+    HAS_RDKIT = False
+    logger.warning(
+        "Please install the rdkit support packages to use this module."
+        "Install it with: pip install charge[rdkit]",
+    )
+
+from charge.servers.SMILES_bulk import _chunked, iter_smiles
+from charge.servers.chemprop_registry import ChempropModelRegistry
+from charge.servers.get_chemprop2_preds import CHEMPROP_PROPERTIES, set_num_threads
+
+# Leading underscore: ignored by Parquet dataset readers of the output directory
+MANIFEST_FILE = "_manifest.json"
+
+# Seconds between throughput reports
+REPORT_INTERVAL = 30.0
+
+# Model registry of the current (worker) process, see _init_worker
+_REGISTRY: Optional[ChempropModelRegistry] = None
+
+
+def _init_worker(
+    model_dir: str, device: str, variant: Optional[str], num_threads: Optional[int]
+) -> None:
+    global _REGISTRY
+    RDLogger.DisableLog("rdApp.*")
+    set_num_threads(num_threads)
+    _REGISTRY = ChempropModelRegistry(
+        model_dir, device=device, memory_budget_mb=None, variant=variant
+    )
+
+
+def part_path(output_dir: str, index: int) -> str:
+    """Path of the Parquet part file of a chunk."""
+    return os.path.join(output_dir, f"part-{index:06d}.parquet")
+
+
+def score_chunk(
+    index: int,
+    chunk: list[tuple[str, str]],
+    properties: list[str],
+    output_dir: str,
+    batch_size: int = 256,
+) -> tuple[int, int]:
+    """
+    Predict the properties of a chunk of molecules and write them to the
+    chunk's Parquet part file. The file is written under a temporary name and
+    renamed when complete, so a part file either exists in full or not at all.
+
+    Args:
+        index (int): The chunk number.
+        chunk (list[tuple[str, str]]): (id, SMILES) pairs.
+        properties (list[str]): The properties to predict.
+        output_dir (str): The output directory.
+        batch_size (int): Batch size for inference.
+    Returns:
+        tuple[int, int]: The number of molecules and of valid molecules.
+    """
+    valid = [Chem.MolFromSmiles(smiles) is not None for _, smiles in chunk]
+    valid_smiles = [smiles for (_, smiles), ok in zip(chunk, valid) if ok]
+    preds = _REGISTRY.predict_many(properties, valid_smiles, batch_size) if valid_smiles else {}
+
+    columns = {
+        "id": [mol_id for mol_id, _ in chunk],
+        "smiles": [smiles for _, smiles in chunk],
+        "valid": valid,
+    }
+    for prop in properties:
+        values = iter(preds.get(prop, []))
+        columns[prop] = [float(next(values)[0]) if ok else None for ok in valid]
+    schema = pa.schema(
+        [("id", pa.string()), ("smiles", pa.string()), ("valid", pa.bool_())]
+        + [(prop, pa.float64()) for prop in properties]
+    )
+    path = part_path(output_dir, index)
+    # Hidden temporary name, so dataset readers never see a partial file
+    tmp_path = os.path.join(output_dir, f".{os.path.basename(path)}.tmp")
+    pq.write_table(pa.Table.from_pydict(columns, schema=schema), tmp_path)
+    os.replace(tmp_path, path)
+    return len(chunk), len(valid_smiles)
+
+
+def _check_manifest(output_dir: str, manifest: dict) -> None:
+    # Part files can only be reused if the same input (by path, size and
+    # modification time) is chunked the same way
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    if os.path.exists(path):
+        with open(path) as f:
+            previous = json.load(f)
+        if previous != manifest:
+            raise ValueError(
+                f"{output_dir} holds results of a different job ({previous}); "
+                "use a new output directory"
+            )
+    else:
+        with open(path, "w") as f:
+            json.dump(manifest, f, indent=4)
+
+
+def run_bulk_scoring(
+    input_path: str,
+    output_dir: str,
+    model_dir: str,
+    properties: Optional[list[str]] = None,
+    smiles_column: str = "smiles",
+    workers: Optional[int] = None,
+    chunk_size: int = 10000,
+    batch_size: int = 256,
+    threads_per_worker: int = 1,
+    device: str = "cpu",
+    variant: Optional[str] = None,
+) -> dict:
+    """
+    Score every molecule of a .smi, .csv or .jsonl file with the Chemprop
+    models of the requested properties, writing one Parquet part file per
+    chunk of input molecules to output_dir.
+
+    Molecules are streamed from disk; every worker process loads the models
+    once and predicts all properties of a chunk from a single featurization.
+    The job is resumable: chunks whose part file already exists are skipped,
+    so an interrupted job can be restarted with the same arguments. Resuming
+    is refused if the input file was modified since the job started.
+
+    Args:
+        input_path (str): Input .smi, .csv or .jsonl file.
+        output_dir (str): Directory for the part files.
+        model_dir (str): Directory holding one model directory per property.
+        properties (list[str], optional): Properties to predict (default: all).
+        smiles_column (str): Column (or JSON key) holding the SMILES strings.
+        workers (int, optional): Number of worker processes (default: CPU count
+            divided by threads_per_worker). 0 scores in the calling process.
+        chunk_size (int): Number of molecules per chunk (and part file).
+        batch_size (int): Batch size for inference.
+        threads_per_worker (int): Torch CPU threads per worker.
+        device (str): Device the models run on.
+        variant (str, optional): Exported model variant to use, e.g. "int8".
+    Returns:
+        dict: Number of molecules scored, valid molecules, chunks skipped
+            because they were already done, elapsed seconds and molecules per second.
+    """
+    if not HAS_PYARROW:
+        raise ImportError("Please install the chemprop support packages to use this module.")
+    if not HAS_RDKIT:
+        raise ImportError("Please install the rdkit support packages to use this module.")
+    properties = list(properties or CHEMPROP_PROPERTIES)
+    invalid = set(properties) - set(CHEMPROP_PROPERTIES)
+    if invalid:
+        raise ValueError(f"Invalid properties {invalid}. Must be among {set(CHEMPROP_PROPERTIES)}.")
+    os.makedirs(output_dir, exist_ok=True)
+    input_stat = os.stat(input_path)
+    _check_manifest(output_dir, {
+        "input": os.path.abspath(input_path),
+        "input_size": input_stat.st_size,
+        "input_mtime_ns": input_stat.st_mtime_ns,
+        "smiles_column": smiles_column,
+        "chunk_size": chunk_size,
+        "properties": properties,
+        "variant": variant,
+    })
+    if workers is None:
+        workers = max(1, (os.cpu_count() or 1) // threads_per_worker)
+
+    stats = {"molecules": 0, "valid": 0, "skipped_chunks": 0}
+    start = last_report = time.perf_counter()
+
+    def record(result):
+        nonlocal last_report
+        num_molecules, num_valid = result
+        stats["molecules"] += num_molecules
+        stats["valid"] += num_valid
+        now = time.perf_counter()
+        if now - last_report >= REPORT_INTERVAL:
+            last_report = now
+            logger.info(
+                "Scored {} molecules ({:.0f} molecules/s)",
+                stats["molecules"],
+                stats["molecules"] / (now - start),
+            )
+
+    def todo():
+        for index, chunk in enumerate(_chunked(iter_smiles(input_path, smiles_column), chunk_size)):
+            if os.path.exists(part_path(output_dir, index)):
+                stats["skipped_chunks"] += 1
+                continue
+            yield index, chunk
+
+    init_args = (model_dir, device, variant, threads_per_worker)
+    if workers == 0:
+        _init_worker(*init_args)
+        for index, chunk in todo():
+            record(score_chunk(index, chunk, properties, output_dir, batch_size))
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=init_args) as executor:
+            pending = deque()
+            for index, chunk in todo():
+                pending.append(
+                    executor.submit(score_chunk, index, chunk, properties, output_dir, batch_size)
+                )
+                while pending and (len(pending) >= 2 * workers or pending[0].done()):
+                    record(pending.popleft().result())
+            for future in pending:
+                record(future.result())
+
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = elapsed
+    stats["molecules_per_second"] = stats["molecules"] / elapsed if elapsed > 0 else 0.0
+    logger.info(
+        "Done: {molecules} molecules ({valid} valid, {skipped_chunks} chunks already done) "
+        "in {seconds:.1f} s, {molecules_per_second:.0f} molecules/s",
+        **stats,
+    )
+    return stats
+
+
+@click.command()
+@click.argument("input_path", type=click.Path(exists=True, dir_okay=False))
+@click.argument("output_dir", type=click.Path(file_okay=False))
+@click.option("--model-dir", envvar="CHEMPROP_BASE_PATH", help="Path to chemprop models")
+@click.option("--property", "properties", multiple=True, type=click.Choice(CHEMPROP_PROPERTIES), help="Property to predict (default: all)")
+@click.option("--smiles-column", default="smiles", help="CSV column or JSON key holding the SMILES strings")
+@click.option("--workers", type=int, default=None, help="Number of worker processes (default: CPU count / threads per worker)")
+@click.option("--chunk-size", type=int, default=10000, help="Number of molecules per part file")
+@click.option("--batch-size", type=int, default=256, help="Batch size for inference")
+@click.option("--threads-per-worker", type=int, default=1, help="Torch CPU threads per worker")
+@click.option("--device", default="cpu", help="Device to use: cpu, cuda")
+@click.option("--variant", envvar="CHEMPROP_MODEL_VARIANT", default=None, help="Exported model variant to use, e.g. int8")
+def main(input_path: str, output_dir: str, model_dir: str, properties: tuple, smiles_column: str, workers: Optional[int], chunk_size: int, batch_size: int, threads_per_worker: int, device: str, variant: Optional[str]):
+    """
+    Score the molecules in INPUT_PATH (.smi, .csv or .jsonl) with the Chemprop
+    models, writing Parquet part files to OUTPUT_DIR. Rerun the same command
+    to resume an interrupted job.
+    """
+    if not model_dir:
+        print('CHEMPROP_BASE_PATH environment variable not set!')
+        sys.exit(2)
+    run_bulk_scoring(
+        input_path, output_dir, model_dir, list(properties), smiles_column, workers,
+        chunk_size, batch_size, threads_per_worker, device, variant,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+################################################################################
+## Copyright 2025 Lawrence Livermore National Security, LLC. and Binghamton University.
+## See the top-level LICENSE file for details.
+##
+## SPDX-License-Identifier: Apache-2.0
+################################################################################
+
+from itertools import islice
+from typing import Optional
+import copy
+import json
+import os
+import sys
+import time
+
+import click
+import numpy as np
+from loguru import logger
+
+try:
+    import torch
+    HAS_TORCH = True
+except (ImportError, ModuleNotFoundError) as e:
+    HAS_TORCH = False
+    logger.warning(
+        "Please install the chemprop support packages to use this module."
+        "Install it with: pip install charge[chemprop]",
+    )
+
+from charge.servers import get_chemprop2_preds as chemprop_preds
+from charge.servers.get_chemprop2_preds import CHEMPROP_PROPERTIES
+
+QUANTIZE_MODES = ("none", "ffn", "all")
+
+# Molecules used for the accuracy report when no validation set is given
+DEFAULT_VALIDATION_SMILES = [
+    "CCO", "CCC", "c1ccccc1O", "CC(=O)Oc1ccccc1C(=O)O", "O=CC12C3CC1CCN23",
+    "CN1C=NC2=C1C(=O)N(C(=O)N2C)C", "O=[N+]([O-])c1cc([N+](=O)[O-])cc([N+](=O)[O-])c1",
+    "C1CCCCC1", "OC(=O)CC(O)(CC(=O)O)C(=O)O", "Nc1ncnc2[nH]cnc12", "FC(F)(F)c1ccccc1",
+    "CCN(CC)CCOC(=O)c1ccc(N)cc1", "C#CCO", "ClC(Cl)(Cl)Cl", "OCC(O)CO", "CC(C)Cc1ccc(cc1)C(C)C(=O)O",
+]
+
+
+def exported_model_path(checkpoint_path: str, variant: str) -> str:
+    """Path of the exported artifact of a checkpoint, e.g. best.pt -> best_int8.pt."""
+    root, ext = os.path.splitext(checkpoint_path)
+    return f"{root}_{variant}{ext}"
+
+
+def quantize_model(mpnn: "torch.nn.Module", mode: str = "ffn") -> "torch.nn.Module":
+    """
+    Return a copy of a Chemprop model with dynamic int8 quantization of its
+    linear layers (weights stored as int8, activations quantized on the fly).
+
+    Args:
+        mpnn (torch.nn.Module): A loaded Chemprop model.
+        mode (str): "ffn" quantizes the feed-forward predictor only, "all"
+            also quantizes the message passing layers, "none" only copies.
+    Returns:
+        torch.nn.Module: The quantized model, in eval mode, on the CPU.
+    """
+    if not HAS_TORCH:
+        raise ImportError("Please install the chemprop support packages to use this module.")
+    if mode not in QUANTIZE_MODES:
+        raise ValueError(f"Invalid quantization mode '{mode}'. Must be one of {QUANTIZE_MODES}.")
+    model = copy.deepcopy(mpnn).to("cpu").eval()
+    if mode == "ffn":
+        model.predictor = torch.ao.quantization.quantize_dynamic(
+            model.predictor, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    elif mode == "all":
+        model = torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    return model.eval()
+
+
+def load_exported_model(path: str, device: str = "cpu") -> "torch.nn.Module":
+    """
+    Load a model written by export_model. Quantized models only run on the CPU.
+
+    Args:
+        path (str): Path of the exported artifact.
+        device (str): Device identifier, must be "cpu" for quantized models.
+    Returns:
+        torch.nn.Module: The model, in eval mode.
+    """
+    if not HAS_TORCH:
+        raise ImportError("Please install the chemprop support packages to use this module.")
+    if device != "cpu":
+        raise ValueError("Exported (int8) Chemprop models can only run on the CPU.")
+    model = torch.load(path, map_location="cpu", weights_only=False)
+    return model.eval()
+
+
+def accuracy_report(
+    reference: "torch.nn.Module",
+    exported: "torch.nn.Module",
+    smiles: list[str],
+    batch_size: int = 50,
+) -> dict:
+    """
+    Compare the predictions and CPU inference time of an exported model with
+    the original model on the same featurized molecules.
+
+    Args:
+        reference (torch.nn.Module): The original model.
+        exported (torch.nn.Module): The exported model.
+        smiles (list[str]): Valid SMILES strings to compare on.
+        batch_size (int): Batch size for inference.
+    Returns:
+        dict: Number of molecules, mean and max absolute error, mean absolute
+            error relative to the spread of the reference predictions, and the
+            inference seconds of both models and the resulting speedup.
+    """
+    batches = chemprop_preds.featurize_smiles(smiles, batch_size)
+    start = time.perf_counter()
+    expected = chemprop_preds.predict_featurized(reference, batches, "cpu")
+    reference_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = chemprop_preds.predict_featurized(exported, batches, "cpu")
+    exported_seconds = time.perf_counter() - start
+    errors = np.abs(actual - expected)
+    spread = float(np.std(expected))
+    return {
+        "molecules": len(smiles),
+        "mean_abs_error": float(errors.mean()),
+        "max_abs_error": float(errors.max()),
+        "relative_mean_abs_error": float(errors.mean()) / spread if spread > 0 else 0.0,
+        "reference_seconds": reference_seconds,
+        "exported_seconds": exported_seconds,
+        "speedup": reference_seconds / exported_seconds if exported_seconds > 0 else 0.0,
+    }
+
+
+def export_model(
+    checkpoint_path: str,
+    quantize: str = "ffn",
+    variant: str = "int8",
+    validation_smiles: Optional[list[str]] = None,
+    batch_size: int = 50,
+) -> dict:
+    """
+    Export a Chemprop checkpoint to a (quantized) CPU artifact next to it, and
+    write an accuracy report against the original model to
+    ``<artifact>.report.json``.
+
+    Args:
+        checkpoint_path (str): Path of the original checkpoint.
+        quantize (str): Quantization mode, see quantize_model.
+        variant (str): Artifact name suffix, see exported_model_path.
+        validation_smiles (list[str], optional): Molecules used for the report.
+        batch_size (int): Batch size for the report.
+    Returns:
+        dict: The accuracy report, with the artifact path and the quantization mode.
+    """
+    reference = chemprop_preds.load_chemprop_model(checkpoint_path, "cpu")
+    exported = quantize_model(reference, quantize)
+    output_path = exported_model_path(checkpoint_path, variant)
+    torch.save(exported, output_path)
+
+    report = accuracy_report(
+        reference, exported, validation_smiles or DEFAULT_VALIDATION_SMILES, batch_size
+    )
+    report.update({"artifact": output_path, "quantize": quantize})
+    with open(f"{output_path}.report.json", "w") as f:
+        json.dump(report, f, indent=4)
+    return report
+
+
+@click.command()
+@click.option("--model-dir", envvar="CHEMPROP_BASE_PATH", help="Path to chemprop models")
+@click.option("--property", "properties", multiple=True, type=click.Choice(CHEMPROP_PROPERTIES), help="Property to export (default: all found)")
+@click.option("--quantize", type=click.Choice(QUANTIZE_MODES), default="ffn", help="Layers quantized to int8")
+@click.option("--variant", default="int8", help="Suffix of the exported artifacts (best_<variant>.pt)")
+@click.option("--validation-smiles", type=click.Path(exists=True, dir_okay=False), default=None, help="Molecules (.smi, .csv or .jsonl) for the accuracy report")
+@click.option("--max-molecules", type=int, default=1000, help="Maximum number of validation molecules")
+def main(model_dir: str, properties: tuple, quantize: str, variant: str, validation_smiles: Optional[str], max_molecules: int):
+    """
+    Export the Chemprop checkpoints under CHEMPROP_BASE_PATH to int8-quantized
+    CPU artifacts and report their accuracy against the original models.
+    """
+    if not HAS_TORCH:
+        raise ImportError("Please install the chemprop support packages to use this module.")
+    if not model_dir:
+        print('CHEMPROP_BASE_PATH environment variable not set!')
+        sys.exit(2)
+    smiles = None
+    if validation_smiles:
+        from charge.servers.SMILES_bulk import iter_smiles
+        from charge.servers.cache_utils import get_mol
+
+        valid = (s for _, s in iter_smiles(validation_smiles) if get_mol(s) is not None)
+        smiles = list(islice(valid, max_molecules))
+
+    for prop in properties or CHEMPROP_PROPERTIES:
+        checkpoint_path = os.path.join(model_dir, prop, "model_0", "best.pt")
+        if not os.path.exists(checkpoint_path):
+            logger.warning("No checkpoint for property {} at {}", prop, checkpoint_path)
+            continue
+        report = export_model(checkpoint_path, quantize, variant, smiles)
+        logger.info(
+            "Exported {}: mean abs error {:.4g}, max abs error {:.4g}, speedup {:.2f}x",
+            prop,
+            report["mean_abs_error"],
+            report["max_abs_error"],
+            report["speedup"],
+        )
+
+
+if __name__ == "__main__":
+    main()
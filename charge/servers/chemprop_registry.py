@@ -0,0 +1,262 @@
+################################################################################
+## Copyright 2025 Lawrence Livermore National Security, LLC. and Binghamton University.
+## See the top-level LICENSE file for details.
+##
+## SPDX-License-Identifier: Apache-2.0
+################################################################################
+
+from collections import OrderedDict
+from typing import Any, Optional
+import os
+import threading
+import time
+
+from loguru import logger
+
+from charge.servers import chemprop_export
+from charge.servers import get_chemprop2_preds as chemprop_preds
+from charge.servers.get_chemprop2_preds import CHEMPROP_PROPERTIES
+
+
+def _model_nbytes(model: Any) -> int:
+    """Memory held by the parameters and buffers of a torch module."""
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class ChempropModelRegistry:
+    """
+    Keeps the Chemprop models of each property resident in memory, in eval
+    mode, so that checkpoints are loaded once instead of on every prediction.
+
+    Models are loaded lazily from ``<base_path>/<property>/model_0/best.pt`` on
+    first use. When the parameter memory of the loaded models exceeds the
+    memory budget, the least recently used models are evicted (the model
+    being used is never evicted). Load and inference times are recorded per
+    property and reported by stats().
+
+    Args:
+        base_path (str): Directory holding one subdirectory per property.
+        device (str): Device the models are loaded on, e.g. "cpu" or "cuda:0".
+        memory_budget_mb (float, optional): Memory budget for the loaded models,
+            in MB. None keeps every loaded model.
+        variant (str, optional): Serve the artifacts exported by
+            charge.servers.chemprop_export (``best_<variant>.pt``, CPU only)
+            instead of the original checkpoints.
+    """
+
+    def __init__(
+        self,
+        base_path: str,
+        device: str = "cpu",
+        memory_budget_mb: Optional[float] = 2048,
+        variant: Optional[str] = None,
+    ):
+        self.base_path = base_path
+        self.device = device
+        self.variant = variant
+        self.memory_budget = None if memory_budget_mb is None else int(memory_budget_mb * 1024 * 1024)
+        self._models: OrderedDict = OrderedDict()
+        self._nbytes: dict[str, int] = {}
+        self._timings: dict[str, dict] = {}
+        self._lock = threading.RLock()
+        self.loads = 0
+        self.evictions = 0
+        self.featurize_seconds = 0.0
+
+    def model_path(self, prop: str) -> str:
+        """Path of the checkpoint (or exported artifact) of the model of a property."""
+        if prop not in CHEMPROP_PROPERTIES:
+            raise ValueError(
+                f"Invalid property '{prop}'. Must be one of {set(CHEMPROP_PROPERTIES)}."
+            )
+        checkpoint_path = os.path.join(self.base_path, prop, "model_0", "best.pt")
+        if self.variant:
+            return chemprop_export.exported_model_path(checkpoint_path, self.variant)
+        return checkpoint_path
+
+    def _timing(self, prop: str) -> dict:
+        return self._timings.setdefault(
+            prop,
+            {"loads": 0, "load_seconds": 0.0, "calls": 0, "molecules": 0, "inference_seconds": 0.0},
+        )
+
+    def _record_inference(self, prop: str, num_molecules: int, elapsed: float) -> None:
+        with self._lock:
+            timing = self._timing(prop)
+            timing["calls"] += 1
+            timing["molecules"] += num_molecules
+            timing["inference_seconds"] += elapsed
+
+    def get(self, prop: str) -> Any:
+        """
+        Return the model of a property, loading it if it is not resident.
+
+        Args:
+            prop (str): The property name.
+        Returns:
+            The loaded model, in eval mode.
+        """
+        with self._lock:
+            model = self._models.get(prop)
+            if model is not None:
+                self._models.move_to_end(prop)
+                return model
+
+            start = time.perf_counter()
+            if self.variant:
+                model = chemprop_export.load_exported_model(self.model_path(prop), self.device)
+            else:
+                model = chemprop_preds.load_chemprop_model(self.model_path(prop), self.device)
+            elapsed = time.perf_counter() - start
+            timing = self._timing(prop)
+            timing["loads"] += 1
+            timing["load_seconds"] += elapsed
+            self.loads += 1
+            self._models[prop] = model
+            self._nbytes[prop] = _model_nbytes(model)
+            logger.info(
+                "Loaded chemprop model '{}' ({:.1f} MB) in {:.2f} s",
+                prop,
+                self._nbytes[prop] / 1e6,
+                elapsed,
+            )
+            self._evict(keep=prop)
+            return model
+
+    def _evict(self, keep: str) -> None:
+        if self.memory_budget is None:
+            return
+        while self.memory_bytes() > self.memory_budget and len(self._models) > 1:
+            prop = next(iter(self._models))
+            if prop == keep:
+                break
+            del self._models[prop]
+            del self._nbytes[prop]
+            self.evictions += 1
+            logger.info("Evicted chemprop model '{}'", prop)
+
+    def memory_bytes(self) -> int:
+        """Parameter memory of the resident models, in bytes."""
+        with self._lock:
+            return sum(self._nbytes.values())
+
+    def predict(self, prop: str, smiles: list[str], batch_size: int = 50) -> list[list[float]]:
+        """
+        Predict a property for a list of SMILES with the resident model.
+
+        Args:
+            prop (str): The property name.
+            smiles (list[str]): The input SMILES strings.
+            batch_size (int): Batch size for inference.
+        Returns:
+            list[list[float]]: For each input SMILES, the model outputs.
+        """
+        model = self.get(prop)
+        start = time.perf_counter()
+        preds = chemprop_preds.predict_with_model(model, smiles, self.device, batch_size)
+        self._record_inference(prop, len(smiles), time.perf_counter() - start)
+        return preds
+
+    def predict_many(
+        self, props: list[str], smiles: list[str], batch_size: int = 50
+    ) -> dict[str, list[list[float]]]:
+        """
+        Predict several properties for a list of SMILES. The molecules are
+        featurized once and every property model runs on the same batches.
+
+        Args:
+            props (list[str]): The property names.
+            smiles (list[str]): The input SMILES strings (must be valid).
+            batch_size (int): Batch size for inference.
+        Returns:
+            dict[str, list[list[float]]]: For each property, the model outputs
+                of each input SMILES.
+        """
+        models = {prop: self.get(prop) for prop in props}
+        start = time.perf_counter()
+        batches = chemprop_preds.featurize_smiles(smiles, batch_size)
+        with self._lock:
+            self.featurize_seconds += time.perf_counter() - start
+        preds = {}
+        for prop, model in models.items():
+            start = time.perf_counter()
+            preds[prop] = chemprop_preds.predict_featurized(model, batches, self.device).tolist()
+            self._record_inference(prop, len(smiles), time.perf_counter() - start)
+        return preds
+
+    def unload(self, prop: Optional[str] = None) -> None:
+        """Unload the model of a property, or all models."""
+        with self._lock:
+            for name in [prop] if prop else list(self._models):
+                self._models.pop(name, None)
+                self._nbytes.pop(name, None)
+
+    def stats(self) -> dict:
+        """
+        Return the resident models, memory use and load/inference timings.
+
+        Returns:
+            dict: "resident" (list of properties, least recently used first),
+                "memory_mb", "memory_budget_mb", "loads", "evictions",
+                "featurize_seconds" (multi-property featurization) and
+                "timings" (per property: loads, load_seconds, calls,
+                molecules and inference_seconds).
+        """
+        with self._lock:
+            return {
+                "resident": list(self._models),
+                "memory_mb": self.memory_bytes() / (1024 * 1024),
+                "memory_budget_mb": (
+                    None if self.memory_budget is None else self.memory_budget / (1024 * 1024)
+                ),
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "featurize_seconds": self.featurize_seconds,
+                "timings": {prop: dict(t) for prop, t in self._timings.items()},
+            }
+
+
+_REGISTRY: Optional[ChempropModelRegistry] = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_model_registry() -> ChempropModelRegistry:
+    """
+    Return the process-wide model registry, configured from the
+    CHEMPROP_BASE_PATH, CHEMPROP_SERVER_DEVICE (default "cpu"),
+    CHARGE_CHEMPROP_MEMORY_MB (default 2048), CHEMPROP_NUM_THREADS
+    (torch CPU threads, default: torch default) and CHEMPROP_MODEL_VARIANT
+    (exported artifacts to serve, e.g. "int8"; default: original checkpoints)
+    environment variables.
+
+    Raises:
+        ValueError: If CHEMPROP_BASE_PATH is not set.
+    """
+    global _REGISTRY
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None:
+            base_path = os.getenv("CHEMPROP_BASE_PATH")
+            if not base_path:
+                raise ValueError("CHEMPROP_BASE_PATH environment variable not set!")
+            num_threads = os.getenv("CHEMPROP_NUM_THREADS")
+            if num_threads:
+                chemprop_preds.set_num_threads(int(num_threads))
+            _REGISTRY = ChempropModelRegistry(
+                base_path,
+                device=os.getenv("CHEMPROP_SERVER_DEVICE", "cpu"),
+                memory_budget_mb=float(os.getenv("CHARGE_CHEMPROP_MEMORY_MB", "2048")),
+                variant=os.getenv("CHEMPROP_MODEL_VARIANT") or None,
+            )
+        return _REGISTRY
+
+
+def chemprop_model_stats() -> dict:
+    """
+    Report the Chemprop models currently loaded in memory, their memory use,
+    and the model load and inference timings per property.
+
+    Returns:
+        dict: The registry statistics, see ChempropModelRegistry.stats.
+    """
+    return get_model_registry().stats()
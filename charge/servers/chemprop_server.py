@@ -0,0 +1,56 @@
+################################################################################
+## Copyright 2025 Lawrence Livermore National Security, LLC. and Binghamton University.
+## See the top-level LICENSE file for details.
+##
+## SPDX-License-Identifier: Apache-2.0
+################################################################################
+
+from mcp.server.fastmcp import FastMCP
+from loguru import logger
+
+from charge.servers.server_utils import add_server_arguments
+from charge.servers.server_logging import configure_server_logging
+from charge.servers.property_cache import set_property_cache
+import argparse
+
+parser = argparse.ArgumentParser()
+add_server_arguments(parser)
+parser.add_argument(
+    "--max-batch-size",
+    type=int,
+    default=64,
+    help="Maximum number of concurrent predictions of a property run as one batch",
+)
+parser.add_argument(
+    "--max-wait-ms",
+    type=float,
+    default=10.0,
+    help="Maximum time a prediction waits for other requests to fill its batch",
+)
+args = parser.parse_args()
+configure_server_logging(args.log_mode, args.log_sample_every, args.log_enqueue)
+if args.property_cache:
+    set_property_cache(args.property_cache)
+
+chemprop_mcp = FastMCP(
+    "[Chemprop] Molecular property prediction MCP Server",
+    port=args.port,
+    website_url=f"{args.host}",
+)
+
+logger.info("[Chemprop] Starting Molecular property prediction MCP Server")
+
+import charge.servers.molecular_property_utils as properties
+from charge.servers.chemprop_registry import chemprop_model_stats
+
+properties.CHEMPROP_BATCHER.max_batch_size = args.max_batch_size
+properties.CHEMPROP_BATCHER.max_wait = args.max_wait_ms / 1000.0
+
+chemprop_mcp.tool()(properties.chemprop_predict)
+
+chemprop_mcp.tool()(properties.chemprop_predict_properties)
+
+chemprop_mcp.tool()(chemprop_model_stats)
+
+if __name__ == "__main__":
+    chemprop_mcp.run(transport=args.transport)
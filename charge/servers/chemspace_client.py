@@ -0,0 +1,323 @@
+################################################################################
+## Copyright 2025 Lawrence Livermore National Security, LLC. and Binghamton University.
+## See the top-level LICENSE file for details.
+##
+## SPDX-License-Identifier: Apache-2.0
+################################################################################
+
+from typing import Optional
+import asyncio
+import math
+import os
+import threading
+
+from loguru import logger
+
+try:
+    import httpx
+    HAS_HTTPX = True
+except (ImportError, ModuleNotFoundError) as e:
+    HAS_HTTPX = False
+    logger.warning(
+        "Please install the chemprice support packages to use this module."
+        "Install it with: pip install charge[chemprice]",
+    )
+
+CHEMSPACE_API_URL = os.getenv("CHEMSPACE_API_URL", "https://api.chem-space.com")
+
+# Building block, screening and custom synthesis catalogs (as searched by chemprice)
+CHEMSPACE_CATEGORIES = "CSSB,CSSS,CSMB,CSMS,CSCS"
+
+# Grams per package unit; offers in other units (e.g. micromol) are ignored
+GRAMS_PER_UNIT = {"mg": 1e-3, "g": 1.0, "kg": 1e3}
+
+
+class TokenBucket:
+    """
+    Asynchronous token-bucket rate limiter: up to capacity requests can be
+    made at once, after which requests are admitted at rate per second.
+
+    Args:
+        rate (float): Tokens added per second.
+        capacity (float, optional): Maximum number of stored tokens (burst
+            size), defaults to rate.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(1.0, capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        loop = asyncio.get_running_loop()
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # Callers are admitted one at a time, in order
+        async with self._lock:
+            while True:
+                now = loop.time()
+                if self._updated is not None:
+                    elapsed = now - self._updated
+                    self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def best_usd_per_g(offers: list[dict]) -> float:
+    """
+    Lowest price per gram over the packages of a list of ChemSpace offers.
+
+    Args:
+        offers (list[dict]): Offers as returned in the "offers" field of a
+            ChemSpace search result.
+    Returns:
+        float: The lowest USD/g, NaN if no package has a USD price and a mass.
+    """
+    best = math.nan
+    for offer in offers:
+        for price in offer.get("prices", []):
+            grams = GRAMS_PER_UNIT.get(str(price.get("uom", "")).lower())
+            usd = price.get("priceUsd")
+            pack = price.get("pack")
+            if grams is None or usd is None or not pack:
+                continue
+            usd_per_g = float(usd) / (float(pack) * grams)
+            if math.isnan(best) or usd_per_g < best:
+                best = usd_per_g
+    return best
+
+
+class ChemSpaceClient:
+    """
+    Long-lived asynchronous client of the ChemSpace search API.
+
+    The client keeps one authenticated session: a single pooled HTTP
+    connection set with keep-alive, and an access token that is requested once
+    and refreshed when it expires or is rejected. Requests run concurrently, at
+    most max_concurrency at a time, and are admitted by a token bucket so the
+    vendor quota is respected; throttled (HTTP 429) requests are retried after
+    the delay the server asks for.
+
+    Args:
+        api_key (str): ChemSpace API key.
+        base_url (str): API root, e.g. a local stand-in server for testing.
+        rate (float): Maximum sustained requests per second.
+        burst (float, optional): Maximum requests in a burst, defaults to rate.
+        max_concurrency (int): Maximum number of requests in flight.
+        timeout (float): Request timeout in seconds.
+        max_retries (int): Retries of a throttled or failed request.
+        ship_to_country (str): Country code the offers are priced for.
+        categories (str): Comma separated ChemSpace catalog categories.
+        transport (httpx.AsyncBaseTransport, optional): Custom transport,
+            e.g. httpx.MockTransport in tests.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = CHEMSPACE_API_URL,
+        rate: float = 5.0,
+        burst: Optional[float] = None,
+        max_concurrency: int = 8,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        ship_to_country: str = "US",
+        categories: str = CHEMSPACE_CATEGORIES,
+        transport: Optional["httpx.AsyncBaseTransport"] = None,
+    ):
+        if not HAS_HTTPX:
+            raise ImportError("Please install the chemprice support packages to use this module.")
+        self.api_key = api_key
+        self.max_retries = max_retries
+        self.ship_to_country = ship_to_country
+        self.categories = categories
+        self.max_concurrency = max_concurrency
+        self._bucket = TokenBucket(rate, burst)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._token: Optional[str] = None
+        self._token_expires = 0.0
+        self._auth_lock: Optional[asyncio.Lock] = None
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            transport=transport,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+        )
+        self.requests = 0
+
+    async def __aenter__(self) -> "ChemSpaceClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def _access_token(self, rejected: Optional[str] = None) -> str:
+        # A rejected token is replaced once, however many requests saw it fail
+        loop = asyncio.get_running_loop()
+        if self._auth_lock is None:
+            self._auth_lock = asyncio.Lock()
+        async with self._auth_lock:
+            if (
+                self._token is None
+                or self._token == rejected
+                or loop.time() >= self._token_expires
+            ):
+                response = await self._client.get(
+                    "/auth/token",
+                    headers={
+                        "Accept": "application/json",
+                        "Authorization": f"Bearer {self.api_key}",
+                    },
+                )
+                response.raise_for_status()
+                data = response.json()
+                self._token = data["access_token"]
+                # Refresh a minute early rather than racing the expiry
+                self._token_expires = loop.time() + float(data.get("expires_in", 3600)) - 60
+            return self._token
+
+    async def _request(self, method: str, path: str, **kwargs) -> "httpx.Response":
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        rejected = None
+        for attempt in range(self.max_retries + 1):
+            token = await self._access_token(rejected)
+            await self._bucket.acquire()
+            async with self._semaphore:
+                self.requests += 1
+                try:
+                    response = await self._client.request(
+                        method,
+                        path,
+                        headers={
+                            "Accept": "application/json; version=4.0",
+                            "Authorization": f"Bearer {token}",
+                        },
+                        **kwargs,
+                    )
+                except httpx.TransportError as e:
+                    if attempt == self.max_retries:
+                        raise
+                    logger.warning("ChemSpace request failed ({}), retrying", e)
+                    await asyncio.sleep(2**attempt)
+                    continue
+            if response.status_code == 401 and rejected is None:
+                rejected = token
+                continue
+            if response.status_code == 429 or response.status_code >= 500:
+                if attempt == self.max_retries:
+                    response.raise_for_status()
+                delay = float(response.headers.get("Retry-After", 2**attempt))
+                logger.warning(
+                    "ChemSpace returned {}, retrying in {:.1f} s", response.status_code, delay
+                )
+                await asyncio.sleep(delay)
+                continue
+            response.raise_for_status()
+            return response
+        response.raise_for_status()
+        return response
+
+    async def search_exact(self, smiles: str) -> list[dict]:
+        """
+        Return the vendor offers of a molecule.
+
+        Args:
+            smiles (str): SMILES string of the molecule.
+        Returns:
+            list[dict]: The offers of all matching catalog entries.
+        """
+        response = await self._request(
+            "POST",
+            "/v4/search/exact",
+            params={
+                "shipToCountry": self.ship_to_country,
+                "count": 1,
+                "page": 1,
+                "categories": self.categories,
+            },
+            data={"SMILES": smiles},
+        )
+        if response.status_code == 204:
+            return []
+        offers = []
+        for item in response.json().get("items", []):
+            offers.extend(item.get("offers", []))
+        return offers
+
+    async def best_price(self, smiles: str) -> float:
+        """Lowest price of a molecule in USD/g, NaN if no vendor sells it."""
+        return best_usd_per_g(await self.search_exact(smiles))
+
+    async def best_prices(self, SMILES_list: list[str], chunk_size: int = 100) -> list[float]:
+        """
+        Lowest price in USD/g of each molecule, NaN if no vendor sells it.
+        Duplicate SMILES are looked up once, and the lookups are issued
+        concurrently chunk_size molecules at a time.
+
+        Args:
+            SMILES_list (list[str]): SMILES strings to price.
+            chunk_size (int): Number of lookups scheduled together.
+        Returns:
+            list[float]: The prices, in the order of SMILES_list.
+        """
+        unique = list(dict.fromkeys(SMILES_list))
+        prices = {}
+        for start in range(0, len(unique), chunk_size):
+            chunk = unique[start:start + chunk_size]
+            results = await asyncio.gather(*[self.best_price(smiles) for smiles in chunk])
+            prices.update(zip(chunk, results))
+        return [prices[smiles] for smiles in SMILES_list]
+
+
+_CLIENT: Optional[ChemSpaceClient] = None
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_chemspace_client() -> tuple[ChemSpaceClient, asyncio.AbstractEventLoop]:
+    """
+    Return the process-wide ChemSpace client and the background event loop it
+    runs on, creating them on first use. Configured by the CHEMSPACE_API_KEY,
+    CHEMSPACE_API_URL, CHEMSPACE_RATE_LIMIT (requests per second) and
+    CHEMSPACE_MAX_CONCURRENCY environment variables.
+    """
+    global _CLIENT, _LOOP
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            api_key = os.getenv("CHEMSPACE_API_KEY")
+            if not api_key:
+                raise ValueError("CHEMSPACE_API_KEY environment variable not set!")
+            _LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_LOOP.run_forever, name="chemspace-client", daemon=True).start()
+            _CLIENT = ChemSpaceClient(
+                api_key,
+                base_url=CHEMSPACE_API_URL,
+                rate=float(os.getenv("CHEMSPACE_RATE_LIMIT", 5.0)),
+                max_concurrency=int(os.getenv("CHEMSPACE_MAX_CONCURRENCY", 8)),
+            )
+        return _CLIENT, _LOOP
+
+
+def get_best_prices(SMILES_list: list[str]) -> list[float]:
+    """
+    Synchronous entry point: lowest price in USD/g of each molecule (NaN if
+    no vendor sells it), looked up with the process-wide client. The lookups
+    run on the client's own event loop, so this can be called from any thread.
+    """
+    client, loop = get_chemspace_client()
+    return asyncio.run_coroutine_threadsafe(client.best_prices(SMILES_list), loop).result()
@@ -0,0 +1,459 @@
+################################################################################
+## Copyright 2025 Lawrence Livermore National Security, LLC. and Binghamton University.
+## See the top-level LICENSE file for details.
+##
+## SPDX-License-Identifier: Apache-2.0
+################################################################################
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Optional
+import os
+import sqlite3
+import threading
+import time
+
+import click
+import numpy as np
+from loguru import logger
+
+try:
+    from rdkit import Chem, RDLogger, rdBase
+    from rdkit.Chem import AllChem
+    HAS_RDKIT = True
+except (ImportError, ModuleNotFoundError) as e:
+    HAS_RDKIT = False
+    logger.warning(
+        "Please install the rdkit support packages to use this module."
+        "Install it with: pip install charge[rdkit]",
+    )
+
+from charge.servers.cache_utils import get_mol
+
+COORDS_FILE = "coords.f32"
+INDEX_FILE = "index.db"
+
+# ETKDG random seed of the first embedding attempt; retries after a failed
+# embedding use the following seeds
+EMBED_SEED = 0xF00D
+
+# Embedding attempts of a molecule before the store stops retrying it
+MAX_EMBED_ATTEMPTS = 3
+
+_MISSING = object()
+
+
+def embedding_params(num_conformers: int) -> str:
+    """Key of the embedding settings of embed_conformers, part of the store key."""
+    return f"etkdg-uff500:seed={EMBED_SEED}:n={num_conformers}:rdkit={rdBase.rdkitVersion}"
+
+
+def embed_conformers(mol, num_conformers: int, seed: int = EMBED_SEED):
+    """
+    Copy of mol with hydrogens added and num_conformers UFF-optimized ETKDG
+    conformers, embedded with the given random seed so the coordinates are
+    reproducible. Returns None if no conformer could be embedded.
+    """
+    mol = Chem.AddHs(mol)
+    params = AllChem.ETKDG()
+    params.randomSeed = seed
+    if num_conformers == 1:
+        AllChem.EmbedMolecule(mol, params)
+        if mol.GetNumConformers() == 0:
+            return None
+        AllChem.UFFOptimizeMolecule(mol, maxIters=500)
+        return mol
+    conf_ids = AllChem.EmbedMultipleConfs(mol, numConfs=num_conformers, params=params)
+    if len(conf_ids) == 0:
+        return None
+    AllChem.UFFOptimizeMoleculeConfs(mol, maxIters=500)
+    return mol
+
+
+class ConformerStore:
+    """
+    On-disk store of embedded conformers keyed by canonical SMILES and
+    embedding parameters.
+
+    Coordinates are appended as float32 to a flat binary file that is read
+    through a memory map; a SQLite index maps each (SMILES, parameters) key to
+    its offset, atom count and conformer count. Molecules are rebuilt from the
+    canonical SMILES with explicit hydrogens, so stored coordinates follow the
+    atom order of ``Chem.AddHs(Chem.MolFromSmiles(canonical_smiles))``.
+    Failed embeddings are not stored as results: they are counted in a
+    separate table and retried with the next random seed, up to
+    MAX_EMBED_ATTEMPTS attempts. Several processes can share a store: appends
+    are serialized by the index's write lock.
+
+    Args:
+        directory (str): Directory holding the coordinate file and the index.
+    """
+
+    def __init__(self, directory: str):
+        if not HAS_RDKIT:
+            raise ImportError("Please install the rdkit support packages to use this module.")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._coords_path = os.path.join(directory, COORDS_FILE)
+        open(self._coords_path, "ab").close()
+        self._coords = None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(directory, INDEX_FILE),
+            timeout=30.0,
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS conformers ("
+            "smiles TEXT NOT NULL, params TEXT NOT NULL, offset INTEGER NOT NULL, "
+            "num_atoms INTEGER NOT NULL, num_conformers INTEGER NOT NULL, "
+            "PRIMARY KEY (smiles, params))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS failures ("
+            "smiles TEXT NOT NULL, params TEXT NOT NULL, attempts INTEGER NOT NULL, "
+            "updated_at REAL NOT NULL, PRIMARY KEY (smiles, params))"
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM conformers").fetchone()[0]
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM conformers WHERE smiles = ? AND params = ?", key
+            ).fetchone() is not None
+
+    def _read(self, offset: int, count: int) -> "np.ndarray":
+        end = offset + count
+        if self._coords is None or self._coords.shape[0] < end:
+            # Remap after appends (by this or another process)
+            self._coords = np.memmap(self._coords_path, dtype=np.float32, mode="r")
+        return np.asarray(self._coords[offset:end])
+
+    def get_coordinates(self, smiles: str, params: str):
+        """
+        Stored coordinates of a molecule.
+
+        Args:
+            smiles (str): Canonical SMILES of the molecule.
+            params (str): Embedding parameters, see embedding_params.
+        Returns:
+            np.ndarray of shape (conformers, atoms, 3), None for a failed
+            embedding recorded by older versions of the store, or _MISSING if
+            it is not in the store.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT offset, num_atoms, num_conformers FROM conformers "
+                "WHERE smiles = ? AND params = ?",
+                (smiles, params),
+            ).fetchone()
+            if row is None:
+                return _MISSING
+            offset, num_atoms, num_conformers = row
+            if num_conformers == 0:
+                return None
+            coords = self._read(offset, num_conformers * num_atoms * 3)
+        return coords.reshape(num_conformers, num_atoms, 3)
+
+    def put_coordinates(self, smiles: str, params: str, coords: "np.ndarray") -> None:
+        """
+        Store the coordinates of a molecule and clear its failed attempts.
+
+        Args:
+            smiles (str): Canonical SMILES of the molecule.
+            params (str): Embedding parameters, see embedding_params.
+            coords (np.ndarray): Array of shape (conformers, atoms, 3).
+        """
+        data = np.ascontiguousarray(coords, dtype=np.float32)
+        with self._lock:
+            # BEGIN IMMEDIATE takes the database write lock, which also
+            # serializes appends to the coordinate file between processes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                exists = self._conn.execute(
+                    "SELECT 1 FROM conformers WHERE smiles = ? AND params = ?", (smiles, params)
+                ).fetchone()
+                if exists is None:
+                    with open(self._coords_path, "ab") as f:
+                        offset = f.seek(0, os.SEEK_END) // 4
+                        f.write(data.tobytes())
+                    self._conn.execute(
+                        "INSERT INTO conformers VALUES (?, ?, ?, ?, ?)",
+                        (smiles, params, offset, data.shape[1], data.shape[0]),
+                    )
+                self._conn.execute(
+                    "DELETE FROM failures WHERE smiles = ? AND params = ?", (smiles, params)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def failed_attempts(self, smiles: str, params: str) -> int:
+        """Number of failed embedding attempts of a molecule not embedded yet."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts FROM failures WHERE smiles = ? AND params = ?", (smiles, params)
+            ).fetchone()
+        return 0 if row is None else row[0]
+
+    def record_failure(self, smiles: str, params: str) -> int:
+        """
+        Count a failed embedding attempt of a molecule.
+
+        Args:
+            smiles (str): Canonical SMILES of the molecule.
+            params (str): Embedding parameters, see embedding_params.
+        Returns:
+            int: The number of failed attempts so far.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO failures VALUES (?, ?, 1, ?) ON CONFLICT (smiles, params) "
+                "DO UPDATE SET attempts = attempts + 1, updated_at = excluded.updated_at",
+                (smiles, params, time.time()),
+            )
+            return self._conn.execute(
+                "SELECT attempts FROM failures WHERE smiles = ? AND params = ?", (smiles, params)
+            ).fetchone()[0]
+
+    def get(self, smiles: str, num_conformers: int = 1):
+        """
+        Return a molecule with its stored conformers, embedding and storing
+        them first if needed.
+
+        Args:
+            smiles (str): The input SMILES string.
+            num_conformers (int): Number of conformers.
+        Returns:
+            Chem.Mol or None: The canonical molecule with explicit hydrogens and
+                its conformers, or None if the SMILES is invalid or could not
+                be embedded (this time, or in MAX_EMBED_ATTEMPTS attempts).
+        """
+        mol = get_mol(smiles)
+        if mol is None:
+            return None
+        canonical = Chem.MolToSmiles(mol)
+        params = embedding_params(num_conformers)
+        coords = self.get_coordinates(canonical, params)
+        if coords is not _MISSING:
+            return None if coords is None else molecule_with_conformers(canonical, coords)
+        attempts = self.failed_attempts(canonical, params)
+        if attempts >= MAX_EMBED_ATTEMPTS:
+            return None
+        embedded = embed_conformers(
+            Chem.MolFromSmiles(canonical), num_conformers, seed=EMBED_SEED + attempts
+        )
+        if embedded is None:
+            self.record_failure(canonical, params)
+            return None
+        self.put_coordinates(canonical, params, conformer_coordinates(embedded))
+        return embedded
+
+    def stats(self) -> dict:
+        """Number of stored molecules, molecules with failed embeddings and coordinate bytes."""
+        with self._lock:
+            molecules = self._conn.execute("SELECT COUNT(*) FROM conformers").fetchone()[0]
+            failed = self._conn.execute("SELECT COUNT(*) FROM failures").fetchone()[0]
+        return {
+            "molecules": molecules,
+            "failed": failed,
+            "coordinate_bytes": os.path.getsize(self._coords_path),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._coords = None
+            self._conn.close()
+
+
+def conformer_coordinates(mol) -> "np.ndarray":
+    """Coordinates of all conformers of mol, as an array of shape (conformers, atoms, 3)."""
+    return np.stack([conf.GetPositions() for conf in mol.GetConformers()]).astype(np.float32)
+
+
+def molecule_with_conformers(canonical_smiles: str, coords: "np.ndarray"):
+    """Rebuild the molecule with explicit hydrogens and the given conformers."""
+    mol = Chem.AddHs(Chem.MolFromSmiles(canonical_smiles))
+    if mol.GetNumAtoms() != coords.shape[1]:
+        raise ValueError(f"Stored conformers of {canonical_smiles} do not match its atoms")
+    for positions in coords:
+        conf = Chem.Conformer(mol.GetNumAtoms())
+        conf.SetPositions(positions.astype(np.float64))
+        conf.Set3D(True)
+        mol.AddConformer(conf, assignId=True)
+    return mol
+
+
+_CONFORMER_STORE: Optional[ConformerStore] = None
+
+
+def set_conformer_store(directory: Optional[str]) -> None:
+    """
+    Set the process-wide conformer store used by the 3D property calculators.
+
+    Args:
+        directory (str, optional): Store directory. None disables the store.
+    """
+    global _CONFORMER_STORE
+    if _CONFORMER_STORE is not None:
+        _CONFORMER_STORE.close()
+    _CONFORMER_STORE = ConformerStore(directory) if directory else None
+
+
+def get_conformer_store() -> Optional[ConformerStore]:
+    """Return the process-wide conformer store, or None if it is disabled."""
+    return _CONFORMER_STORE
+
+
+def get_conformers(smiles: str, mol, num_conformers: int = 1):
+    """
+    Embedded conformers of a molecule, from the process-wide store if enabled.
+    Without a store, mol is embedded directly.
+
+    Args:
+        smiles (str): The input SMILES string.
+        mol (Chem.Mol): The parsed molecule.
+        num_conformers (int): Number of conformers.
+    Returns:
+        Chem.Mol or None: The molecule with explicit hydrogens and conformers,
+            or None if it could not be embedded.
+    """
+    store = _CONFORMER_STORE
+    if store is None:
+        return embed_conformers(mol, num_conformers)
+    return store.get(smiles, num_conformers)
+
+
+if os.getenv("CHARGE_CONFORMER_STORE"):
+    set_conformer_store(os.getenv("CHARGE_CONFORMER_STORE"))
+
+
+def _embed_chunk(
+    chunk: list[tuple[str, int]], num_conformers: int
+) -> list[tuple[str, Optional["np.ndarray"]]]:
+    # Worker side of the bulk pre-embedding: (canonical SMILES, seed) pairs in,
+    # canonical SMILES and coordinates out
+    RDLogger.DisableLog("rdApp.*")
+    results = []
+    for canonical, seed in chunk:
+        try:
+            embedded = embed_conformers(Chem.MolFromSmiles(canonical), num_conformers, seed)
+        except Exception:
+            embedded = None
+        results.append((canonical, None if embedded is None else conformer_coordinates(embedded)))
+    return results
+
+
+def pre_embed(
+    input_path: str,
+    directory: str,
+    num_conformers: int = 1,
+    smiles_column: str = "smiles",
+    workers: Optional[int] = None,
+    chunk_size: int = 100,
+) -> dict:
+    """
+    Embed the molecules of a .smi, .csv or .jsonl file in parallel and add
+    them to a conformer store. Molecules already in the store, molecules that
+    failed MAX_EMBED_ATTEMPTS times and invalid SMILES are skipped; other
+    failed molecules are retried with their next seed.
+
+    Args:
+        input_path (str): The input file.
+        directory (str): The conformer store directory.
+        num_conformers (int): Number of conformers per molecule.
+        smiles_column (str): Column (or JSON key) holding the SMILES strings.
+        workers (int, optional): Number of worker processes (default: CPU count).
+        chunk_size (int): Number of molecules sent to a worker at a time.
+    Returns:
+        dict: Number of molecules embedded, failed and skipped, and elapsed seconds.
+    """
+    from charge.servers.SMILES_bulk import _chunked, iter_smiles
+
+    store = ConformerStore(directory)
+    params = embedding_params(num_conformers)
+    workers = workers or os.cpu_count() or 1
+    stats = {"embedded": 0, "failed": 0, "skipped": 0}
+
+    def canonical_smiles():
+        seen = set()
+        for _, smiles in iter_smiles(input_path, smiles_column):
+            mol = Chem.MolFromSmiles(smiles)
+            if mol is None:
+                stats["skipped"] += 1
+                continue
+            canonical = Chem.MolToSmiles(mol)
+            if canonical in seen or (canonical, params) in store:
+                stats["skipped"] += 1
+                continue
+            seen.add(canonical)
+            attempts = store.failed_attempts(canonical, params)
+            if attempts >= MAX_EMBED_ATTEMPTS:
+                stats["skipped"] += 1
+                continue
+            yield canonical, EMBED_SEED + attempts
+
+    def write(results):
+        for canonical, coords in results:
+            if coords is None:
+                store.record_failure(canonical, params)
+                stats["failed"] += 1
+            else:
+                store.put_coordinates(canonical, params, coords)
+                stats["embedded"] += 1
+
+    RDLogger.DisableLog("rdApp.*")
+    start = time.perf_counter()
+    worker_fn = partial(_embed_chunk, num_conformers=num_conformers)
+    with ProcessPoolExecutor(workers) as executor:
+        pending = deque()
+        for chunk in _chunked(canonical_smiles(), chunk_size):
+            pending.append(executor.submit(worker_fn, chunk))
+            while pending and (len(pending) >= 2 * workers or pending[0].done()):
+                write(pending.popleft().result())
+        for future in pending:
+            write(future.result())
+    store.close()
+
+    stats["seconds"] = time.perf_counter() - start
+    logger.info(
+        "Embedded {embedded} molecules ({failed} failed, {skipped} skipped) in {seconds:.1f} s",
+        **stats,
+    )
+    return stats
+
+
+@click.group()
+def main():
+    """Manage the ChARGe conformer store."""
+
+
+@main.command()
+@click.argument("input_path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--store", "directory", envvar="CHARGE_CONFORMER_STORE", required=True, help="Conformer store directory")
+@click.option("--num-conformers", type=int, default=1, help="Conformers per molecule (1 is used by get_density)")
+@click.option("--smiles-column", default="smiles", help="CSV column or JSON key holding the SMILES strings")
+@click.option("--workers", type=int, default=None, help="Number of worker processes (default: CPU count)")
+@click.option("--chunk-size", type=int, default=100, help="Number of molecules per worker task")
+def embed(input_path: str, directory: str, num_conformers: int, smiles_column: str, workers: Optional[int], chunk_size: int):
+    """Pre-embed the molecules in INPUT_PATH (.smi, .csv or .jsonl) into the store."""
+    pre_embed(input_path, directory, num_conformers, smiles_column, workers, chunk_size)
+
+
+@main.command()
+@click.option("--store", "directory", envvar="CHARGE_CONFORMER_STORE", required=True, help="Conformer store directory")
+def stats(directory: str):
+    """Show the number of stored molecules and the size of the store."""
+    for key, value in ConformerStore(directory).stats().items():
+        click.echo(f"{key}\t{value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,6 @@ try:
     import click
     import torch
     import pandas as pd
-    from lightning import pytorch as pl
     from chemprop import data, models, featurizers
     from chemprop.models import MPNN
     HAS_CHEMPROP = True
@@ -16,19 +15,193 @@ except (ImportError, ModuleNotFoundError) as e:
         "Please install the chemprop support packages to use this module."
         "Install it with: pip install charge[chemprop]",
     )
-from typing import List
+from typing import Iterable, List, Optional
 import numpy as np
 import os, sys
 
+# Properties with a pre-trained model under CHEMPROP_BASE_PATH/<property>/model_0
+CHEMPROP_PROPERTIES = (
+    "density", "hof", "alpha", "cv", "gap", "homo", "lumo", "mu", "r2", "zpve", "lipo",
+)
+
+def set_num_threads(num_threads: Optional[int]) -> None:
+    """
+    Set the number of intra-op CPU threads used by torch for inference.
+
+    Parameters
+    ----------
+    num_threads : int or None
+        Number of threads, None or 0 keeps the torch default.
+    """
+    if not num_threads:
+        return
+    if not HAS_CHEMPROP:
+        raise ImportError("Please install the chemprop support packages to use this module.")
+    torch.set_num_threads(num_threads)
+
+
+def load_chemprop_model(checkpoint_path: str, device: str = "cpu") -> "MPNN":
+    """
+    Load a Chemprop v2 model from a checkpoint, in eval mode.
+
+    Parameters
+    ----------
+    checkpoint_path : str
+        Path to the trained model checkpoint.
+    device : str, optional (default "cpu")
+        Device identifier, e.g. "cpu" or "cuda:0".
+
+    Returns
+    -------
+    MPNN
+        The loaded model.
+    """
+    if not HAS_CHEMPROP:
+        raise ImportError("Please install the chemprop support packages to use this module.")
+    mpnn = MPNN.load_from_file(checkpoint_path, map_location=device)
+    mpnn.to(device)
+    mpnn.eval()
+    return mpnn
+
+
+def featurize_smiles(smiles: list[str], batch_size: int = 50) -> list:
+    """
+    Featurize a list of SMILES into batched molecular graphs once, so that the
+    same batches can be fed to several models with predict_featurized.
+
+    Parameters
+    ----------
+    smiles : list[str]
+        A list of valid SMILES strings.
+    batch_size : int, optional
+        Number of molecules per batch.
+
+    Returns
+    -------
+    list
+        The collated batches (BatchMolGraph, V_d, X_d, ...), in input order.
+    """
+    return list(_build_loader(smiles, batch_size))
+
+
+def _build_loader(smiles: list[str], batch_size: int, num_workers: int = 0):
+    if not HAS_CHEMPROP:
+        raise ImportError("Please install the chemprop support packages to use this module.")
+    datapoints = [data.MoleculeDatapoint.from_smi(s) for s in smiles]
+    featurizer = featurizers.SimpleMoleculeMolGraphFeaturizer()
+    dset = data.MoleculeDataset(datapoints, featurizer=featurizer)
+    return data.build_dataloader(
+        dset, batch_size=batch_size, num_workers=num_workers, shuffle=False
+    )
+
+
+def predict_featurized(mpnn: "MPNN", batches: Iterable, device: str = "cpu") -> np.ndarray:
+    """
+    Run a loaded Chemprop v2 model on featurized batches, with a plain forward
+    pass under torch.inference_mode (no Lightning Trainer).
+
+    Parameters
+    ----------
+    mpnn : MPNN
+        A model returned by load_chemprop_model.
+    batches : Iterable
+        Batches returned by featurize_smiles, or a chemprop dataloader.
+    device : str, optional (default "cpu")
+        Device the model is on.
+
+    Returns
+    -------
+    np.ndarray
+        Predictions of shape (number of molecules, number of tasks).
+    """
+    if not HAS_CHEMPROP:
+        raise ImportError("Please install the chemprop support packages to use this module.")
+    preds = []
+    with torch.inference_mode():
+        for bmg, V_d, X_d, *_ in batches:
+            bmg.to(device)
+            V_d = V_d.to(device) if V_d is not None else None
+            X_d = X_d.to(device) if X_d is not None else None
+            preds.append(mpnn(bmg, V_d, X_d).cpu().numpy())
+    return np.concatenate(preds, axis=0)
+
+
+def predict_properties(
+    models: dict[str, "MPNN"],
+    smiles: list[str],
+    device: str = "cpu",
+    batch_size: int = 50,
+) -> dict[str, np.ndarray]:
+    """
+    Predict several properties for a list of SMILES, featurizing the molecules
+    once and running every model on the same batched graphs.
+
+    Parameters
+    ----------
+    models : dict[str, MPNN]
+        Loaded models keyed by property name.
+    smiles : list[str]
+        A list of valid SMILES strings.
+    device : str, optional (default "cpu")
+        Device the models are on.
+    batch_size : int, optional
+        Batch size for inference.
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        For each property, predictions of shape (number of molecules, number of tasks).
+    """
+    batches = featurize_smiles(smiles, batch_size)
+    return {name: predict_featurized(mpnn, batches, device) for name, mpnn in models.items()}
+
+
+def predict_with_model(
+    mpnn: "MPNN",
+    smiles: list[str],
+    device: str = "cpu",
+    batch_size: int = 50,
+    num_workers: int = 0,
+) -> list[list[float]]:
+    """
+    Predict on a list of SMILES with an already loaded Chemprop v2 model.
+    Molecules are featurized by the dataloader while the model runs a plain
+    forward pass over each batch.
+
+    Parameters
+    ----------
+    mpnn : MPNN
+        A model returned by load_chemprop_model.
+    smiles : list[str]
+        A list of SMILES strings to run prediction on.
+    device : str, optional (default "cpu")
+        Device identifier, e.g. "cpu" or "cuda:0".
+    batch_size : int, optional
+        Batch size for inference.
+    num_workers : int, optional (default 0)
+        Dataloader worker processes used for featurization; 0 featurizes in
+        the calling process, which is fastest for small inputs.
+
+    Returns
+    -------
+    List[List[float]]
+        Predictions: for each input SMILES, a list of output values (one per task).
+    """
+    loader = _build_loader(smiles, batch_size, num_workers)
+    return predict_featurized(mpnn, loader, device).tolist()
+
+
 def predict_with_chemprop(
     checkpoint_path: str,
     smiles: list[str],
     device: str = "cpu",
     batch_size: int = 50,
-    # accelerator: str = "cpu"
+    num_workers: int = 0,
+    num_threads: Optional[int] = None,
 ) -> list[list[float]]:
     """
     Load a Chemprop v2 model from a checkpoint and predict on a list of SMILES.
+    Use charge.servers.chemprop_registry to keep models loaded between calls.
 
     Parameters
     ----------
@@ -40,39 +213,28 @@ def predict_with_chemprop(
         Device identifier, e.g. "cpu" or "cuda:0".
     batch_size : int, optional
         Batch size for inference.
+    num_workers : int, optional (default 0)
+        Dataloader worker processes used for featurization.
+    num_threads : int, optional
+        Number of torch CPU threads, see set_num_threads.
 
     Returns
     -------
     List[List[float]]
         Predictions: for each input SMILES, a list of output values (one per task).
     """
-    if not HAS_CHEMPROP:
-        raise ImportError("Please install the chemprop support packages to use this module.")
-
-    # Load model
-    mpnn=MPNN.load_from_file(checkpoint_path)
-    #model = model.to(device)
-    mpnn.eval()
-
-    # 2) Build datapoints -> dataset -> dataloader
-    datapoints = [data.MoleculeDatapoint.from_smi(s) for s in smiles]
-    featurizer = featurizers.SimpleMoleculeMolGraphFeaturizer()
-    dset = data.MoleculeDataset(datapoints, featurizer=featurizer)
-    loader = data.build_dataloader(dset, shuffle=False)  # uses sensible defaults
-
-    # 3) Predict with Lightning Trainer
-    with torch.inference_mode():
-        trainer = pl.Trainer(logger=None, enable_progress_bar=False, accelerator=device, devices=1)
-        preds_batches = trainer.predict(mpnn, loader)
-
-    preds = np.concatenate(preds_batches, axis=0).tolist()
-    return preds
+    set_num_threads(num_threads)
+    mpnn = load_chemprop_model(checkpoint_path, device)
+    return predict_with_model(mpnn, smiles, device, batch_size, num_workers)
 
 
 @click.command()
 @click.option("--model-dir", envvar="CHEMPROP_BASE_PATH", help="Path to chemprop model")
 @click.option("--device", envvar="CHEMPROP_SERVER_DEVICE", default="cpu", help="Device to use for the chemprop server: cpu, cuda")
-def main(model_dir: str, device: str):
+@click.option("--batch-size", type=int, default=50, help="Batch size for inference")
+@click.option("--num-workers", type=int, default=0, help="Dataloader workers used for featurization")
+@click.option("--num-threads", envvar="CHEMPROP_NUM_THREADS", type=int, default=None, help="Number of torch CPU threads")
+def main(model_dir: str, device: str, batch_size: int, num_workers: int, num_threads: Optional[int]):
     if not HAS_CHEMPROP:
         raise ImportError("Please install the chemprop support packages to use this module.")
 
@@ -80,7 +242,7 @@ def main(model_dir: str, device: str):
     if(chemprop_base_path):
         ckpt = os.path.join(chemprop_base_path, "gap/model_0/best.pt")
         smis = ["O=CC12C3CC1CCN23", "CCC", "c1ccccc1O"]
-        print(predict_with_chemprop(ckpt, smis, device))
+        print(predict_with_chemprop(ckpt, smis, device, batch_size, num_workers, num_threads))
     else:
         print('CHEMPROP_BASE_PATH environment variable not set!')
         sys.exit(2)
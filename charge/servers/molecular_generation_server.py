@@ -21,17 +21,27 @@ import json
 import os
 from charge.tasks.Task import Task
 from charge.servers.server_utils import add_server_arguments
+from charge.servers.server_logging import configure_server_logging
+from charge.servers.property_cache import set_property_cache
+from charge.servers.conformer_store import set_conformer_store
 from mcp.server.fastmcp import FastMCP
 from charge.clients.autogen import AutoGenClient
 from charge.clients.Client import Client
 import asyncio
-from charge.servers import SMILES_utils
+from charge.servers import SMILES_utils, molecular_property_utils
+from charge.servers.cache_utils import get_mol
+from charge.servers.similarity_index import FingerprintIndex
 import charge.utils.helper_funcs as hf
 import argparse
 
 parser = argparse.ArgumentParser()
 add_server_arguments(parser)
 args = parser.parse_args()
+configure_server_logging(args.log_mode, args.log_sample_every, args.log_enqueue)
+if args.property_cache:
+    set_property_cache(args.property_cache)
+if args.conformer_store:
+    set_conformer_store(args.conformer_store)
 
 mcp = FastMCP(
     "SMILES Diagnosis and retrieval MCP Server",
@@ -122,7 +132,7 @@ def is_already_known(smiles: str) -> bool:
     """
     if not HAS_RDKIT:
         raise ImportError("Please install the rdkit support packages to use this module.")
-    if not Chem.MolFromSmiles(smiles):
+    if not get_mol(smiles):
         raise ValueError("Invalid SMILES string.")
 
     try:
@@ -162,10 +172,105 @@ def get_density(smiles: str) -> float:
     return density
 
 
+# Similarity index over the molecules in JSON_FILE_PATH. The file is only
+# re-read when its modification time or size changes, and only entries not
+# seen before are fingerprinted.
+KNOWN_MOLECULE_INDEX = None
+_KNOWN_MOLECULE_FILE_STATE = None
+_KNOWN_MOLECULE_RAW_SMILES = set()
+
+
+def _get_known_molecule_index():
+    global KNOWN_MOLECULE_INDEX, _KNOWN_MOLECULE_FILE_STATE
+    if KNOWN_MOLECULE_INDEX is None:
+        KNOWN_MOLECULE_INDEX = FingerprintIndex()
+    try:
+        stat = os.stat(JSON_FILE_PATH)
+    except FileNotFoundError:
+        logger.warning(f"{JSON_FILE_PATH} not found.")
+        return KNOWN_MOLECULE_INDEX
+    state = (JSON_FILE_PATH, stat.st_mtime_ns, stat.st_size)
+    if state != _KNOWN_MOLECULE_FILE_STATE:
+        with open(JSON_FILE_PATH) as f:
+            known_mols = json.load(f)
+        add_known_molecules(mol["smiles"] for mol in known_mols)
+        _KNOWN_MOLECULE_FILE_STATE = state
+    return KNOWN_MOLECULE_INDEX
+
+
+def add_known_molecules(smiles_list) -> None:
+    """
+    Add molecules to the known-molecule similarity index without re-reading
+    JSON_FILE_PATH, e.g. right after they were appended to it. SMILES strings
+    already added are skipped without being parsed again.
+    """
+    global KNOWN_MOLECULE_INDEX
+    if KNOWN_MOLECULE_INDEX is None:
+        KNOWN_MOLECULE_INDEX = FingerprintIndex()
+    new = [s for s in dict.fromkeys(smiles_list) if s not in _KNOWN_MOLECULE_RAW_SMILES]
+    KNOWN_MOLECULE_INDEX.add_many(new)
+    _KNOWN_MOLECULE_RAW_SMILES.update(new)
+
+
+@mcp.tool()
+def is_similar_to_known(smiles: str, threshold: float = 0.8) -> dict:
+    """
+    Check if a molecule is a near-duplicate of an already known molecule, i.e.
+    if any known molecule other than itself has a Tanimoto similarity (Morgan
+    fingerprints) of at least threshold. Only provide valid SMILES strings.
+
+    Args:
+        smiles (str): The input SMILES string.
+        threshold (float): Similarity threshold between 0.0 and 1.0.
+    Returns:
+        dict: "similar" (bool) is True if a known molecule reaches the threshold,
+            "nearest_smiles" (str or None) is the most similar known molecule
+            that could reach the threshold (None if no known molecule has a
+            compatible number of fingerprint bits) and "similarity" (float) its
+            similarity to the input.
+
+    Raises:
+        ValueError: If the SMILES string is invalid.
+    """
+    if not HAS_RDKIT:
+        raise ImportError("Please install the rdkit support packages to use this module.")
+    similar, nearest, similarity = _get_known_molecule_index().any_similar(
+        smiles, threshold, exclude_self=True
+    )
+    return {"similar": similar, "nearest_smiles": nearest, "similarity": similarity}
+
+
+@mcp.tool()
+def find_similar_known(smiles: str, k: int = 5) -> list[dict]:
+    """
+    Find the k already known molecules most similar to the given molecule
+    (Tanimoto similarity of Morgan fingerprints), excluding the molecule itself.
+    Only provide valid SMILES strings.
+
+    Args:
+        smiles (str): The input SMILES string.
+        k (int): Number of similar molecules to return.
+    Returns:
+        list[dict]: Up to k entries with keys "smiles" and "similarity", most
+            similar first.
+
+    Raises:
+        ValueError: If the SMILES string is invalid.
+    """
+    if not HAS_RDKIT:
+        raise ImportError("Please install the rdkit support packages to use this module.")
+    neighbors = _get_known_molecule_index().most_similar(smiles, k, exclude_self=True)
+    return [{"smiles": s, "similarity": sim} for s, sim in neighbors]
+
+
 # Add the SMILES utility functions as MCP tools
 mcp.tool()(SMILES_utils.canonicalize_smiles)
 mcp.tool()(SMILES_utils.verify_smiles)
 mcp.tool()(SMILES_utils.get_synthesizability)
+mcp.tool()(SMILES_utils.canonicalize_smiles_batch)
+mcp.tool()(SMILES_utils.verify_smiles_batch)
+mcp.tool()(SMILES_utils.get_synthesizability_batch)
+mcp.tool()(molecular_property_utils.compute_properties)
 
 
 if __name__ == "__main__":
@@ -7,8 +7,8 @@
 
 from loguru import logger
 try:
-    from rdkit import Chem
-    from rdkit.Chem import AllChem, Descriptors
+    from rdkit import Chem, rdBase
+    from rdkit.Chem import AllChem, Descriptors, rdMolDescriptors
     from rdkit.Contrib.SA_Score import sascorer
     HAS_RDKIT = True
 except (ImportError, ModuleNotFoundError) as e:
@@ -18,50 +18,298 @@ except (ImportError, ModuleNotFoundError) as e:
         "Install it with: pip install charge[rdkit]",
     )
 
-from charge.servers.SMILES_utils import get_synthesizability
+from charge.servers.SMILES_utils import get_synthesizability, SASCORE_METHOD
+from charge.servers.cache_utils import get_mol
+from charge.servers.conformer_store import get_conformers
+from charge.servers.server_logging import log_call
+from charge.servers import property_cache
+from charge.servers.property_cache import MISSING, cached_compute, method_key
 from charge.servers.get_chemprop2_preds import predict_with_chemprop
-from charge.servers.molecule_pricer import get_chemspace_prices
+from charge.servers.chemprop_registry import CHEMPROP_PROPERTIES, get_model_registry
+from charge.servers.batching import MicroBatcher
+from charge.servers.molecule_pricer import get_cached_prices
+from typing import Optional, Union
 import sys
 import os
 
-def get_density(smiles: str) -> float:
+DENSITY_TIERS = ("fast", "conformer", "multi_conformer")
+
+# Atomic contributions (A^3) to the additive van der Waals volume of
+# Zhao, Abraham and Zissimos, J. Org. Chem. 2003, 68, 7368-7373.
+_VDW_ATOM_VOLUMES = {
+    "H": 7.24, "B": 40.48, "C": 20.58, "N": 15.60, "O": 14.71, "F": 13.31,
+    "Si": 38.79, "P": 24.43, "S": 24.43, "Cl": 22.45, "As": 26.52,
+    "Se": 28.73, "Br": 26.52, "Te": 36.62, "I": 32.52,
+}
+
+
+def _additive_volume(mol) -> float:
     """
-    Calculate the density of a molecule given its SMILES string.
+    Van der Waals volume from atom, bond and ring contributions (no 3D
+    structure needed). Raises ValueError for elements without a contribution.
+    """
+    volume = 0.0
+    num_hs = 0
+    for atom in mol.GetAtoms():
+        symbol = atom.GetSymbol()
+        if symbol not in _VDW_ATOM_VOLUMES:
+            raise ValueError(f"No additive volume contribution for element {symbol}")
+        volume += _VDW_ATOM_VOLUMES[symbol]
+        num_hs += atom.GetTotalNumHs()
+    volume += num_hs * _VDW_ATOM_VOLUMES["H"]
+    num_bonds = mol.GetNumBonds() + num_hs
+    num_aromatic_rings = sum(
+        all(mol.GetBondWithIdx(b).GetIsAromatic() for b in ring)
+        for ring in mol.GetRingInfo().BondRings()
+    )
+    num_rings = mol.GetRingInfo().NumRings()
+    return (
+        volume
+        - 5.92 * num_bonds
+        - 14.7 * num_aromatic_rings
+        - 3.8 * (num_rings - num_aromatic_rings)
+    )
+
+
+class _MolContext:
+    """
+    A parsed molecule and the 3D conformers embedded for it so far, shared by
+    the property calculators so that each molecule is parsed and embedded once.
+    Conformers come from the conformer store when one is configured.
+    """
+
+    def __init__(self, smiles: str, mol):
+        self.smiles = smiles
+        self.mol = mol
+        self._conformers = {}
+
+    def conformers(self, num_conformers: int = 1):
+        """The molecule embedded with num_conformers conformers, or None."""
+        if num_conformers not in self._conformers:
+            self._conformers[num_conformers] = get_conformers(self.smiles, self.mol, num_conformers)
+        return self._conformers[num_conformers]
+
+    def volumes(self, num_conformers: int = 1) -> list[float]:
+        """Grid volumes of the conformers, empty if none could be embedded."""
+        embedded = self.conformers(num_conformers)
+        if embedded is None:
+            return []
+        return [AllChem.ComputeMolVolume(embedded, confId=c.GetId()) for c in embedded.GetConformers()]
+
+
+def _compute_density(ctx: _MolContext, num_conformers: int) -> Optional[float]:
+    """
+    Density of a molecule from its additive volume (num_conformers == 0) or
+    from the average volume of num_conformers conformers. Returns None if no
+    conformer could be embedded.
+    """
+    if num_conformers == 0:
+        volume = _additive_volume(ctx.mol)
+    else:
+        volumes = ctx.volumes(num_conformers)
+        if not volumes:
+            logger.warning("No conformers found for the molecule.")
+            return None
+        volume = sum(volumes) / len(volumes)
+    return volume / Descriptors.MolWt(ctx.mol)
+
+
+def _density(ctx: _MolContext, tier: str, num_conformers: int = 10) -> float:
+    """
+    Density of a molecule at the given tier, through the property cache.
+    Returns 0.0 if no conformer could be embedded; as embedding failures can
+    be transient, that value is not cached.
+    """
+    num_conformers = {"fast": 0, "conformer": 1}.get(tier, num_conformers)
+    if num_conformers < 0 or (tier == "multi_conformer" and num_conformers < 1):
+        raise ValueError(f"num_conformers must be at least 1, got {num_conformers}.")
+    method = method_key(
+        "density", tier=tier, num_conformers=num_conformers, rdkit=rdBase.rdkitVersion
+    )
+    density = property_cache.lookup(ctx.smiles, "density", method)
+    if density is MISSING:
+        density = _compute_density(ctx, num_conformers)
+        if density is None:
+            return 0.0
+        property_cache.store(ctx.smiles, "density", method, density)
+    return density
+
+
+def get_density_tiered(smiles: str, tier: str = "conformer", num_conformers: int = 10) -> dict:
+    """
+    Calculate the density of a molecule at a selectable accuracy tier.
     Density is the molecular weight of the molecule per unit volume.
     In units of unified atomic mass (u) per cubic Angstroms (A^3)
 
+    Tiers, from cheapest to most accurate:
+      - fast            : additive atom/bond/ring van der Waals volume, no 3D structure.
+                          Within about 5% of the conformer tier for simple molecules,
+                          but up to about 10% low for fused heteroaromatics such as
+                          caffeine or indole.
+      - conformer       : grid volume of a single UFF-optimized conformer (as get_density).
+      - multi_conformer : grid volume averaged over num_conformers conformers.
+
     Args:
         smiles (str): The input SMILES string.
+        tier (str): The accuracy tier, one of "fast", "conformer" or "multi_conformer".
+        num_conformers (int): Number of conformers used by the "multi_conformer" tier.
     Returns:
-        float: Density of the molecule, returns 0.0 if there is an error.
+        dict: "density" (float, 0.0 if there is an error) and "tier" (str), the
+            tier the value was computed with.
+
+    Raises:
+        ValueError: If the tier is invalid, or num_conformers is below 1 for
+            the "multi_conformer" tier.
     """
     if not HAS_RDKIT:
         raise ImportError("Please install the rdkit support packages to use this module.")
+    if tier not in DENSITY_TIERS:
+        raise ValueError(f"Invalid density tier '{tier}'. Must be one of {DENSITY_TIERS}.")
+    if tier == "multi_conformer" and num_conformers < 1:
+        raise ValueError(f"num_conformers must be at least 1, got {num_conformers}.")
+    result = {"density": 0.0, "tier": tier}
     try:
-        # logger.info(f"Calculating density for SMILES: {smiles}")
-        mol = Chem.MolFromSmiles(smiles)
+        mol = get_mol(smiles)
         if mol is None:
             logger.warning("Invalid SMILES string or molecule could not be created.")
-            return 0.0
-        mol = Chem.AddHs(mol)
-        AllChem.EmbedMolecule(mol, AllChem.ETKDG())
-        AllChem.UFFOptimizeMolecule(mol, maxIters=500)
-
-        if mol.GetNumConformers() == 0:
-            logger.warning("No conformers found for the molecule.")
-            return 0.0
-        mw = Descriptors.MolWt(mol)
-        num_atoms = mol.GetNumAtoms()
-        if num_atoms == 0:
+            return result
+        if mol.GetNumAtoms() == 0:
             logger.warning("No atoms in the molecule.")
-            return 0.0
+            return result
 
-        volume = AllChem.ComputeMolVolume(mol)
-        density = volume / mw
-        logger.info(f"Density for SMILES {smiles}: {density}")
-        return density
+        result["density"] = _density(_MolContext(smiles, mol), tier, num_conformers)
+        log_call("get_density", "Density ({}) for SMILES {}: {}", tier, smiles, result["density"])
+        return result
     except Exception as e:
-        return 0.0
+        return result
+
+
+def get_density(smiles: str, tier: str = "conformer") -> float:
+    """
+    Calculate the density of a molecule given its SMILES string.
+    Density is the molecular weight of the molecule per unit volume.
+    In units of unified atomic mass (u) per cubic Angstroms (A^3)
+
+    Args:
+        smiles (str): The input SMILES string.
+        tier (str): The accuracy tier, see get_density_tiered.
+    Returns:
+        float: Density of the molecule, returns 0.0 if there is an error.
+    """
+    return get_density_tiered(smiles, tier)["density"]
+
+
+def _sascore(ctx: _MolContext) -> float:
+    return cached_compute(
+        ctx.smiles, "sascore", SASCORE_METHOD, lambda: sascorer.calculateScore(ctx.mol)
+    )
+
+
+def _molecular_volume(ctx: _MolContext) -> Optional[float]:
+    volumes = ctx.volumes(1)
+    return volumes[0] if volumes else None
+
+
+def _radius_of_gyration(ctx: _MolContext) -> Optional[float]:
+    embedded = ctx.conformers(1)
+    return None if embedded is None else rdMolDescriptors.CalcRadiusOfGyration(embedded)
+
+
+# Property name -> calculator taking a _MolContext. The 3D properties share the
+# conformer embedded for the molecule (density, molecular_volume, radius_of_gyration).
+PROPERTY_CALCULATORS = {
+    "canonical_smiles": lambda ctx: Chem.MolToSmiles(ctx.mol),
+    "sascore": _sascore,
+    "density": lambda ctx: _density(ctx, "conformer"),
+    "density_fast": lambda ctx: _density(ctx, "fast"),
+    "density_multi_conformer": lambda ctx: _density(ctx, "multi_conformer"),
+    "molecular_weight": lambda ctx: Descriptors.MolWt(ctx.mol),
+    "logp": lambda ctx: Descriptors.MolLogP(ctx.mol),
+    "tpsa": lambda ctx: Descriptors.TPSA(ctx.mol),
+    "num_h_donors": lambda ctx: Descriptors.NumHDonors(ctx.mol),
+    "num_h_acceptors": lambda ctx: Descriptors.NumHAcceptors(ctx.mol),
+    "num_rotatable_bonds": lambda ctx: Descriptors.NumRotatableBonds(ctx.mol),
+    "num_heavy_atoms": lambda ctx: ctx.mol.GetNumHeavyAtoms(),
+    "molecular_volume": _molecular_volume,
+    "radius_of_gyration": _radius_of_gyration,
+}
+
+DEFAULT_PROPERTIES = ["canonical_smiles", "sascore", "density"]
+
+# Values reported for invalid molecules or failed calculations, as returned by
+# get_synthesizability and get_density. Other properties are reported as None.
+_ERROR_VALUES = {
+    "sascore": 10.0,
+    "density": 0.0,
+    "density_fast": 0.0,
+    "density_multi_conformer": 0.0,
+}
+
+
+def _compute_molecule_properties(smiles: str, properties: list[str]) -> dict:
+    result = {"smiles": smiles, "valid": False}
+    result.update({name: _ERROR_VALUES.get(name) for name in properties})
+    mol = get_mol(smiles)
+    if mol is None or mol.GetNumAtoms() == 0:
+        logger.warning("Invalid SMILES string or molecule could not be created: {}", smiles)
+        return result
+    result["valid"] = True
+    ctx = _MolContext(smiles, mol)
+    for name in properties:
+        try:
+            result[name] = PROPERTY_CALCULATORS[name](ctx)
+        except Exception as e:
+            logger.error("Error computing {} for SMILES {}: {}", name, smiles, e)
+    return result
+
+
+def compute_properties(
+    smiles: Union[str, list[str]], properties: Optional[list[str]] = None
+) -> Union[dict, list[dict]]:
+    """
+    Compute several properties of one or more molecules in a single call.
+    Each SMILES string is parsed once and the 3D conformer (when a requested
+    property needs one) is embedded once and shared between properties.
+
+    Available properties:
+      - canonical_smiles        : Canonical SMILES string.
+      - sascore                 : Synthesizability score, 1.0 (easy) to 10.0 (hard).
+      - density                 : Density (u/A^3) from a single conformer, as get_density.
+      - density_fast            : Density from an additive volume, no 3D structure.
+      - density_multi_conformer : Density averaged over 10 conformers.
+      - molecular_weight        : Molecular weight (g/mol).
+      - logp                    : Crippen octanol-water partition coefficient.
+      - tpsa                    : Topological polar surface area (A^2).
+      - num_h_donors, num_h_acceptors, num_rotatable_bonds, num_heavy_atoms
+      - molecular_volume        : Grid volume of the conformer (A^3).
+      - radius_of_gyration      : Radius of gyration of the conformer (A).
+
+    Args:
+        smiles (str | list[str]): The input SMILES string, or a list of them.
+        properties (list[str], optional): The properties to compute. Defaults to
+            canonical_smiles, sascore and density.
+    Returns:
+        dict | list[dict]: For each molecule, a dict with the input "smiles",
+            "valid" (bool) and one key per requested property. Invalid molecules
+            and failed calculations get a sascore of 10.0, a density of 0.0 and
+            None for other properties. A list of dicts is returned for a list input.
+
+    Raises:
+        ValueError: If an unknown property is requested.
+    """
+    if not HAS_RDKIT:
+        raise ImportError("Please install the rdkit support packages to use this module.")
+    properties = list(DEFAULT_PROPERTIES if properties is None else properties)
+    unknown = [name for name in properties if name not in PROPERTY_CALCULATORS]
+    if unknown:
+        raise ValueError(
+            f"Unknown properties {unknown}. Must be among {sorted(PROPERTY_CALCULATORS)}."
+        )
+    if isinstance(smiles, str):
+        log_call("compute_properties", "Computing {} for SMILES {}", properties, smiles)
+        return _compute_molecule_properties(smiles, properties)
+    log_call("compute_properties", "Computing {} for {} molecules", properties, len(smiles))
+    return [_compute_molecule_properties(s, properties) for s in smiles]
 
 
 def get_density_and_synthesizability(smiles: str) -> tuple[float, float]:
@@ -83,9 +331,18 @@ def get_density_and_synthesizability(smiles: str) -> tuple[float, float]:
 
     if not HAS_RDKIT:
         raise ImportError("Please install the rdkit support packages to use this module.")
-    density = get_density(smiles)
-    synthesizability = get_synthesizability(smiles)
-    return density, synthesizability
+    result = compute_properties(smiles, ["density", "sascore"])
+    return result["density"], result["sascore"]
+
+def _chemprop_method(model_path: str) -> str:
+    # Retrained checkpoints get a new cache key through their mtime and size
+    model_stat = os.stat(model_path) if os.path.exists(model_path) else None
+    return method_key(
+        "chemprop",
+        model=os.path.abspath(model_path),
+        mtime=model_stat.st_mtime if model_stat else None,
+        size=model_stat.st_size if model_stat else None,
+    )
 
 def chemprop_preds_server(smiles: str,property:str) -> float:
     
@@ -144,14 +401,108 @@ def chemprop_preds_server(smiles: str,property:str) -> float:
         )
     chemprop_base_path=os.environ.get("CHEMPROP_BASE_PATH")
     if(chemprop_base_path):
-        model_path=os.path.join(chemprop_base_path, property)
-        model_path=os.path.join(model_path, 'model_0/best.pt')
-        return(predict_with_chemprop(model_path,[smiles])[0][0])
+        registry = get_model_registry()
+        return cached_compute(
+            smiles,
+            f"chemprop_{property}",
+            _chemprop_method(registry.model_path(property)),
+            lambda: float(registry.predict(property, [smiles])[0][0]),
+        )
     else:
         print('CHEMPROP_BASE_PATH environment variable not set!')
         sys.exit(2)
 
-def get_molecule_price(smiles):
+def chemprop_predict_properties(
+    smiles: Union[str, list[str]], properties: list[str]
+) -> list[dict]:
+    """
+    Predict several molecular properties for one or more molecules with the
+    pre-trained Chemprop models. The molecules are featurized once and every
+    requested property model runs on the same molecular graphs, so asking for
+    several properties together is much cheaper than one call per property.
+
+    Valid properties are the ones of chemprop_preds_server: density, hof,
+    alpha, cv, gap, homo, lumo, mu, r2, zpve and lipo.
+
+    Args:
+        smiles (str | list[str]): The input SMILES string, or a list of them.
+        properties (list[str]): The properties to predict.
+    Returns:
+        list[dict]: One row per input molecule, in input order, with the input
+            "smiles" and one key per requested property. Predictions for
+            invalid SMILES are None.
+
+    Raises:
+        ValueError: If a property is invalid or CHEMPROP_BASE_PATH is not set.
+    """
+    if not HAS_RDKIT:
+        raise ImportError("Please install the rdkit support packages to use this module.")
+    smiles_list = [smiles] if isinstance(smiles, str) else list(smiles)
+    registry = get_model_registry()
+    methods = {prop: _chemprop_method(registry.model_path(prop)) for prop in properties}
+    rows = [dict({"smiles": s}, **{prop: None for prop in properties}) for s in smiles_list]
+
+    # Predict only the molecules with at least one property missing from the cache
+    to_predict = []
+    for row in rows:
+        if get_mol(row["smiles"]) is None:
+            continue
+        for prop in properties:
+            row[prop] = property_cache.lookup(row["smiles"], f"chemprop_{prop}", methods[prop])
+        if any(row[prop] is MISSING for prop in properties):
+            to_predict.append(row)
+        log_call("chemprop_predict_properties", "Predicting {} for SMILES {}", properties, row["smiles"])
+
+    missing_props = [p for p in properties if any(row[p] is MISSING for row in to_predict)]
+    if to_predict:
+        preds = registry.predict_many(missing_props, [row["smiles"] for row in to_predict])
+        for i, row in enumerate(to_predict):
+            for prop in missing_props:
+                if row[prop] is MISSING:
+                    row[prop] = float(preds[prop][i][0])
+                    property_cache.store(row["smiles"], f"chemprop_{prop}", methods[prop], row[prop])
+    return rows
+
+
+def _chemprop_batch(prop: str, smiles_list: list[str]) -> list[Optional[float]]:
+    return [row[prop] for row in chemprop_predict_properties(smiles_list, [prop])]
+
+
+# Coalesces concurrent chemprop_predict calls into one forward pass per property
+CHEMPROP_BATCHER = MicroBatcher(
+    _chemprop_batch,
+    max_batch_size=int(os.getenv("CHARGE_CHEMPROP_BATCH_SIZE", "64")),
+    max_wait=float(os.getenv("CHARGE_CHEMPROP_MAX_WAIT", "0.01")),
+)
+
+
+async def chemprop_predict(smiles: str, property: str) -> Optional[float]:
+    """
+    Predict a molecular property with the pre-trained Chemprop models.
+    Concurrent calls for the same property are batched into one model
+    evaluation.
+
+    Valid properties: density (g/cm³), hof (kcal/mol), alpha (a0³),
+    cv (cal/mol·K), gap, homo and lumo (Hartree), mu (Debye), r2 (a0^2),
+    zpve (Hartree) and lipo (logD).
+
+    Args:
+        smiles (str): The input SMILES string.
+        property (str): The property to predict.
+    Returns:
+        float: The predicted value, or None if the SMILES string is invalid.
+
+    Raises:
+        ValueError: If the property is invalid or CHEMPROP_BASE_PATH is not set.
+    """
+    if property not in CHEMPROP_PROPERTIES:
+        raise ValueError(
+            f"Invalid property '{property}'. Must be one of {set(CHEMPROP_PROPERTIES)}."
+        )
+    return await CHEMPROP_BATCHER.submit(property, smiles)
+
+
+def get_molecule_price(smiles, mode=None):
     """
     Retrieve vendor pricing from ChemSpace for the molecule specified by the SMILES string, smiles.
 
@@ -159,6 +510,9 @@ def get_molecule_price(smiles):
     ----------
     smiles : str
         A SMILES string for the molecule of interest.
+    mode : str, optional
+        "online" (ChemSpace), "catalog" (local vendor catalog, ChemSpace on a miss)
+        or "offline" (local vendor catalog only). Defaults to $CHARGE_PRICE_MODE or "catalog".
 
     Returns
     -------
@@ -173,5 +527,4 @@ def get_molecule_price(smiles):
 
     if not HAS_RDKIT:
         raise ImportError("Please install the rdkit support packages to use this module.")
-    price=get_chemspace_prices([smiles])
-    return(price[0])    
+    return get_cached_prices([smiles], mode)[0]    
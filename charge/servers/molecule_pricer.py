@@ -9,8 +9,61 @@ except (ImportError, ModuleNotFoundError) as e:
         "Please install the chemprice support packages to use this module."
         "Install it with: pip install charge[chemprice]",
     )
+from concurrent.futures import Future
+from typing import Optional
+import math
+import threading
 import os, sys
 
+from charge.servers.cache_utils import get_mol
+from charge.servers.property_cache import (
+    MISSING, PropertyCache, get_property_cache, method_key,
+)
+from charge.servers.vendor_catalog import get_vendor_catalog, inchikey
+
+# Vendor prices change, so cached prices expire after this many seconds
+PRICE_MAX_AGE = float(os.getenv("CHARGE_PRICE_MAX_AGE", 7 * 86400))
+# "No vendor" results expire sooner, as catalogs grow
+NO_PRICE_MAX_AGE = float(os.getenv("CHARGE_NO_PRICE_MAX_AGE", 86400))
+
+# "chemprice" (PriceCollector) or "async" (pooled, rate-limited ChemSpaceClient)
+PRICE_CLIENT = os.getenv("CHARGE_PRICE_CLIENT", "chemprice")
+
+# "online": vendor API only, "catalog": local vendor catalog first, vendor API
+# on a miss, "offline": local vendor catalog only (NaN on a miss)
+PRICE_MODES = ("online", "catalog", "offline")
+PRICE_MODE = os.getenv("CHARGE_PRICE_MODE", "catalog")
+
+PRICE_PROPERTY = "price_usd_per_g"
+NO_PRICE_PROPERTY = "price_unavailable"
+PRICE_METHOD = method_key("chemspace", best_only=True)
+
+_PRICE_COLLECTOR = None
+_PRICE_COLLECTOR_LOCK = threading.Lock()
+
+# Canonical SMILES -> Future of the lookup currently running for it
+_IN_FLIGHT: dict[str, Future] = {}
+_IN_FLIGHT_LOCK = threading.Lock()
+
+_PRICE_CACHE: Optional[PropertyCache] = None
+
+
+def _price_collector():
+    """The process-wide PriceCollector, created and checked on first use."""
+    global _PRICE_COLLECTOR
+    with _PRICE_COLLECTOR_LOCK:
+        if _PRICE_COLLECTOR is None:
+            pc = PriceCollector()
+            chemspace_api_key = os.getenv("CHEMSPACE_API_KEY")
+            if(chemspace_api_key):
+                pc.setChemSpaceApiKey(chemspace_api_key)
+            else:
+                print('CHEMSPACE_API_KEY environment variable not set!')
+                sys.exit(2)
+            logger.info(pc.check())
+            _PRICE_COLLECTOR = pc
+        return _PRICE_COLLECTOR
+
 def get_chemspace_prices(SMILES_list,best_only=True):
     
     """
@@ -56,14 +109,7 @@ def get_chemspace_prices(SMILES_list,best_only=True):
     if not HAS_CHEMPRICE:
         raise ImportError("Please install the chemprice support packages to use this module.")
 
-    pc = PriceCollector()
-    chemspace_api_key = os.getenv("CHEMSPACE_API_KEY")
-    if(chemspace_api_key):
-        pc.setChemSpaceApiKey(chemspace_api_key)
-    else:
-        print('CHEMPROP_API_KEY environment variable not set!')
-        sys.exit(2)
-    print(pc.check())
+    pc = _price_collector()
     all_prices = pc.collect(SMILES_list)
     if(best_only):
         best_price=pc.selectBest(all_prices)
@@ -71,6 +117,155 @@ def get_chemspace_prices(SMILES_list,best_only=True):
     else:
         return(all_prices)
 
+def _fetch_best_prices(SMILES_list: list[str]) -> list[float]:
+    if PRICE_CLIENT == "async":
+        from charge.servers.chemspace_client import get_best_prices
+        return get_best_prices(SMILES_list)
+    return get_chemspace_prices(SMILES_list)
+
+
+def set_price_cache(db_path: Optional[str]) -> None:
+    """
+    Set a dedicated database for cached vendor prices. Without one, prices are
+    cached in the process-wide property cache, if that is enabled.
+
+    Args:
+        db_path (str, optional): Path to the SQLite database. None falls back
+            to the property cache.
+    """
+    global _PRICE_CACHE
+    if _PRICE_CACHE is not None:
+        _PRICE_CACHE.close()
+    _PRICE_CACHE = PropertyCache(db_path) if db_path else None
+
+
+def get_price_cache() -> Optional[PropertyCache]:
+    """Return the cache used for vendor prices, or None if prices are not cached."""
+    return _PRICE_CACHE or get_property_cache()
+
+
+def _price_key(smiles: str) -> tuple[str, bool]:
+    # Canonical SMILES, and whether the result may be cached
+    mol = get_mol(smiles)
+    if mol is None:
+        return smiles, False
+    from rdkit import Chem
+    return Chem.MolToSmiles(mol), True
+
+
+def _cached_price(cache: Optional[PropertyCache], key: str):
+    if cache is None:
+        return MISSING
+    price = cache.get(key, PRICE_PROPERTY, PRICE_METHOD, PRICE_MAX_AGE)
+    if price is not MISSING:
+        return price
+    if cache.get(key, NO_PRICE_PROPERTY, PRICE_METHOD, NO_PRICE_MAX_AGE) is not MISSING:
+        return math.nan
+    return MISSING
+
+
+def _store_price(cache: Optional[PropertyCache], key: str, price: float) -> None:
+    if cache is None:
+        return
+    if price is None or math.isnan(price):
+        cache.put(key, NO_PRICE_PROPERTY, PRICE_METHOD, True)
+    else:
+        cache.put(key, PRICE_PROPERTY, PRICE_METHOD, price)
+
+
+def get_cached_prices(SMILES_list: list[str], mode: Optional[str] = None) -> list[float]:
+    """
+    Lowest vendor price (USD/g) of each molecule, like
+    get_chemspace_prices(SMILES_list, best_only=True), served from the local
+    vendor catalog and the price cache where possible.
+
+    In "catalog" mode (the default) molecules found in the vendor catalog
+    (see vendor_catalog.py) are priced from it and only the others are looked
+    up online; without a configured catalog this is the same as "online".
+    "offline" mode never uses the network. Molecules are keyed by canonical SMILES. Prices expire after
+    PRICE_MAX_AGE seconds, "no vendor" results (NaN) after NO_PRICE_MAX_AGE.
+    All uncached molecules of a call are priced with a single vendor lookup,
+    and a molecule already being priced by another thread is not looked up
+    again: the caller waits for that lookup instead.
+
+    Args:
+        SMILES_list (list[str]): SMILES strings to price.
+        mode (str, optional): "online", "catalog" or "offline", defaults to
+            CHARGE_PRICE_MODE.
+    Returns:
+        list[float]: The lowest price per molecule, NaN if no vendor sells it.
+    """
+    mode = mode or PRICE_MODE
+    if mode not in PRICE_MODES:
+        raise ValueError(f"Invalid price mode '{mode}'. Must be one of {PRICE_MODES}.")
+    catalog = get_vendor_catalog() if mode != "online" else None
+    if mode == "offline" and catalog is None:
+        raise ValueError("Offline pricing needs a vendor catalog (CHARGE_VENDOR_CATALOG).")
+
+    keys = [_price_key(smiles) for smiles in SMILES_list]
+    prices = {}
+    if catalog is not None:
+        inchikeys = {key: inchikey(key) for key, cacheable in dict.fromkeys(keys) if cacheable}
+        found = catalog.best_prices([ik for ik in inchikeys.values() if ik])
+        prices.update((key, found[ik]) for key, ik in inchikeys.items() if ik in found)
+        if mode == "offline":
+            return [prices.get(key, math.nan) for key, _ in keys]
+
+    cache = get_price_cache()
+    for key, cacheable in dict.fromkeys(keys):
+        if cacheable and key not in prices:
+            price = _cached_price(cache, key)
+            if price is not MISSING:
+                prices[key] = price
+
+    owned, waiting = {}, {}
+    with _IN_FLIGHT_LOCK:
+        for key, _ in dict.fromkeys(keys):
+            if key in prices or key in owned or key in waiting:
+                continue
+            if key in _IN_FLIGHT:
+                waiting[key] = _IN_FLIGHT[key]
+            else:
+                owned[key] = _IN_FLIGHT[key] = Future()
+
+    if owned:
+        cacheable = dict(keys)
+        try:
+            # Another thread may have stored the price since the first lookup
+            todo = []
+            for key in owned:
+                price = _cached_price(cache, key) if cacheable[key] else MISSING
+                if price is MISSING:
+                    todo.append(key)
+                else:
+                    prices[key] = price
+            if todo:
+                fetched = _fetch_best_prices(todo)
+                if len(fetched) != len(todo):
+                    raise RuntimeError(
+                        f"Got {len(fetched)} prices for {len(todo)} molecules"
+                    )
+                for key, price in zip(todo, fetched):
+                    price = float(price)
+                    prices[key] = price
+                    if cacheable[key]:
+                        _store_price(cache, key, price)
+        except BaseException as e:
+            with _IN_FLIGHT_LOCK:
+                for key, future in owned.items():
+                    del _IN_FLIGHT[key]
+                    future.set_exception(e)
+            raise
+        with _IN_FLIGHT_LOCK:
+            for key, future in owned.items():
+                del _IN_FLIGHT[key]
+                future.set_result(prices[key])
+
+    for key, future in waiting.items():
+        prices[key] = future.result()
+    return [prices[key] for key, _ in keys]
+
+
 def main(smiles_list,price_source='Chemspace'):
     """
     Main function that retrieves prices for a list of SMILES strings. Default to Chemspace because it doesn't have API limits. Keep this function to add future price_sources (Molport).
@@ -86,6 +281,9 @@ def main(smiles_list,price_source='Chemspace'):
     print("Retrieved Prices from "+price_source+":")
     print(prices)
 
+if os.getenv("CHARGE_PRICE_CACHE"):
+    set_price_cache(os.getenv("CHARGE_PRICE_CACHE"))
+
 if __name__ == "__main__":
     # Example usage
     example_smiles = ["CCO"]
@@ -0,0 +1,86 @@
+################################################################################
+## Copyright 2025 Lawrence Livermore National Security, LLC. and Binghamton University.
+## See the top-level LICENSE file for details.
+##
+## SPDX-License-Identifier: Apache-2.0
+################################################################################
+
+from typing import Iterator, Optional
+import sqlite3
+import threading
+import time
+
+from loguru import logger
+
+
+class NoveltyStore:
+    """
+    Set of known molecule keys (canonical isomeric SMILES) with O(1) membership
+    checks and an optional SQLite file that persists the set across restarts.
+
+    When ``db_path`` is given, all previously stored keys are loaded into memory
+    at construction and every new key is appended to the database as soon as
+    it is added, so the store survives server restarts and can be shared by
+    consecutive runs of a campaign.
+
+    Args:
+        db_path (str, optional): Path to the SQLite database file. If None, the
+            store is kept in memory only.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path
+        self._keys: set[str] = set()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS known_molecules ("
+                "key TEXT PRIMARY KEY, added_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+            self._keys.update(
+                row[0] for row in self._conn.execute("SELECT key FROM known_molecules")
+            )
+            logger.info(f"Loaded {len(self._keys)} known molecules from {db_path}")
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._keys))
+
+    def add(self, key: str) -> bool:
+        """
+        Add a key to the store.
+
+        Args:
+            key (str): The molecule key.
+        Returns:
+            bool: True if the key was new, False if it was already known.
+        """
+        with self._lock:
+            if key in self._keys:
+                return False
+            self._keys.add(key)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO known_molecules (key, added_at) VALUES (?, ?)",
+                    (key, time.time()),
+                )
+                self._conn.commit()
+            return True
+
+    def close(self) -> None:
+        """Close the backing database, if any. The in-memory set is kept."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
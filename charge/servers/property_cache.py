@@ -0,0 +1,279 @@
+################################################################################
+## Copyright 2025 Lawrence Livermore National Security, LLC. and Binghamton University.
+## See the top-level LICENSE file for details.
+##
+## SPDX-License-Identifier: Apache-2.0
+################################################################################
+
+from typing import Any, Callable, Optional
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import click
+from loguru import logger
+
+try:
+    from rdkit import Chem
+    HAS_RDKIT = True
+except (ImportError, ModuleNotFoundError) as e:
+    HAS_RDKIT = False
+    logger.warning(
+        "Please install the rdkit support packages to use this module."
+        "Install it with: pip install charge[rdkit]",
+    )
+
+from charge.servers.cache_utils import get_mol
+
+MISSING = object()
+
+
+def method_key(name: str, **params) -> str:
+    """
+    Build the method/version part of a cache key from a method name and the
+    parameters that affect its result (model paths, versions, settings...).
+
+    Args:
+        name (str): The method name.
+        **params: JSON-serializable parameters of the method.
+    Returns:
+        str: "<name>:<short hash of the parameters>".
+    """
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode())
+    return f"{name}:{digest.hexdigest()[:12]}"
+
+
+class PropertyCache:
+    """
+    On-disk cache of computed molecular properties keyed by canonical SMILES,
+    property name and method/version key.
+
+    The cache is a SQLite database in WAL mode, so several server processes
+    (SMILES, property, chemprop, pricer...) can read and write the same file
+    concurrently.
+
+    Args:
+        db_path (str): Path to the SQLite database file.
+        ttl (float, optional): Default maximum age in seconds of the entries
+            returned by get. None means entries never expire.
+    """
+
+    def __init__(self, db_path: str, ttl: Optional[float] = None):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS properties ("
+            "smiles TEXT NOT NULL, property TEXT NOT NULL, method TEXT NOT NULL, "
+            "value TEXT NOT NULL, created_at REAL NOT NULL, "
+            "PRIMARY KEY (smiles, property, method))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS properties_created_at ON properties (created_at)"
+        )
+        self._conn.commit()
+
+    def get(
+        self, smiles: str, prop: str, method: str, max_age: Optional[float] = None
+    ) -> Any:
+        """
+        Look up a cached value.
+
+        Args:
+            smiles (str): Canonical SMILES of the molecule.
+            prop (str): Property name.
+            method (str): Method/version key, see method_key.
+            max_age (float, optional): Maximum age in seconds, defaults to the
+                cache TTL.
+        Returns:
+            The cached value, or MISSING if there is no fresh entry.
+        """
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM properties "
+                "WHERE smiles = ? AND property = ? AND method = ?",
+                (smiles, prop, method),
+            ).fetchone()
+            if row is None or (max_age is not None and time.time() - row[1] > max_age):
+                self.misses += 1
+                return MISSING
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, smiles: str, prop: str, method: str, value: Any) -> None:
+        """Store (or replace) a JSON-serializable value."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO properties "
+                "(smiles, property, method, value, created_at) VALUES (?, ?, ?, ?, ?)",
+                (smiles, prop, method, json.dumps(value), time.time()),
+            )
+            self._conn.commit()
+
+    def prune(self, older_than: Optional[float] = None, prop: Optional[str] = None) -> int:
+        """
+        Delete cache entries.
+
+        Args:
+            older_than (float, optional): Only delete entries older than this
+                many seconds.
+            prop (str, optional): Only delete entries of this property.
+        Returns:
+            int: The number of deleted entries.
+        """
+        clauses, params = [], []
+        if older_than is not None:
+            clauses.append("created_at < ?")
+            params.append(time.time() - older_than)
+        if prop is not None:
+            clauses.append("property = ?")
+            params.append(prop)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            deleted = self._conn.execute(f"DELETE FROM properties{where}", params).rowcount
+            self._conn.commit()
+        return deleted
+
+    def stats(self) -> dict:
+        """Return the per-property entry counts and this process' hit/miss counters."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT property, COUNT(*) FROM properties GROUP BY property"
+            ).fetchall()
+            lookups = self.hits + self.misses
+            return {
+                "entries": dict(rows),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_PROPERTY_CACHE: Optional[PropertyCache] = None
+
+
+def set_property_cache(db_path: Optional[str], ttl: Optional[float] = None) -> None:
+    """
+    Set the process-wide property cache used by the server utilities.
+
+    Args:
+        db_path (str, optional): Path to the SQLite database. None disables caching.
+        ttl (float, optional): Default maximum age of cached entries in seconds.
+    """
+    global _PROPERTY_CACHE
+    if _PROPERTY_CACHE is not None:
+        _PROPERTY_CACHE.close()
+    _PROPERTY_CACHE = PropertyCache(db_path, ttl) if db_path else None
+
+
+def get_property_cache() -> Optional[PropertyCache]:
+    """Return the process-wide property cache, or None if caching is disabled."""
+    return _PROPERTY_CACHE
+
+
+def _cache_key(smiles: str) -> Optional[str]:
+    """Canonical SMILES used as cache key, None if caching does not apply."""
+    if _PROPERTY_CACHE is None:
+        return None
+    mol = get_mol(smiles)
+    return None if mol is None else Chem.MolToSmiles(mol)
+
+
+def lookup(smiles: str, prop: str, method: str, max_age: Optional[float] = None) -> Any:
+    """
+    Look up a property of a molecule in the process-wide cache.
+
+    Returns:
+        The cached value, or MISSING if it is not cached, the cache is
+        disabled or the SMILES cannot be parsed.
+    """
+    key = _cache_key(smiles)
+    if key is None:
+        return MISSING
+    return _PROPERTY_CACHE.get(key, prop, method, max_age)
+
+
+def store(smiles: str, prop: str, method: str, value: Any) -> None:
+    """Store a property of a molecule in the process-wide cache, if enabled."""
+    key = _cache_key(smiles)
+    if key is not None:
+        _PROPERTY_CACHE.put(key, prop, method, value)
+
+
+def cached_compute(
+    smiles: str,
+    prop: str,
+    method: str,
+    compute: Callable[[], Any],
+    max_age: Optional[float] = None,
+) -> Any:
+    """
+    Return the cached value of a property for a molecule, computing and storing
+    it on a miss. The cache is bypassed if it is disabled or if the SMILES
+    cannot be parsed (so error defaults for invalid inputs are never stored).
+
+    Args:
+        smiles (str): The input SMILES string (canonicalized for the key).
+        prop (str): Property name.
+        method (str): Method/version key, see method_key.
+        compute (Callable): Computes the value when it is not cached.
+        max_age (float, optional): Maximum age of a cached value in seconds.
+    Returns:
+        The property value.
+    """
+    key = _cache_key(smiles)
+    if key is None:
+        return compute()
+    value = _PROPERTY_CACHE.get(key, prop, method, max_age)
+    if value is MISSING:
+        value = compute()
+        _PROPERTY_CACHE.put(key, prop, method, value)
+    return value
+
+
+if os.getenv("CHARGE_PROPERTY_CACHE"):
+    ttl = os.getenv("CHARGE_PROPERTY_CACHE_TTL")
+    set_property_cache(os.getenv("CHARGE_PROPERTY_CACHE"), float(ttl) if ttl else None)
+
+
+@click.group()
+@click.option("--db", envvar="CHARGE_PROPERTY_CACHE", required=True, help="Path to the property cache database")
+@click.pass_context
+def main(ctx: click.Context, db: str):
+    """Inspect and maintain the ChARGe molecular property cache."""
+    ctx.obj = PropertyCache(db)
+
+
+@main.command()
+@click.pass_obj
+def stats(cache: PropertyCache):
+    """Show the number of cached entries per property."""
+    for prop, count in sorted(cache.stats()["entries"].items()):
+        click.echo(f"{prop}\t{count}")
+
+
+@main.command()
+@click.option("--older-than", type=float, default=None, help="Only delete entries older than this many days")
+@click.option("--property", "prop", default=None, help="Only delete entries of this property")
+@click.pass_obj
+def prune(cache: PropertyCache, older_than: Optional[float], prop: Optional[str]):
+    """Delete cached entries (all of them by default)."""
+    deleted = cache.prune(older_than * 86400 if older_than is not None else None, prop)
+    click.echo(f"Deleted {deleted} entries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+################################################################################
+## Copyright 2025 Lawrence Livermore National Security, LLC. and Binghamton University.
+## See the top-level LICENSE file for details.
+##
+## SPDX-License-Identifier: Apache-2.0
+################################################################################
+
+from collections import Counter
+import sys
+import threading
+
+from loguru import logger
+
+LOG_MODES = ("verbose", "sampled", "quiet")
+
+
+class ServerMetrics:
+    """
+    Thread-safe named call counters for the server utilities. Replaces the
+    ad-hoc module-level counters that used to be logged on every call.
+    """
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: int = 1) -> int:
+        """Increase counter ``name`` by ``value`` and return its new value."""
+        with self._lock:
+            self._counts[name] += value
+            return self._counts[name]
+
+    def get(self, name: str) -> int:
+        with self._lock:
+            return self._counts[name]
+
+    def snapshot(self) -> dict:
+        """Return a copy of all counters."""
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+METRICS = ServerMetrics()
+
+_log_mode = "verbose"
+_sample_every = 100
+
+
+def configure_server_logging(
+    mode: str = "verbose",
+    sample_every: int = 100,
+    enqueue: bool = False,
+    level: str = "INFO",
+) -> None:
+    """
+    Configure how the chemistry hot paths (SMILES/SMARTS verification,
+    synthesizability, density, ...) log their per-call messages.
+
+    Args:
+        mode (str): "verbose" logs every call, "sampled" logs one call out of
+            every ``sample_every`` per function, and "quiet" only counts calls.
+            Records logged directly through loguru (e.g. unexpected errors)
+            are not affected.
+        sample_every (int): Sampling period used in "sampled" mode.
+        enqueue (bool): If True, replace the loguru handlers with a stderr sink
+            that formats and writes records on a background thread, so logging
+            never blocks the calling tool.
+        level (str): Minimum level of the stderr sink installed when enqueue
+            is True.
+    """
+    global _log_mode, _sample_every
+    if mode not in LOG_MODES:
+        raise ValueError(f"Invalid log mode '{mode}'. Must be one of {LOG_MODES}.")
+    if sample_every < 1:
+        raise ValueError("sample_every must be at least 1")
+    _log_mode = mode
+    _sample_every = sample_every
+    if enqueue:
+        logger.remove()
+        logger.add(sys.stderr, level=level, enqueue=True)
+
+
+def log_call(name: str, message: str, *args, level: str = "INFO") -> None:
+    """
+    Count a call to hot-path function ``name`` and log ``message`` according to
+    the configured mode. The message uses loguru's lazy ``{}`` formatting with
+    ``args``, so nothing is formatted when the record is not emitted.
+
+    Args:
+        name (str): Name of the counter (usually the calling function).
+        message (str): loguru format string.
+        *args: Arguments for the format string.
+        level (str): Log level of the record.
+    """
+    count = METRICS.increment(name)
+    if _log_mode == "quiet":
+        return
+    if _log_mode == "sampled" and (count - 1) % _sample_every:
+        return
+    logger.opt(depth=1).log(level, message, *args)
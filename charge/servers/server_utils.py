@@ -22,6 +22,30 @@ def add_server_arguments(parser: argparse.ArgumentParser) -> None:
         choices=['stdio', 'streamable-http', 'sse'],
         default='sse'
     )
+    parser.add_argument(
+        "--log-mode", type=str,
+        help="Per-call logging of the chemistry tools: every call, a sample of calls, or none",
+        choices=["verbose", "sampled", "quiet"],
+        default="verbose",
+    )
+    parser.add_argument(
+        "--log-sample-every", type=int, default=100,
+        help="Log one call out of this many per tool when --log-mode=sampled",
+    )
+    parser.add_argument(
+        "--log-enqueue", action="store_true",
+        help="Write log records from a background thread instead of blocking the tool call",
+    )
+    parser.add_argument(
+        "--property-cache", type=str, default=None,
+        help="SQLite database caching computed molecular properties across processes "
+        "and restarts (default: $CHARGE_PROPERTY_CACHE, disabled if unset)",
+    )
+    parser.add_argument(
+        "--conformer-store", type=str, default=None,
+        help="Directory storing embedded 3D conformers for reuse by density and other "
+        "3D descriptors (default: $CHARGE_CONFORMER_STORE, disabled if unset)",
+    )
 
 
 def update_mcp_network(mcp: FastMCP, host: str, port: str):
@@ -0,0 +1,286 @@
+################################################################################
+## Copyright 2025 Lawrence Livermore National Security, LLC. and Binghamton University.
+## See the top-level LICENSE file for details.
+##
+## SPDX-License-Identifier: Apache-2.0
+################################################################################
+
+from typing import Iterable, Optional
+import threading
+
+from loguru import logger
+
+try:
+    from rdkit import Chem
+    from rdkit.Chem import rdFingerprintGenerator
+    import numpy as np
+    HAS_RDKIT = True
+except (ImportError, ModuleNotFoundError) as e:
+    HAS_RDKIT = False
+    logger.warning(
+        "Please install the rdkit support packages to use this module."
+        "Install it with: pip install charge[rdkit]",
+    )
+
+from charge.servers.cache_utils import get_mol
+
+# Rows scanned per vectorized block, bounds the size of temporary arrays.
+_BLOCK_ROWS = 1 << 16
+
+
+def _popcount(words: "np.ndarray") -> "np.ndarray":
+    """Number of set bits per row of a 2D uint64 array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int32)
+    table = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+    as_bytes = words.view(np.uint8).reshape(words.shape[0], -1)
+    return table[as_bytes].sum(axis=-1, dtype=np.int32)
+
+
+class _PopcountBucket:
+    """Growable block of fingerprint rows that all have the same bit count."""
+
+    def __init__(self, n_words: int):
+        self.words = np.zeros((16, n_words), dtype=np.uint64)
+        self.rows = np.zeros(16, dtype=np.int64)
+        self.size = 0
+
+    def add(self, fp: "np.ndarray", row: int) -> None:
+        if self.size == len(self.rows):
+            self.words = np.concatenate([self.words, np.zeros_like(self.words)])
+            self.rows = np.concatenate([self.rows, np.zeros_like(self.rows)])
+        self.words[self.size] = fp
+        self.rows[self.size] = row
+        self.size += 1
+
+    def view(self) -> tuple["np.ndarray", "np.ndarray"]:
+        # Rows added later land past size or in a new array, so the view
+        # stays consistent without holding the lock
+        return self.words[: self.size], self.rows[: self.size]
+
+
+def _max_tanimoto(count: int, query_count: int) -> float:
+    """Upper bound of the Tanimoto similarity of fingerprints with these bit counts."""
+    if max(count, query_count) == 0:
+        return 1.0
+    return min(count, query_count) / max(count, query_count)
+
+
+class FingerprintIndex:
+    """
+    In-memory Tanimoto similarity index over Morgan fingerprints.
+
+    Fingerprints are bit-packed into rows of ``n_bits / 64`` uint64 words and
+    bucketed by their number of set bits. Two fingerprints with a and b bits
+    set have a Tanimoto similarity of at most min(a, b) / max(a, b), so a
+    threshold query only scans the buckets that can reach the threshold, and
+    a top-k query scans buckets from the highest bound down and stops once no
+    remaining bucket can beat the current k-th neighbor. Each scanned bucket
+    is a vectorized AND plus popcount, in fixed-size blocks.
+
+    Molecules are keyed by canonical isomeric SMILES and are only indexed
+    once. Queries can exclude the query molecule itself, so that an indexed
+    molecule is not reported as its own near-duplicate.
+
+    Args:
+        radius (int): Morgan fingerprint radius.
+        n_bits (int): Fingerprint length, must be a multiple of 64.
+    """
+
+    def __init__(self, radius: int = 2, n_bits: int = 2048):
+        if not HAS_RDKIT:
+            raise ImportError("Please install the rdkit support packages to use this module.")
+        if n_bits % 64:
+            raise ValueError("n_bits must be a multiple of 64")
+        self.radius = radius
+        self.n_bits = n_bits
+        self._generator = rdFingerprintGenerator.GetMorganGenerator(
+            radius=radius, fpSize=n_bits
+        )
+        self._buckets: dict[int, _PopcountBucket] = {}
+        self._smiles: list[str] = []
+        self._rows: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._smiles)
+
+    def __contains__(self, smiles: str) -> bool:
+        return smiles in self._rows
+
+    def _fingerprint(self, mol) -> "np.ndarray":
+        bits = self._generator.GetFingerprintAsNumPy(mol).astype(np.uint8)
+        return np.packbits(bits).view(np.uint64)
+
+    def _parse(self, smiles: str):
+        mol = get_mol(smiles)
+        if mol is None:
+            raise ValueError(f"Invalid SMILES string: {smiles}")
+        return mol
+
+    def add(self, smiles: str) -> bool:
+        """
+        Add a molecule to the index.
+
+        Args:
+            smiles (str): The input SMILES string.
+        Returns:
+            bool: True if the molecule was added, False if it was already indexed.
+        Raises:
+            ValueError: If the SMILES string is invalid.
+        """
+        mol = self._parse(smiles)
+        key = Chem.MolToSmiles(mol, isomericSmiles=True)
+        if key in self._rows:
+            return False
+        fp = self._fingerprint(mol)
+        count = int(_popcount(fp[None, :])[0])
+        with self._lock:
+            if key in self._rows:
+                return False
+            if count not in self._buckets:
+                self._buckets[count] = _PopcountBucket(self.n_bits // 64)
+            self._buckets[count].add(fp, len(self._smiles))
+            self._rows[key] = len(self._smiles)
+            self._smiles.append(key)
+        return True
+
+    def add_many(self, smiles_list: Iterable[str]) -> int:
+        """
+        Add several molecules to the index, skipping invalid SMILES.
+
+        Args:
+            smiles_list (Iterable[str]): The input SMILES strings.
+        Returns:
+            int: The number of molecules newly added.
+        """
+        added = 0
+        for smiles in smiles_list:
+            try:
+                added += self.add(smiles)
+            except Exception as e:
+                logger.warning("Skipping molecule {}: {}", smiles, e)
+        return added
+
+    def _query(self, smiles: str, exclude_self: bool):
+        # Query fingerprint, its bit count, the row to exclude (-1 for none)
+        # and a snapshot of the buckets
+        mol = self._parse(smiles)
+        query = self._fingerprint(mol)
+        query_count = int(_popcount(query[None, :])[0])
+        with self._lock:
+            n = len(self._smiles)
+            buckets = {count: bucket.view() for count, bucket in self._buckets.items()}
+        row = -1
+        if exclude_self:
+            row = self._rows.get(Chem.MolToSmiles(mol, isomericSmiles=True), -1)
+        return query, query_count, row, n, buckets
+
+    @staticmethod
+    def _bucket_similarities(
+        words: "np.ndarray", count: int, query: "np.ndarray", query_count: int
+    ) -> "np.ndarray":
+        sims = np.empty(len(words), dtype=np.float32)
+        for start in range(0, len(words), _BLOCK_ROWS):
+            stop = min(start + _BLOCK_ROWS, len(words))
+            common = _popcount(words[start:stop] & query)
+            union = count + query_count - common
+            sims[start:stop] = np.where(union > 0, common / np.maximum(union, 1), 1.0)
+        return sims
+
+    def similarities(self, smiles: str, exclude_self: bool = False) -> "np.ndarray":
+        """
+        Tanimoto similarity of a molecule to every indexed molecule. This scans
+        the whole index; most_similar and any_similar only scan the buckets
+        that can contain the answer.
+
+        Args:
+            smiles (str): The query SMILES string.
+            exclude_self (bool): If True and the query is indexed, its own
+                similarity is reported as -1.0.
+        Returns:
+            np.ndarray: Similarities in insertion order of the indexed molecules.
+        """
+        query, query_count, self_row, n, buckets = self._query(smiles, exclude_self)
+        sims = np.empty(n, dtype=np.float32)
+        for count, (words, rows) in buckets.items():
+            sims[rows] = self._bucket_similarities(words, count, query, query_count)
+        if 0 <= self_row < n:
+            sims[self_row] = -1.0
+        return sims
+
+    def _search(
+        self, smiles: str, k: int, min_bound: float, exclude_self: bool
+    ) -> list[tuple[str, float]]:
+        # Best k neighbors among the buckets whose similarity bound is at
+        # least min_bound, scanning the most promising buckets first
+        query, query_count, self_row, _, buckets = self._query(smiles, exclude_self)
+        order = sorted(
+            ((_max_tanimoto(count, query_count), count) for count in buckets),
+            reverse=True,
+        )
+        best_sims = np.empty(0, dtype=np.float32)
+        best_rows = np.empty(0, dtype=np.int64)
+        for bound, count in order:
+            # Small tolerance, as the similarities are float32
+            if bound < min_bound - 1e-6:
+                break
+            if len(best_sims) == k and bound < best_sims[-1] - 1e-6:
+                break
+            words, rows = buckets[count]
+            sims = self._bucket_similarities(words, count, query, query_count)
+            if self_row >= 0:
+                sims[rows == self_row] = -1.0
+            keep = sims >= 0.0
+            best_sims = np.concatenate([best_sims, sims[keep]])
+            best_rows = np.concatenate([best_rows, rows[keep]])
+            if len(best_sims) > k:
+                top = np.argpartition(-best_sims, k - 1)[:k]
+                best_sims, best_rows = best_sims[top], best_rows[top]
+            # Best first; ties keep insertion order
+            order_top = np.lexsort((best_rows, -best_sims))
+            best_sims, best_rows = best_sims[order_top], best_rows[order_top]
+        return [(self._smiles[i], float(sim)) for i, sim in zip(best_rows, best_sims)]
+
+    def most_similar(
+        self, smiles: str, k: int = 5, exclude_self: bool = False
+    ) -> list[tuple[str, float]]:
+        """
+        Return the k indexed molecules most similar to the query, best first.
+
+        Args:
+            smiles (str): The query SMILES string.
+            k (int): Number of neighbors to return.
+            exclude_self (bool): If True, never return the query molecule itself.
+        Returns:
+            list[tuple[str, float]]: (canonical SMILES, Tanimoto similarity) pairs.
+        """
+        if k <= 0:
+            return []
+        return self._search(smiles, k, 0.0, exclude_self)
+
+    def any_similar(
+        self, smiles: str, threshold: float, exclude_self: bool = False
+    ) -> tuple[bool, Optional[str], float]:
+        """
+        Check whether any indexed molecule has a similarity of at least threshold.
+        Only the molecules whose bit count allows a similarity of at least
+        threshold are compared, so the nearest molecule reported when none
+        reaches the threshold is the nearest among those.
+
+        Args:
+            smiles (str): The query SMILES string.
+            threshold (float): Tanimoto similarity threshold in [0, 1].
+            exclude_self (bool): If True, ignore the query molecule itself.
+        Returns:
+            A tuple containing:
+                bool: True if a molecule at or above the threshold exists.
+                str: The most similar compared molecule, or None if no
+                    molecule was compared.
+                float: Its similarity to the query.
+        """
+        neighbors = self._search(smiles, 1, threshold, exclude_self)
+        if not neighbors:
+            return False, None, 0.0
+        nearest, similarity = neighbors[0]
+        return similarity >= threshold, nearest, similarity
@@ -0,0 +1,318 @@
+################################################################################
+## Copyright 2025 Lawrence Livermore National Security, LLC. and Binghamton University.
+## See the top-level LICENSE file for details.
+##
+## SPDX-License-Identifier: Apache-2.0
+################################################################################
+
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+import csv
+import gzip
+import math
+import os
+import sqlite3
+import threading
+import time
+
+import click
+from loguru import logger
+
+try:
+    from rdkit import Chem, RDLogger
+    HAS_RDKIT = True
+except (ImportError, ModuleNotFoundError) as e:
+    HAS_RDKIT = False
+    logger.warning(
+        "Please install the rdkit support packages to use this module."
+        "Install it with: pip install charge[rdkit]",
+    )
+
+from charge.servers.cache_utils import get_mol
+from charge.servers.chemspace_client import GRAMS_PER_UNIT
+
+# Catalog fields and the default CSV column (or SDF property) they are read from
+CATALOG_COLUMNS = {
+    "smiles": "smiles",
+    "supplier": "supplier",
+    "id": "id",
+    "price": "price_usd",
+    "amount": "amount",
+    "unit": "unit",
+    "usd_per_g": "usd_per_g",
+}
+
+# Rows inserted per executemany call while importing
+IMPORT_BATCH_SIZE = 10000
+
+# Maximum number of parameters in one SQLite IN (...) lookup
+_LOOKUP_CHUNK = 500
+
+
+def inchikey(smiles: str) -> Optional[str]:
+    """InChIKey of a molecule, None if the SMILES string cannot be parsed."""
+    if not HAS_RDKIT:
+        raise ImportError("Please install the rdkit support packages to use this module.")
+    mol = get_mol(smiles)
+    if mol is None:
+        return None
+    return Chem.MolToInchiKey(mol) or None
+
+
+def _offer_usd_per_g(record: dict, columns: dict) -> Optional[float]:
+    # Price per gram, given directly or as a package price, amount and unit
+    try:
+        value = record.get(columns["usd_per_g"])
+        if value not in (None, ""):
+            return float(value)
+        grams = GRAMS_PER_UNIT.get(str(record.get(columns["unit"], "g")).strip().lower())
+        price = float(record[columns["price"]])
+        amount = float(record[columns["amount"]])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if grams is None or amount <= 0:
+        return None
+    return price / (amount * grams)
+
+
+def _open(path: str, binary: bool = False):
+    opener = gzip.open if path.endswith(".gz") else open
+    return opener(path, "rb") if binary else opener(path, "rt", newline="")
+
+
+def iter_catalog_offers(
+    path: str, supplier: Optional[str] = None, columns: Optional[dict] = None
+) -> Iterator[tuple[str, str, float, Optional[str]]]:
+    """
+    Stream the offers of a vendor catalog dump (.csv or .sdf, optionally
+    gzipped), one record at a time. Records without a parseable structure or
+    a price per gram are skipped.
+
+    Args:
+        path (str): The catalog file.
+        supplier (str, optional): Supplier of every record, for single-vendor
+            dumps without a supplier column.
+        columns (dict, optional): Overrides of CATALOG_COLUMNS.
+    Yields:
+        tuple: (InChIKey, supplier, USD/g, catalog id).
+    """
+    if not HAS_RDKIT:
+        raise ImportError("Please install the rdkit support packages to use this module.")
+    columns = {**CATALOG_COLUMNS, **(columns or {})}
+    name = path[:-3] if path.endswith(".gz") else path
+    ext = os.path.splitext(name)[1].lower()
+    if ext == ".csv":
+        def records():
+            with _open(path) as f:
+                for row in csv.DictReader(f):
+                    yield row, inchikey(row.get(columns["smiles"]) or "")
+    elif ext in (".sdf", ".sd"):
+        def records():
+            RDLogger.DisableLog("rdApp.*")
+            with _open(path, binary=True) as f:
+                for mol in Chem.ForwardSDMolSupplier(f):
+                    if mol is None:
+                        continue
+                    props = mol.GetPropsAsDict()
+                    yield props, Chem.MolToInchiKey(mol) or None
+    else:
+        raise ValueError(f"Unsupported catalog format '{ext}'. Use .csv or .sdf")
+
+    for record, key in records():
+        vendor = supplier or record.get(columns["supplier"])
+        usd_per_g = _offer_usd_per_g(record, columns)
+        if key is None or not vendor or usd_per_g is None or math.isnan(usd_per_g):
+            continue
+        catalog_id = record.get(columns["id"])
+        yield key, str(vendor), usd_per_g, None if catalog_id is None else str(catalog_id)
+
+
+class VendorCatalog:
+    """
+    Local vendor price catalog: the best (lowest) USD/g price of each
+    supplier for each molecule, indexed by InChIKey.
+
+    The catalog is a SQLite database with one row per (InChIKey, supplier)
+    pair, so lookups are a single primary key search and need no network.
+
+    Args:
+        db_path (str): Path to the SQLite database file.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS offers ("
+            "inchikey TEXT NOT NULL, supplier TEXT NOT NULL, usd_per_g REAL NOT NULL, "
+            "catalog_id TEXT, updated_at REAL NOT NULL, "
+            "PRIMARY KEY (inchikey, supplier)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+
+    def add_offers(self, offers: Iterable[tuple[str, str, float, Optional[str]]]) -> int:
+        """
+        Add offers, keeping the lowest price of each supplier for a molecule.
+
+        Args:
+            offers (Iterable[tuple]): (InChIKey, supplier, USD/g, catalog id).
+        Returns:
+            int: The number of offers read.
+        """
+        count = 0
+        offers = iter(offers)
+        while True:
+            now = time.time()
+            batch = [(*offer, now) for offer in islice(offers, IMPORT_BATCH_SIZE)]
+            if not batch:
+                return count
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT INTO offers (inchikey, supplier, usd_per_g, catalog_id, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?) ON CONFLICT (inchikey, supplier) DO UPDATE SET "
+                    "usd_per_g = excluded.usd_per_g, catalog_id = excluded.catalog_id, "
+                    "updated_at = excluded.updated_at "
+                    "WHERE excluded.usd_per_g < offers.usd_per_g",
+                    batch,
+                )
+                self._conn.commit()
+            count += len(batch)
+
+    def import_file(
+        self, path: str, supplier: Optional[str] = None, columns: Optional[dict] = None
+    ) -> int:
+        """Import a .csv or .sdf catalog dump, see iter_catalog_offers. Returns the offers read."""
+        return self.add_offers(iter_catalog_offers(path, supplier, columns))
+
+    def best_prices(self, inchikeys: list[str]) -> dict[str, float]:
+        """
+        Return the lowest USD/g over all suppliers of the molecules found in
+        the catalog.
+
+        Args:
+            inchikeys (list[str]): InChIKeys to look up.
+        Returns:
+            dict[str, float]: InChIKey -> lowest USD/g, for the molecules found.
+        """
+        unique = list(dict.fromkeys(inchikeys))
+        prices = {}
+        with self._lock:
+            for start in range(0, len(unique), _LOOKUP_CHUNK):
+                chunk = unique[start:start + _LOOKUP_CHUNK]
+                rows = self._conn.execute(
+                    "SELECT inchikey, MIN(usd_per_g) FROM offers "
+                    f"WHERE inchikey IN ({', '.join('?' * len(chunk))}) GROUP BY inchikey",
+                    chunk,
+                ).fetchall()
+                prices.update(rows)
+            self.hits += len(prices)
+            self.misses += len(unique) - len(prices)
+        return prices
+
+    def best_price(self, inchikey: str) -> Optional[float]:
+        """Lowest USD/g of a molecule over all suppliers, None if not in the catalog."""
+        return self.best_prices([inchikey]).get(inchikey)
+
+    def offers(self, inchikey: str) -> list[dict]:
+        """All supplier offers of a molecule, cheapest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT supplier, usd_per_g, catalog_id FROM offers "
+                "WHERE inchikey = ? ORDER BY usd_per_g",
+                (inchikey,),
+            ).fetchall()
+        return [
+            {"supplier": supplier, "usd_per_g": usd_per_g, "catalog_id": catalog_id}
+            for supplier, usd_per_g, catalog_id in rows
+        ]
+
+    def stats(self) -> dict:
+        """Return the number of molecules, offers and suppliers and this process' hit/miss counters."""
+        with self._lock:
+            molecules, offers, suppliers = self._conn.execute(
+                "SELECT COUNT(DISTINCT inchikey), COUNT(*), COUNT(DISTINCT supplier) FROM offers"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "molecules": molecules,
+                "offers": offers,
+                "suppliers": suppliers,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_VENDOR_CATALOG: Optional[VendorCatalog] = None
+
+
+def set_vendor_catalog(db_path: Optional[str]) -> None:
+    """
+    Set the process-wide vendor catalog used for price lookups.
+
+    Args:
+        db_path (str, optional): Path to the catalog database. None disables it.
+    """
+    global _VENDOR_CATALOG
+    if _VENDOR_CATALOG is not None:
+        _VENDOR_CATALOG.close()
+    _VENDOR_CATALOG = VendorCatalog(db_path) if db_path else None
+
+
+def get_vendor_catalog() -> Optional[VendorCatalog]:
+    """Return the process-wide vendor catalog, or None if none is configured."""
+    return _VENDOR_CATALOG
+
+
+if os.getenv("CHARGE_VENDOR_CATALOG"):
+    set_vendor_catalog(os.getenv("CHARGE_VENDOR_CATALOG"))
+
+
+@click.group()
+@click.option("--db", envvar="CHARGE_VENDOR_CATALOG", required=True, help="Path to the vendor catalog database")
+@click.pass_context
+def main(ctx: click.Context, db: str):
+    """Build and inspect the offline ChARGe vendor price catalog."""
+    ctx.obj = VendorCatalog(db)
+
+
+@main.command("import")
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option("--supplier", default=None, help="Supplier of every record (for dumps without a supplier column)")
+@click.option("--column", "column_overrides", multiple=True, help="Column mapping FIELD=COLUMN, e.g. price=Price_USD")
+@click.pass_obj
+def import_catalog(catalog: VendorCatalog, paths: tuple, supplier: Optional[str], column_overrides: tuple):
+    """Import vendor catalog dumps (.csv or .sdf, optionally gzipped)."""
+    columns = {}
+    for override in column_overrides:
+        field, _, column = override.partition("=")
+        if field not in CATALOG_COLUMNS or not column:
+            raise click.BadParameter(
+                f"Expected FIELD=COLUMN with FIELD among {list(CATALOG_COLUMNS)}", param_hint="--column"
+            )
+        columns[field] = column
+    for path in paths:
+        start = time.perf_counter()
+        count = catalog.import_file(path, supplier, columns)
+        click.echo(f"{path}: {count} offers in {time.perf_counter() - start:.1f} s")
+
+
+@main.command()
+@click.pass_obj
+def stats(catalog: VendorCatalog):
+    """Show the number of molecules, offers and suppliers in the catalog."""
+    info = catalog.stats()
+    for key in ("molecules", "offers", "suppliers"):
+        click.echo(f"{key}\t{info[key]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import charge
 from charge.tasks.Task import Task
 from charge.servers import SMILES_utils
-from charge.servers.molecular_property_utils import get_density
+from charge.servers.molecular_property_utils import compute_properties, get_density
 import charge.utils.helper_funcs
 from typing import Optional, List
 from pydantic import BaseModel, field_validator
@@ -97,8 +97,9 @@ class LMOTask(Task):
         self.user_prompt = user_prompt
         self.verification_prompt = verification_prompt
         self.refinement_prompt = refinement_prompt
-        self.max_synth_score = SMILES_utils.get_synthesizability(lead_molecule)
-        self.min_density = get_density(lead_molecule)
+        lead_properties = compute_properties(lead_molecule, ["sascore", "density"])
+        self.max_synth_score = lead_properties["sascore"]
+        self.min_density = lead_properties["density"]
         self.set_structured_output_schema(MoleculeOutputSchema)
 
     def check_proposal(self, smiles: str) -> bool:
@@ -2,7 +2,7 @@ from rdkit import Chem
 from rdkit.Chem import AllChem, Descriptors
 import json
 from charge.servers import SMILES_utils
-from charge.servers.molecular_property_utils import get_density
+from charge.servers.molecular_property_utils import compute_properties, get_density
 
 
 def get_list_from_json_file(file_path: str) -> list:
@@ -49,8 +49,7 @@ def post_process_smiles(smiles: str, parent_id: int, node_id: int) -> dict:
     Returns:
         dict: The post-processed dictionary.
     """
-    canonical_smiles = SMILES_utils.canonicalize_smiles(smiles)
-    sascore = SMILES_utils.get_synthesizability(canonical_smiles)
-    density = get_density(canonical_smiles)
+    result = compute_properties(smiles, ["canonical_smiles", "sascore", "density"])
+    canonical_smiles = result["canonical_smiles"] if result["valid"] else "Invalid SMILES"
 
-    return {"smiles": canonical_smiles, "sascore": sascore, "density": density}
+    return {"smiles": canonical_smiles, "sascore": result["sascore"], "density": result["density"]}
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from charge.servers.batching import MicroBatcher
+
+
+def test_concurrent_requests_are_batched_per_key():
+    calls = []
+
+    def process(key, items):
+        calls.append((key, list(items)))
+        return [f"{key}:{item}" for item in items]
+
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait=0.05)
+
+    async def run():
+        return await asyncio.gather(
+            *[batcher.submit("a", i) for i in range(6)], batcher.submit("b", 0)
+        )
+
+    results = asyncio.run(run())
+    assert results == [f"a:{i}" for i in range(6)] + ["b:0"]
+    assert sorted(calls) == [("a", [0, 1, 2, 3]), ("a", [4, 5]), ("b", [0])]
+    assert batcher.stats() == {"batches": 3, "items": 7, "mean_batch_size": 7 / 3}
+
+
+def test_batch_errors_reach_every_caller():
+    def process(key, items):
+        raise ValueError("model failed")
+
+    batcher = MicroBatcher(process, max_batch_size=8, max_wait=0.01)
+
+    async def run():
+        return await asyncio.gather(
+            batcher.submit("a", 1), batcher.submit("a", 2), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, ValueError) for r in results)
+
+    # The batcher can be reused from a new event loop
+    batcher.process_batch = lambda key, items: items
+    assert asyncio.run(batcher.submit("a", 3)) == 3
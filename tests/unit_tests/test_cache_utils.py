@@ -0,0 +1,48 @@
+import pytest
+
+
+def test_lru_cache_eviction_and_counters():
+    from charge.servers.cache_utils import LRUCache
+
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.put("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+
+
+def test_lru_cache_get_or_compute():
+    from charge.servers.cache_utils import LRUCache
+
+    calls = []
+    cache = LRUCache(maxsize=4)
+
+    def compute():
+        calls.append(1)
+        return None
+
+    # None results are cached too, so invalid inputs are not recomputed
+    assert cache.get_or_compute("x", compute) is None
+    assert cache.get_or_compute("x", compute) is None
+    assert len(calls) == 1
+
+
+def test_get_mol_shared_between_calls():
+    pytest.importorskip("rdkit")
+    from charge.servers.cache_utils import get_mol, MOL_CACHE
+
+    MOL_CACHE.clear()
+    mol = get_mol("CCO")
+    assert mol is not None
+    assert get_mol("CCO") is mol
+    assert get_mol("C1CC") is None
+    assert MOL_CACHE.stats()["hits"] == 1
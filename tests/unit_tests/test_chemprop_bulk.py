@@ -0,0 +1,59 @@
+import pytest
+
+pytest.importorskip("rdkit")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+class _FakeRegistry:
+    def __init__(self, base_path, device, memory_budget_mb, variant):
+        pass
+
+    def predict_many(self, props, smiles, batch_size):
+        return {p: [[float(len(s))] for s in smiles] for p in props}
+
+
+def test_bulk_scoring_is_resumable(monkeypatch, tmp_path):
+    import charge.servers.chemprop_bulk as chemprop_bulk
+
+    monkeypatch.setattr(chemprop_bulk, "ChempropModelRegistry", _FakeRegistry)
+    monkeypatch.setattr(chemprop_bulk, "set_num_threads", lambda num_threads: None)
+    smi = tmp_path / "library.smi"
+    smi.write_text("CCO a\nC1CC b\nc1ccccc1 c\nCC d\nCCC e\n")
+    out = tmp_path / "scores"
+
+    stats = chemprop_bulk.run_bulk_scoring(
+        str(smi), str(out), "models", ["gap", "lipo"], workers=0, chunk_size=2
+    )
+    assert (stats["molecules"], stats["valid"]) == (5, 4)
+
+    table = pq.read_table(str(out)).sort_by("id")
+    assert table.column("id").to_pylist() == ["a", "b", "c", "d", "e"]
+    assert table.column("gap").to_pylist() == [3.0, None, 8.0, 2.0, 3.0]
+
+    (out / "part-000001.parquet").unlink()
+    stats = chemprop_bulk.run_bulk_scoring(
+        str(smi), str(out), "models", ["gap", "lipo"], workers=0, chunk_size=2
+    )
+    assert (stats["molecules"], stats["skipped_chunks"]) == (2, 2)
+
+    with pytest.raises(ValueError):
+        chemprop_bulk.run_bulk_scoring(str(smi), str(out), "models", ["gap"], workers=0, chunk_size=2)
+
+
+def test_bulk_scoring_refuses_modified_input(monkeypatch, tmp_path):
+    import os
+    import charge.servers.chemprop_bulk as chemprop_bulk
+
+    monkeypatch.setattr(chemprop_bulk, "ChempropModelRegistry", _FakeRegistry)
+    monkeypatch.setattr(chemprop_bulk, "set_num_threads", lambda num_threads: None)
+    smi = tmp_path / "library.smi"
+    smi.write_text("CCO a\nCC b\n")
+    out = tmp_path / "scores"
+    chemprop_bulk.run_bulk_scoring(str(smi), str(out), "models", ["gap"], workers=0, chunk_size=2)
+
+    # Same path and size, but rewritten later
+    smi.write_text("CCN a\nCC b\n")
+    stat = smi.stat()
+    os.utime(smi, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    with pytest.raises(ValueError):
+        chemprop_bulk.run_bulk_scoring(str(smi), str(out), "models", ["gap"], workers=0, chunk_size=2)
@@ -0,0 +1,60 @@
+import math
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+
+class _TinyMPNN(torch.nn.Module):
+    """Same layout as a Chemprop MPNN: message passing, then an FFN predictor."""
+
+    def __init__(self):
+        super().__init__()
+        self.message_passing = torch.nn.Sequential(torch.nn.Linear(16, 32), torch.nn.ReLU())
+        self.predictor = torch.nn.Sequential(
+            torch.nn.Linear(32, 32), torch.nn.ReLU(), torch.nn.Linear(32, 1)
+        )
+
+    def forward(self, bmg, V_d=None, X_d=None):
+        return self.predictor(self.message_passing(bmg))
+
+
+@pytest.fixture
+def export(monkeypatch):
+    import charge.servers.chemprop_export as chemprop_export
+
+    torch.manual_seed(0)
+    features = {}
+
+    def featurize(smiles, batch_size):
+        # One random feature vector per molecule in place of a molecular graph
+        x = torch.stack([features.setdefault(s, torch.randn(16)) for s in smiles])
+        return [(x[i:i + batch_size], None, None) for i in range(0, len(smiles), batch_size)]
+
+    monkeypatch.setattr(chemprop_export.chemprop_preds, "HAS_CHEMPROP", True)
+    monkeypatch.setattr(chemprop_export.chemprop_preds, "torch", torch, raising=False)
+    monkeypatch.setattr(chemprop_export.chemprop_preds, "featurize_smiles", featurize)
+    return chemprop_export
+
+
+def _quantized_linears(model):
+    return [m for m in model.modules() if isinstance(m, torch.ao.nn.quantized.dynamic.Linear)]
+
+
+@pytest.mark.parametrize("mode, expected", [("none", 0), ("ffn", 2), ("all", 3)])
+def test_quantize_model(export, mode, expected):
+    reference = _TinyMPNN().eval()
+    quantized = export.quantize_model(reference, mode)
+    assert len(_quantized_linears(quantized)) == expected
+    # The original model is left untouched
+    assert _quantized_linears(reference) == []
+
+
+def test_accuracy_report(export):
+    reference = _TinyMPNN().eval()
+    quantized = export.quantize_model(reference, "all")
+    report = export.accuracy_report(reference, quantized, export.DEFAULT_VALIDATION_SMILES, 4)
+    assert report["molecules"] == len(export.DEFAULT_VALIDATION_SMILES)
+    assert all(math.isfinite(v) for v in report.values())
+    assert report["max_abs_error"] < 0.05
+    assert report["relative_mean_abs_error"] < 0.1
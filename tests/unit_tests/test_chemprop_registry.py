@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+
+class _Tensor:
+    def __init__(self, n):
+        self.n = n
+
+    def numel(self):
+        return self.n
+
+    def element_size(self):
+        return 4
+
+
+class _FakeModel:
+    def __init__(self, path, n_params):
+        self.path = path
+        self.n_params = n_params
+
+    def parameters(self):
+        return [_Tensor(self.n_params)]
+
+    def buffers(self):
+        return []
+
+
+@pytest.fixture
+def registry(monkeypatch, tmp_path):
+    import charge.servers.chemprop_registry as chemprop_registry
+
+    loaded = []
+
+    def load(path, device):
+        loaded.append(path)
+        return _FakeModel(path, 1024 * 1024 // 4)  # 1 MB
+
+    monkeypatch.setattr(chemprop_registry.chemprop_preds, "load_chemprop_model", load)
+    monkeypatch.setattr(
+        chemprop_registry.chemprop_preds,
+        "predict_with_model",
+        lambda model, smiles, device, batch_size: [[float(len(s))] for s in smiles],
+    )
+    featurized = []
+
+    def featurize(smiles, batch_size):
+        featurized.append(list(smiles))
+        return [smiles]
+
+    monkeypatch.setattr(chemprop_registry.chemprop_preds, "featurize_smiles", featurize)
+    monkeypatch.setattr(
+        chemprop_registry.chemprop_preds,
+        "predict_featurized",
+        lambda model, batches, device: np.array(
+            [[len(s) * (1 + model.path.count("hof"))] for b in batches for s in b], dtype=float
+        ),
+    )
+    registry = chemprop_registry.ChempropModelRegistry(str(tmp_path), memory_budget_mb=2)
+    registry.loaded = loaded
+    registry.featurized = featurized
+    return registry
+
+
+def test_models_are_loaded_once(registry, tmp_path):
+    assert registry.predict("gap", ["CCO", "C"]) == [[3.0], [1.0]]
+    assert registry.predict("gap", ["CC"]) == [[2.0]]
+    assert registry.loaded == [str(tmp_path / "gap" / "model_0" / "best.pt")]
+
+    timings = registry.stats()["timings"]["gap"]
+    assert timings["loads"] == 1
+    assert timings["calls"] == 2
+    assert timings["molecules"] == 3
+
+
+def test_lru_eviction_under_memory_budget(registry):
+    registry.get("gap")
+    registry.get("homo")
+    registry.get("gap")
+    registry.get("lumo")
+
+    stats = registry.stats()
+    assert stats["resident"] == ["gap", "lumo"]
+    assert stats["evictions"] == 1
+    assert stats["memory_mb"] == pytest.approx(2.0)
+
+    registry.get("homo")
+    assert len(registry.loaded) == 4
+
+
+def test_invalid_property(registry):
+    with pytest.raises(ValueError):
+        registry.get("color")
+
+
+def test_predict_many_featurizes_once(registry):
+    preds = registry.predict_many(["gap", "hof"], ["CCO", "C"])
+    assert preds == {"gap": [[3.0], [1.0]], "hof": [[6.0], [2.0]]}
+    assert registry.featurized == [["CCO", "C"]]
+    assert set(registry.stats()["timings"]) == {"gap", "hof"}
+
+
+def test_exported_variant(monkeypatch, tmp_path):
+    import charge.servers.chemprop_registry as chemprop_registry
+
+    loaded = []
+    monkeypatch.setattr(
+        chemprop_registry.chemprop_export,
+        "load_exported_model",
+        lambda path, device: loaded.append(path) or _FakeModel(path, 16),
+    )
+    registry = chemprop_registry.ChempropModelRegistry(str(tmp_path), variant="int8")
+    assert registry.model_path("gap") == str(tmp_path / "gap" / "model_0" / "best_int8.pt")
+    registry.get("gap")
+    assert loaded == [registry.model_path("gap")]
@@ -0,0 +1,92 @@
+import asyncio
+import math
+import time
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from charge.servers.chemspace_client import ChemSpaceClient, TokenBucket, best_usd_per_g
+
+OFFERS = {
+    "CCO": [
+        {"vendorName": "A", "prices": [{"pack": 500, "uom": "mg", "priceUsd": 10.0}]},
+        {"vendorName": "B", "prices": [
+            {"pack": 1, "uom": "g", "priceUsd": 8.0},
+            {"pack": 10, "uom": "micromol", "priceUsd": 0.01},
+        ]},
+    ],
+}
+
+
+def stand_in(log):
+    """Local stand-in of the ChemSpace API."""
+    tokens = iter(["t1", "t2", "t3"])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        log.append(request.url.path)
+        if request.url.path == "/auth/token":
+            assert request.headers["Authorization"] == "Bearer key"
+            return httpx.Response(200, json={"access_token": next(tokens), "expires_in": 3600})
+        if request.headers["Authorization"] == "Bearer t1" and log.count("expire") == 0:
+            log.append("expire")
+            return httpx.Response(401)
+        smiles = dict(httpx.QueryParams(request.content.decode()))["SMILES"]
+        if smiles not in OFFERS:
+            return httpx.Response(200, json={"count": 0, "items": []})
+        return httpx.Response(200, json={"count": 1, "items": [{"offers": OFFERS[smiles]}]})
+
+    return httpx.MockTransport(handler)
+
+
+def test_best_usd_per_g_ignores_non_mass_units():
+    assert best_usd_per_g(OFFERS["CCO"]) == 8.0
+    assert math.isnan(best_usd_per_g([]))
+
+
+def test_best_prices_dedups_and_reuses_one_session():
+    log = []
+
+    async def run():
+        async with ChemSpaceClient("key", base_url="http://chemspace.test", rate=100,
+                                   transport=stand_in(log)) as client:
+            return await client.best_prices(["CCO", "CCC", "CCO", "CCC"], chunk_size=1)
+
+    prices = asyncio.run(run())
+    assert prices[0] == prices[2] == 8.0
+    assert math.isnan(prices[1]) and math.isnan(prices[3])
+    # One token, one refresh after the 401, one search per unique molecule
+    assert log.count("/auth/token") == 2
+    assert log.count("/v4/search/exact") == 3
+
+
+def test_throttled_requests_are_retried():
+    calls = []
+
+    def handler(request):
+        if request.url.path == "/auth/token":
+            return httpx.Response(200, json={"access_token": "t"})
+        calls.append(1)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"items": [{"offers": OFFERS["CCO"]}]})
+
+    async def run():
+        async with ChemSpaceClient("key", base_url="http://chemspace.test", rate=100,
+                                   transport=httpx.MockTransport(handler)) as client:
+            return await client.best_price("CCO")
+
+    assert asyncio.run(run()) == 8.0
+    assert len(calls) == 2
+
+
+def test_token_bucket_limits_the_rate():
+    bucket = TokenBucket(rate=50, capacity=5)
+
+    async def run():
+        start = time.perf_counter()
+        await asyncio.gather(*[bucket.acquire() for _ in range(15)])
+        return time.perf_counter() - start
+
+    # 5 immediately, then 10 at 50 per second
+    assert asyncio.run(run()) >= 0.18
@@ -0,0 +1,94 @@
+import pytest
+
+pytest.importorskip("rdkit")
+
+import numpy as np
+
+
+@pytest.fixture
+def conformer_store():
+    import charge.servers.conformer_store
+
+    return charge.servers.conformer_store
+
+
+def test_store_round_trip(conformer_store, tmp_path, monkeypatch):
+    store = conformer_store.ConformerStore(str(tmp_path / "store"))
+    embedded = store.get("OCC", num_conformers=2)
+    assert embedded.GetNumConformers() == 2
+
+    calls = []
+    monkeypatch.setattr(conformer_store, "embed_conformers", lambda *a: calls.append(a))
+    # Same molecule, other spelling and another store handle on the same files
+    other = conformer_store.ConformerStore(str(tmp_path / "store"))
+    loaded = other.get("CCO", num_conformers=2)
+    assert calls == []
+    np.testing.assert_allclose(
+        conformer_store.conformer_coordinates(loaded),
+        conformer_store.conformer_coordinates(embedded),
+        atol=1e-5,
+    )
+    assert loaded.GetNumAtoms() == 9
+    assert other.stats()["molecules"] == 1
+    assert other.stats()["coordinate_bytes"] == 2 * 9 * 3 * 4
+
+
+def test_failed_and_invalid_molecules(conformer_store, tmp_path, monkeypatch):
+    store = conformer_store.ConformerStore(str(tmp_path / "store"))
+    assert store.get("C1CC") is None
+
+    # Failures are retried with the next seed, up to MAX_EMBED_ATTEMPTS times
+    seeds = []
+    monkeypatch.setattr(conformer_store, "MAX_EMBED_ATTEMPTS", 2)
+    monkeypatch.setattr(
+        conformer_store, "embed_conformers", lambda mol, n, seed: seeds.append(seed)
+    )
+    assert store.get("CCCC") is None
+    assert store.get("CCCC") is None
+    assert store.get("CCCC") is None
+    base = conformer_store.EMBED_SEED
+    assert seeds == [base, base + 1]
+    assert store.stats() == {"molecules": 0, "failed": 1, "coordinate_bytes": 0}
+
+
+def test_failed_embedding_is_retried(conformer_store, tmp_path, monkeypatch):
+    store = conformer_store.ConformerStore(str(tmp_path / "store"))
+    embed = conformer_store.embed_conformers
+    monkeypatch.setattr(conformer_store, "embed_conformers", lambda mol, n, seed: None)
+    assert store.get("CCCC") is None
+    monkeypatch.setattr(conformer_store, "embed_conformers", embed)
+    assert store.get("CCCC").GetNumConformers() == 1
+    assert store.stats()["molecules"] == 1
+    assert store.stats()["failed"] == 0
+
+
+def test_embedding_is_reproducible(conformer_store):
+    from rdkit import Chem
+
+    mol = Chem.MolFromSmiles("CC(=O)Oc1ccccc1C(=O)O")
+    first = conformer_store.conformer_coordinates(conformer_store.embed_conformers(mol, 2))
+    second = conformer_store.conformer_coordinates(conformer_store.embed_conformers(mol, 2))
+    np.testing.assert_array_equal(first, second)
+
+
+def test_density_uses_store(conformer_store, tmp_path):
+    from charge.servers.molecular_property_utils import get_density
+
+    conformer_store.set_conformer_store(str(tmp_path / "store"))
+    try:
+        density = get_density("c1ccccc1O")
+        assert get_density("Oc1ccccc1") == pytest.approx(density, rel=1e-5)
+        assert len(conformer_store.get_conformer_store()) == 1
+    finally:
+        conformer_store.set_conformer_store(None)
+
+
+def test_pre_embed(conformer_store, tmp_path):
+    smi = tmp_path / "input.smi"
+    smi.write_text("CCO\nOCC\nC1CC\nc1ccccc1\n")
+    stats = conformer_store.pre_embed(str(smi), str(tmp_path / "store"), workers=2, chunk_size=1)
+    assert (stats["embedded"], stats["failed"], stats["skipped"]) == (2, 0, 2)
+
+    stats = conformer_store.pre_embed(str(smi), str(tmp_path / "store"), workers=1)
+    assert stats["embedded"] == 0
+    assert len(conformer_store.ConformerStore(str(tmp_path / "store"))) == 2
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+import charge.servers.FLASKv2_reactions as flask
+
+
+def test_concurrent_requests_share_a_generate_call(monkeypatch):
+    calls = []
+
+    def fake_generate_batch(model, prompts):
+        calls.append((model, list(prompts)))
+        return [[f"{model}:{prompt}:{beam}" for beam in range(3)] for prompt in prompts]
+
+    monkeypatch.setattr(flask, "HAS_FLASKV2", True)
+    monkeypatch.setattr(flask, "fwd_model", "fwd", raising=False)
+    monkeypatch.setattr(flask, "retro_model", "retro", raising=False)
+    monkeypatch.setattr(flask, "build_prompt", lambda molecules, retro: ".".join(molecules))
+    monkeypatch.setattr(flask, "generate_batch", fake_generate_batch)
+    monkeypatch.setattr(flask.FLASK_BATCHER, "max_wait", 0.05)
+
+    async def run():
+        return await asyncio.gather(
+            flask.predict_reaction_batched(["CCO"], False),
+            flask.predict_reaction_batched(["CC", "O"], False),
+            flask.predict_reaction_batched(["CCOC"], True),
+        )
+
+    fwd_a, fwd_b, retro = asyncio.run(run())
+    assert fwd_a == ["fwd:CCO:0", "fwd:CCO:1", "fwd:CCO:2"]
+    assert fwd_b == ["fwd:CC.O:0", "fwd:CC.O:1", "fwd:CC.O:2"]
+    assert retro == ["retro:CCOC:0", "retro:CCOC:1", "retro:CCOC:2"]
+    assert sorted(calls) == [("fwd", ["CCO", "CC.O"]), ("retro", ["CCOC"])]
+
+
+@pytest.mark.skipif(not flask.HAS_FLASKV2, reason="requires the flask support packages")
+@pytest.mark.parametrize("cpu_dtype", flask.CPU_DTYPES)
+def test_cpu_model_loading_and_benchmark(tmp_path, cpu_dtype):
+    import torch
+
+    flask.tiny_llama(vocab_size=64, hidden_size=32, num_layers=1).save_pretrained(tmp_path)
+    model = flask.load_model(str(tmp_path), None, flask.resolve_device("cpu"), cpu_dtype)
+    assert model.device.type == "cpu"
+    quantized = any(
+        isinstance(module, torch.ao.nn.quantized.dynamic.Linear) for module in model.modules()
+    )
+    assert quantized == (cpu_dtype == "int8")
+
+    result = flask.benchmark_generate(model, batch_size=2, prompt_length=4, new_tokens=3, repeats=1)
+    assert result["tokens"] == 6 and result["tokens_per_second"] > 0
@@ -0,0 +1,156 @@
+import pytest
+
+pytest.importorskip("rdkit")
+
+
+@pytest.fixture
+def property_utils():
+    import charge.servers.molecular_property_utils
+
+    return charge.servers.molecular_property_utils
+
+
+@pytest.mark.parametrize(
+    "smiles, rel",
+    [
+        ("CCO", 0.05),
+        ("c1ccccc1", 0.05),
+        ("ClC(Cl)(Cl)Cl", 0.05),
+        ("CC(=O)Oc1ccccc1C(=O)O", 0.05),
+        # Fused heteroaromatics are the worst case of the additive volume
+        ("Cn1cnc2c1c(=O)n(C)c(=O)n2C", 0.11),
+        ("c1ccc2[nH]ccc2c1", 0.11),
+    ],
+)
+def test_fast_density_tracks_conformer_density(property_utils, smiles, rel):
+    fast = property_utils.get_density_tiered(smiles, "fast")
+    conformer = property_utils.get_density_tiered(smiles, "conformer")
+    assert fast["tier"] == "fast"
+    assert conformer["tier"] == "conformer"
+    assert fast["density"] == pytest.approx(conformer["density"], rel=rel)
+
+
+def test_multi_conformer_density(property_utils):
+    result = property_utils.get_density_tiered("CCCCO", "multi_conformer", num_conformers=3)
+    assert result["tier"] == "multi_conformer"
+    assert result["density"] == pytest.approx(property_utils.get_density("CCCCO"), rel=0.05)
+
+
+def test_density_invalid_inputs(property_utils):
+    assert property_utils.get_density_tiered("C1CC", "fast") == {"density": 0.0, "tier": "fast"}
+    # No additive volume contribution for sodium
+    assert property_utils.get_density("[Na+].[Cl-]", tier="fast") == 0.0
+    with pytest.raises(ValueError):
+        property_utils.get_density_tiered("CCO", "exact")
+    for num_conformers in (0, -1):
+        with pytest.raises(ValueError):
+            property_utils.get_density_tiered("CCO", "multi_conformer", num_conformers=num_conformers)
+
+
+def test_failed_embedding_density_not_cached(property_utils, monkeypatch, tmp_path):
+    import charge.servers.property_cache as property_cache
+
+    property_cache.set_property_cache(str(tmp_path / "properties.db"))
+    try:
+        with monkeypatch.context() as m:
+            m.setattr(property_utils._MolContext, "volumes", lambda self, n=1: [])
+            assert property_utils.get_density_tiered("CCO", "conformer")["density"] == 0.0
+        assert property_cache.get_property_cache().stats()["entries"] == {}
+        assert property_utils.get_density_tiered("CCO", "conformer")["density"] > 0.0
+        assert property_cache.get_property_cache().stats()["entries"] == {"density": 1}
+    finally:
+        property_cache.set_property_cache(None)
+
+
+def test_compute_properties_single_and_list(property_utils):
+    result = property_utils.compute_properties(
+        "OCC", ["canonical_smiles", "sascore", "molecular_weight", "molecular_volume"]
+    )
+    assert result["valid"]
+    assert result["canonical_smiles"] == "CCO"
+    assert result["molecular_weight"] == pytest.approx(46.069, abs=1e-3)
+    assert result["molecular_volume"] > 0
+
+    results = property_utils.compute_properties(["CCO", "C1CC"])
+    assert [r["smiles"] for r in results] == ["CCO", "C1CC"]
+    assert set(results[0]) == {"smiles", "valid", *property_utils.DEFAULT_PROPERTIES}
+    assert results[1] == {
+        "smiles": "C1CC", "valid": False, "canonical_smiles": None, "sascore": 10.0, "density": 0.0
+    }
+
+
+def test_compute_properties_embeds_once(property_utils, monkeypatch):
+    import charge.servers.conformer_store as conformer_store
+
+    calls = []
+    embed = conformer_store.embed_conformers
+
+    def counting_embed(mol, num_conformers):
+        calls.append(num_conformers)
+        return embed(mol, num_conformers)
+
+    monkeypatch.setattr(conformer_store, "embed_conformers", counting_embed)
+    result = property_utils.compute_properties(
+        "c1ccccc1O", ["density", "molecular_volume", "radius_of_gyration"]
+    )
+    assert calls == [1]
+    assert result["density"] == pytest.approx(result["molecular_volume"] / 94.113, rel=1e-3)
+
+
+def test_compute_properties_unknown_property(property_utils):
+    with pytest.raises(ValueError):
+        property_utils.compute_properties("CCO", ["color"])
+
+
+def test_chemprop_predict_properties_uses_cache(property_utils, monkeypatch, tmp_path):
+    import charge.servers.property_cache as property_cache
+
+    calls = []
+
+    class FakeRegistry:
+        def model_path(self, prop):
+            return str(tmp_path / prop / "model_0" / "best.pt")
+
+        def predict_many(self, props, smiles):
+            calls.append((list(props), list(smiles)))
+            return {p: [[float(len(s) + i)] for s in smiles] for i, p in enumerate(props)}
+
+    monkeypatch.setattr(property_utils, "get_model_registry", lambda: FakeRegistry())
+    property_cache.set_property_cache(str(tmp_path / "properties.db"))
+    try:
+        rows = property_utils.chemprop_predict_properties(["CCO", "C1CC"], ["gap", "lipo"])
+        assert rows == [
+            {"smiles": "CCO", "gap": 3.0, "lipo": 4.0},
+            {"smiles": "C1CC", "gap": None, "lipo": None},
+        ]
+        rows = property_utils.chemprop_predict_properties(["OCC", "CCC"], ["lipo"])
+        assert rows[0] == {"smiles": "OCC", "lipo": 4.0}
+        assert calls == [(["gap", "lipo"], ["CCO"]), (["lipo"], ["CCC"])]
+    finally:
+        property_cache.set_property_cache(None)
+
+
+def test_chemprop_predict_batches_concurrent_calls(property_utils, monkeypatch):
+    import asyncio
+
+    calls = []
+
+    class FakeRegistry:
+        def model_path(self, prop):
+            return f"/models/{prop}/model_0/best.pt"
+
+        def predict_many(self, props, smiles):
+            calls.append(list(smiles))
+            return {p: [[float(len(s))] for s in smiles] for p in props}
+
+    monkeypatch.setattr(property_utils, "get_model_registry", lambda: FakeRegistry())
+
+    async def run():
+        return await asyncio.gather(
+            *[property_utils.chemprop_predict(s, "gap") for s in ["C", "CC", "CCC", "C1CC"]]
+        )
+
+    assert asyncio.run(run()) == [1.0, 2.0, 3.0, None]
+    assert calls == [["C", "CC", "CCC"]]
+    with pytest.raises(ValueError):
+        asyncio.run(property_utils.chemprop_predict("CCO", "color"))
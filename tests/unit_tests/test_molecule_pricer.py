@@ -0,0 +1,86 @@
+import math
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("rdkit")
+
+
+@pytest.fixture
+def pricer(tmp_path, monkeypatch):
+    import charge.servers.molecule_pricer as pricer
+
+    calls = []
+
+    def fake_prices(smiles_list, best_only=True):
+        calls.append(list(smiles_list))
+        time.sleep(0.05)
+        return [1.5 if smiles == "CCO" else math.nan for smiles in smiles_list]
+
+    monkeypatch.setattr(pricer, "get_chemspace_prices", fake_prices)
+    pricer.set_price_cache(str(tmp_path / "prices.db"))
+    pricer.calls = calls
+    yield pricer
+    pricer.set_price_cache(None)
+
+
+def test_prices_are_cached_by_canonical_smiles(pricer):
+    assert pricer.get_cached_prices(["OCC", "CCO"]) == [1.5, 1.5]
+    assert pricer.get_cached_prices(["CCO"]) == [1.5]
+    assert pricer.calls == [["CCO"]]
+
+
+def test_no_vendor_results_are_cached_with_their_own_ttl(pricer, monkeypatch):
+    assert math.isnan(pricer.get_cached_prices(["c1ccccc1"])[0])
+    assert math.isnan(pricer.get_cached_prices(["c1ccccc1"])[0])
+    assert len(pricer.calls) == 1
+
+    monkeypatch.setattr(pricer, "NO_PRICE_MAX_AGE", -1)
+    pricer.get_cached_prices(["c1ccccc1"])
+    assert len(pricer.calls) == 2
+
+
+def test_prices_persist_across_restarts(pricer, tmp_path):
+    pricer.get_cached_prices(["CCO"])
+    pricer.set_price_cache(str(tmp_path / "prices.db"))
+    assert pricer.get_cached_prices(["CCO"]) == [1.5]
+    assert len(pricer.calls) == 1
+
+
+def test_concurrent_requests_share_one_lookup(pricer):
+    pricer.set_price_cache(None)
+    results = []
+    barrier = threading.Barrier(8)
+
+    def price():
+        barrier.wait()
+        results.append(pricer.get_cached_prices(["CCO"])[0])
+
+    threads = [threading.Thread(target=price) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [1.5] * 8
+    assert len(pricer.calls) == 1
+
+
+def test_failed_lookups_are_raised_and_not_cached(pricer, monkeypatch):
+    def failing(smiles_list, best_only=True):
+        raise RuntimeError("vendor down")
+
+    monkeypatch.setattr(pricer, "get_chemspace_prices", failing)
+    with pytest.raises(RuntimeError):
+        pricer.get_cached_prices(["CCO"])
+    assert pricer._IN_FLIGHT == {}
+    assert pricer.get_price_cache().stats()["entries"] == {}
+
+
+def test_async_client_backend(pricer, monkeypatch):
+    import charge.servers.chemspace_client as chemspace_client
+
+    monkeypatch.setattr(pricer, "PRICE_CLIENT", "async")
+    monkeypatch.setattr(chemspace_client, "get_best_prices", lambda smiles: [2.0] * len(smiles))
+    assert pricer.get_cached_prices(["CCO", "CCC"]) == [2.0, 2.0]
+    assert pricer.calls == []
@@ -0,0 +1,60 @@
+import pytest
+
+pytest.importorskip("rdkit")
+
+
+@pytest.fixture
+def property_cache(tmp_path):
+    import charge.servers.property_cache
+
+    charge.servers.property_cache.set_property_cache(str(tmp_path / "properties.db"))
+    yield charge.servers.property_cache
+    charge.servers.property_cache.set_property_cache(None)
+
+
+def test_cached_compute_keys_by_canonical_smiles(property_cache):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return 1.5
+
+    assert property_cache.cached_compute("OCC", "density", "m1", compute) == 1.5
+    assert property_cache.cached_compute("CCO", "density", "m1", compute) == 1.5
+    assert len(calls) == 1
+
+    # A different method/version key is a different entry
+    property_cache.cached_compute("CCO", "density", "m2", compute)
+    assert len(calls) == 2
+
+    stats = property_cache.get_property_cache().stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2
+    assert stats["entries"] == {"density": 2}
+
+
+def test_invalid_smiles_are_not_cached(property_cache):
+    property_cache.cached_compute("C1CC", "sascore", "m", lambda: 10.0)
+    assert property_cache.get_property_cache().stats()["entries"] == {}
+
+
+def test_shared_between_connections_and_prune(property_cache, tmp_path):
+    cache = property_cache.get_property_cache()
+    other = property_cache.PropertyCache(cache.db_path)
+    other.put("CCO", "sascore", "m", 1.98)
+
+    assert cache.get("CCO", "sascore", "m") == 1.98
+    assert cache.get("CCO", "sascore", "m", max_age=-1) is property_cache.MISSING
+
+    cache.put("CCO", "density", "m", 0.9)
+    assert cache.prune(prop="sascore") == 1
+    assert cache.prune(older_than=3600) == 0
+    assert cache.prune() == 1
+    other.close()
+
+
+def test_synthesizability_uses_cache(property_cache):
+    from charge.servers.SMILES_utils import get_synthesizability
+
+    score = get_synthesizability("c1ccccc1O")
+    assert get_synthesizability("Oc1ccccc1") == score
+    assert property_cache.get_property_cache().stats()["hits"] == 1
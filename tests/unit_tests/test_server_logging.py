@@ -0,0 +1,42 @@
+import pytest
+from loguru import logger
+
+
+@pytest.fixture
+def server_logging():
+    import charge.servers.server_logging
+
+    charge.servers.server_logging.METRICS.reset()
+    yield charge.servers.server_logging
+    charge.servers.server_logging.configure_server_logging("verbose")
+
+
+@pytest.fixture
+def records():
+    messages = []
+    handler_id = logger.add(lambda m: messages.append(m.record["message"]), level="INFO")
+    yield messages
+    logger.remove(handler_id)
+
+
+def test_sampled_mode_logs_every_nth_call(server_logging, records):
+    server_logging.configure_server_logging("sampled", sample_every=3)
+    for i in range(7):
+        server_logging.log_call("tool", "call {}", i)
+
+    assert records == ["call 0", "call 3", "call 6"]
+    assert server_logging.METRICS.get("tool") == 7
+
+
+def test_quiet_mode_only_counts(server_logging, records):
+    server_logging.configure_server_logging("quiet")
+    server_logging.log_call("tool", "call {}", 1)
+    server_logging.log_call("other", "call {}", 2)
+
+    assert records == []
+    assert server_logging.METRICS.snapshot() == {"tool": 1, "other": 1}
+
+
+def test_invalid_mode(server_logging):
+    with pytest.raises(ValueError):
+        server_logging.configure_server_logging("loud")
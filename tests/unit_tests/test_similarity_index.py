@@ -0,0 +1,76 @@
+import pytest
+
+pytest.importorskip("rdkit")
+
+
+@pytest.fixture
+def index():
+    from charge.servers.similarity_index import FingerprintIndex
+
+    index = FingerprintIndex()
+    index.add_many(["c1ccccc1O", "c1ccccc1OC", "CCCCCCCC", "not_a_smiles"])
+    return index
+
+
+def test_index_matches_rdkit_tanimoto(index):
+    from rdkit import Chem, DataStructs
+    from rdkit.Chem import rdFingerprintGenerator
+
+    gen = rdFingerprintGenerator.GetMorganGenerator(radius=2, fpSize=2048)
+    query = gen.GetFingerprint(Chem.MolFromSmiles("c1ccccc1N"))
+    expected = [
+        DataStructs.TanimotoSimilarity(query, gen.GetFingerprint(Chem.MolFromSmiles(s)))
+        for s in ["c1ccccc1O", "c1ccccc1OC", "CCCCCCCC"]
+    ]
+    assert len(index) == 3
+    assert index.similarities("c1ccccc1N").tolist() == pytest.approx(expected)
+
+
+def test_most_similar_and_threshold(index):
+    neighbors = index.most_similar("Oc1ccccc1", k=2)
+    assert neighbors[0] == ("Oc1ccccc1", pytest.approx(1.0))
+    assert neighbors[1][0] == "COc1ccccc1"
+
+    similar, nearest, similarity = index.any_similar("Oc1ccccc1", 0.3, exclude_self=True)
+    assert nearest == "COc1ccccc1"
+    assert similar == (similarity >= 0.3)
+    # Anisole has too many more bits set than phenol to reach 0.9, so it is
+    # not even compared
+    assert index.any_similar("Oc1ccccc1", 0.9, exclude_self=True) == (False, None, 0.0)
+
+    assert index.any_similar("CCCCCCCCC", 0.5)[0] is True
+    assert index.any_similar("CCCCCCCCC", 0.5, exclude_self=True)[1] == "CCCCCCCC"
+
+
+def test_index_grows_past_initial_capacity():
+    from charge.servers.similarity_index import FingerprintIndex
+
+    index = FingerprintIndex(n_bits=128)
+    # Distinct isotopologues, so every molecule gets its own row
+    smiles = [f"[{n}CH3]O" for n in range(1, 1100)]
+    assert index.add_many(smiles) == len(smiles)
+    assert len(index) == len(smiles)
+    assert index.most_similar("CO", k=1)[0][1] == pytest.approx(1.0)
+
+
+def test_pruned_queries_match_full_scan():
+    import numpy as np
+    from charge.servers.similarity_index import FingerprintIndex
+
+    smiles = [
+        "C" * n + tail
+        for n in range(1, 12)
+        for tail in ["", "O", "N", "C(=O)O", "c1ccccc1", "c1ccncc1", "OC", "Cl"]
+    ]
+    index = FingerprintIndex()
+    index.add_many(smiles)
+    for query in ["CCCCO", "c1ccccc1CCN", "CCCCCCCCC(=O)O", "ClCCCl"]:
+        sims = index.similarities(query, exclude_self=True)
+        expected = np.sort(sims[sims >= 0])[::-1][:5]
+        neighbors = index.most_similar(query, k=5, exclude_self=True)
+        assert [sim for _, sim in neighbors] == pytest.approx(expected.tolist())
+        for threshold in (0.3, 0.5, 0.8):
+            similar, nearest, similarity = index.any_similar(query, threshold, exclude_self=True)
+            assert similar == bool(sims.max() >= threshold)
+            if similar:
+                assert similarity == pytest.approx(float(sims.max()))
@@ -0,0 +1,129 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("rdkit")
+
+AMIDE_SMARTS = "[C:1](=[O:2])-[OD1].[N!H0:3]>>[C:1](=[O:2])[N:3]"
+
+
+@pytest.fixture
+def smarts_utils():
+    import charge.servers.SMARTS_reactions_utils
+
+    charge.servers.SMARTS_reactions_utils.REACTION_CACHE.clear()
+    return charge.servers.SMARTS_reactions_utils
+
+
+def test_verify_reaction_SMARTS(smarts_utils):
+    assert smarts_utils.verify_reaction_SMARTS(AMIDE_SMARTS) == (True, "SMARTS is valid.")
+    valid, message = smarts_utils.verify_reaction_SMARTS("[C:1]>>[C:1")
+    assert valid is False
+    assert message.startswith("Invalid Syntax for SMARTS string.")
+
+
+def test_verify_reaction(smarts_utils):
+    assert smarts_utils.verify_reaction(AMIDE_SMARTS, ["CC(=O)O", "NC"], ["CC(=O)NC"]) == (
+        True,
+        "Reaction verified successfully.",
+    )
+    valid, message = smarts_utils.verify_reaction(AMIDE_SMARTS, ["CC(=O)O", "NC"], ["CCO"])
+    assert valid is False
+    assert "not found in predicted products" in message
+    valid, message = smarts_utils.verify_reaction("[C:1]>>[C:1", ["CC"], ["CC"])
+    assert valid is False
+    assert message.startswith("Error verifying reaction:")
+
+
+def test_reaction_cache_shared_between_tools(smarts_utils):
+    # The reaction is run in the worker process but parsed through this
+    # process' cache
+    assert smarts_utils.REACTION_TIMEOUT > 0
+    smarts_utils.verify_reaction_SMARTS(AMIDE_SMARTS)
+    smarts_utils.verify_reaction(AMIDE_SMARTS, ["CC(=O)O", "NC"], ["CC(=O)NC"])
+    smarts_utils.verify_reaction_SMARTS(AMIDE_SMARTS)
+    stats = smarts_utils.reaction_cache_stats()
+    assert stats["size"] == 1
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+    assert stats["worker"]["runs"] >= 1
+
+
+@pytest.mark.parametrize("threshold", [64, 1])
+def test_verify_reactions_batch(smarts_utils, monkeypatch, threshold):
+    monkeypatch.setattr(smarts_utils, "BATCH_PARALLEL_THRESHOLD", threshold)
+    monkeypatch.setattr(smarts_utils, "BATCH_WORKERS", 2)
+    reactions = [
+        {"smarts": AMIDE_SMARTS, "reactants": ["CC(=O)O", "NC"], "products": ["CC(=O)NC"]},
+        {"smarts": AMIDE_SMARTS, "reactants": ["CC(=O)O", "NC"], "products": ["CCO"]},
+        {"smarts": AMIDE_SMARTS, "reactants": ["C1CC", "NC"], "products": ["CC(=O)NC"]},
+    ]
+    results = smarts_utils.verify_reactions_batch(reactions)
+    assert [r["valid"] for r in results] == [True, False, False]
+    assert results[2]["message"] == "Invalid reactant SMILES: C1CC"
+
+
+def test_verify_reaction_matches_any_outcome(smarts_utils):
+    # Methylsuccinic acid gives two outcomes; the expected amide is the second one
+    valid, _ = smarts_utils.verify_reaction(
+        AMIDE_SMARTS, ["OC(=O)CC(C)C(=O)O", "NC"], ["CNC(=O)C(C)CC(=O)O"]
+    )
+    assert valid is True
+
+
+def test_verify_reaction_too_many_products(smarts_utils, monkeypatch):
+    monkeypatch.setattr(smarts_utils, "MAX_PRODUCTS", 3)
+    # Any carbon-carbon bond can be broken, giving one outcome per bond
+    valid, message = smarts_utils.verify_reaction(
+        "[C:1][C:2]>>[C:1].[C:2]", ["CCCCCCCC"], ["CCCCCCCCC"]
+    )
+    assert valid is False
+    assert message.startswith("Too many products")
+
+
+def _slow_reaction(*args):
+    time.sleep(60)
+
+
+def test_verify_reaction_time_budget(smarts_utils, monkeypatch):
+    worker = smarts_utils._ReactionWorker(_slow_reaction)
+    monkeypatch.setattr(smarts_utils, "_REACTION_WORKER", worker)
+    monkeypatch.setattr(smarts_utils, "REACTION_TIMEOUT", 0.5)
+    valid, message = smarts_utils.verify_reaction(AMIDE_SMARTS, ["CC(=O)O", "NC"], ["CC(=O)NC"])
+    assert valid is False
+    assert message.startswith("Reaction too slow")
+    assert worker.stats() == {"runs": 1, "timeouts": 1, "restarts": 1}
+
+    # The killed worker is replaced on the next call
+    worker._run = smarts_utils._run_reaction
+    monkeypatch.setattr(smarts_utils, "REACTION_TIMEOUT", 30)
+    assert smarts_utils.verify_reaction(AMIDE_SMARTS, ["CC(=O)O", "NC"], ["CC(=O)NC"])[0] is True
+    assert worker.stats()["restarts"] == 2
+
+
+def test_verify_reactions_batch_deadline(smarts_utils, monkeypatch):
+    # Chunk of 2 reactions with 1 s each: the deadline is 2 s after the start
+    clock = iter([0.0, 0.5, 2.5])
+    monkeypatch.setattr(smarts_utils, "time", SimpleNamespace(monotonic=lambda: next(clock)))
+    reaction = {"smarts": AMIDE_SMARTS, "reactants": ["CC(=O)O", "NC"], "products": ["CC(=O)NC"]}
+    results = smarts_utils._verify_reaction_chunk([reaction] * 2, 1000, 1.0)
+    assert results[0]["valid"] is True
+    assert results[1]["valid"] is False
+    assert results[1]["message"].startswith("Reaction not verified: the batch used up")
+
+
+@pytest.mark.parametrize("threshold", [64, 1])
+def test_verify_reactions_batch_time_budget(smarts_utils, monkeypatch, threshold):
+    # Small batches use the verify_reaction worker, large ones the batch workers
+    worker = smarts_utils._ReactionWorker(_slow_reaction)
+    monkeypatch.setattr(smarts_utils, "_REACTION_WORKER", worker)
+    monkeypatch.setattr(smarts_utils, "_BATCH_REACTION_WORKERS", [worker])
+    monkeypatch.setattr(smarts_utils, "BATCH_PARALLEL_THRESHOLD", threshold)
+    monkeypatch.setattr(smarts_utils, "BATCH_WORKERS", 1)
+    monkeypatch.setattr(smarts_utils, "REACTION_TIMEOUT", 0.5)
+    reaction = {"smarts": AMIDE_SMARTS, "reactants": ["CC(=O)O", "NC"], "products": ["CC(=O)NC"]}
+    results = smarts_utils.verify_reactions_batch([reaction])
+    assert results[0]["valid"] is False
+    assert results[0]["message"].startswith("Reaction too slow")
+    assert worker.stats()["timeouts"] == 1
@@ -0,0 +1,46 @@
+import json
+import pytest
+
+pytest.importorskip("rdkit")
+
+
+def test_run_bulk_csv_to_jsonl(tmp_path):
+    from charge.servers.SMILES_bulk import run_bulk
+
+    input_path = tmp_path / "library.csv"
+    input_path.write_text("id,smiles\na,OCC\nb,C1CC\nc,c1ccccc1\n")
+    output_path = tmp_path / "out.jsonl"
+
+    stats = run_bulk(str(input_path), str(output_path), workers=2, chunk_size=1)
+
+    records = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert [r["id"] for r in records] == ["a", "b", "c"]
+    assert [r["canonical_smiles"] for r in records] == ["CCO", "", "c1ccccc1"]
+    assert records[1]["valid"] is False and records[1]["sascore"] == 10.0
+    assert stats["molecules"] == 3 and stats["valid"] == 2
+
+
+@pytest.mark.parametrize(
+    "output_name, kwargs",
+    [("out.smi", {}), ("out.parquet", {}), ("out.csv", {"smiles_column": "smi"}),
+     ("out.csv", {"chunk_size": 0})],
+)
+def test_run_bulk_invalid_arguments_keep_output(tmp_path, output_name, kwargs):
+    from charge.servers.SMILES_bulk import run_bulk
+
+    input_path = tmp_path / "library.csv"
+    input_path.write_text("id,smiles\na,OCC\n")
+    output_path = tmp_path / output_name
+    output_path.write_text("previous results\n")
+
+    with pytest.raises((ValueError, KeyError)):
+        run_bulk(str(input_path), str(output_path), workers=1, **kwargs)
+    assert output_path.read_text() == "previous results\n"
+
+
+def test_iter_smiles_smi(tmp_path):
+    from charge.servers.SMILES_bulk import iter_smiles
+
+    input_path = tmp_path / "library.smi"
+    input_path.write_text("# header\nCCO ethanol\n\nc1ccccc1\n")
+    assert list(iter_smiles(str(input_path))) == [("ethanol", "CCO"), ("3", "c1ccccc1")]
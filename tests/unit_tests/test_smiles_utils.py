@@ -0,0 +1,105 @@
+import pytest
+
+pytest.importorskip("rdkit")
+
+
+@pytest.fixture
+def smiles_utils():
+    import charge.servers.SMILES_utils
+
+    return charge.servers.SMILES_utils
+
+
+@pytest.fixture
+def fresh_known_smiles(smiles_utils):
+    # Empty known molecule set, independent of what other tests added
+    smiles_utils.set_known_smiles_db(None)
+    yield smiles_utils
+    smiles_utils.set_known_smiles_db(None)
+
+
+def test_verify_smiles_batch(smiles_utils):
+    results = smiles_utils.verify_smiles_batch(["CCO", "C1CC", "c1ccccc1"])
+    assert [r["smiles"] for r in results] == ["CCO", "C1CC", "c1ccccc1"]
+    assert [r["result"] for r in results] == [True, False, True]
+    assert results[0]["error"] is None
+    assert results[1]["error"] == "Invalid SMILES"
+
+
+def test_canonicalize_smiles_batch(smiles_utils):
+    results = smiles_utils.canonicalize_smiles_batch(["OCC", "not_a_smiles"])
+    assert results[0] == {"smiles": "OCC", "result": "CCO", "error": None}
+    assert results[1]["result"] == "Invalid SMILES"
+    assert results[1]["error"] is not None
+
+
+def test_get_synthesizability_batch(smiles_utils):
+    results = smiles_utils.get_synthesizability_batch(["CCO", "C1CC"])
+    assert results[0]["result"] == pytest.approx(smiles_utils.get_synthesizability("CCO"))
+    assert results[1]["result"] == 10.0
+    assert results[1]["error"] == "Invalid SMILES"
+
+
+def test_get_synthesizability_batch_shares_cache(smiles_utils, monkeypatch, tmp_path):
+    import charge.servers.property_cache as property_cache
+
+    calls = []
+    score = smiles_utils.sascorer.calculateScore
+    monkeypatch.setattr(
+        smiles_utils.sascorer, "calculateScore", lambda mol: calls.append(mol) or score(mol)
+    )
+    property_cache.set_property_cache(str(tmp_path / "properties.db"))
+    try:
+        single = smiles_utils.get_synthesizability("CCO")
+        results = smiles_utils.get_synthesizability_batch(["CCO", "CCN"])
+        assert results[0]["result"] == pytest.approx(single)
+        assert smiles_utils.get_synthesizability("CCN") == pytest.approx(results[1]["result"])
+        assert len(calls) == 2
+    finally:
+        property_cache.set_property_cache(None)
+
+
+def test_known_smiles_batch_repeats(fresh_known_smiles):
+    results = fresh_known_smiles.known_smiles_batch(["CC(C)CCCO", "OCCCC(C)C"])
+    assert [r["result"] for r in results] == [False, True]
+
+
+def test_known_smiles_persists_across_restarts(smiles_utils, tmp_path):
+    db_path = str(tmp_path / "known.sqlite")
+    smiles_utils.set_known_smiles_db(db_path)
+    try:
+        assert smiles_utils.known_smiles("CCN") is False
+        assert smiles_utils.known_smiles("NCC") is True
+
+        # Simulate a server restart by reopening the same database
+        smiles_utils.set_known_smiles_db(db_path)
+        assert "CCN" in smiles_utils.database_of_smiles
+        assert smiles_utils.known_smiles("CCN") is True
+        assert smiles_utils.known_smiles("CCCN") is False
+    finally:
+        smiles_utils.set_known_smiles_db(None)
+
+
+def test_get_synthesizability_bulk_matches_single(smiles_utils):
+    smiles_list = ["CCO", "C1CC", "c1ccccc1O", "CC(=O)O[C@H](C)CCN", "XYZ"]
+    scores = smiles_utils.get_synthesizability_bulk(
+        smiles_list, max_workers=2, chunk_size=2
+    )
+    expected = [smiles_utils.get_synthesizability(s) for s in smiles_list]
+    assert scores.shape == (len(smiles_list),)
+    assert scores.tolist() == pytest.approx(expected)
+    assert scores[1] == 10.0 and scores[4] == 10.0
+
+
+def test_similarity_tools_track_known_smiles(fresh_known_smiles):
+    smiles_utils = fresh_known_smiles
+    smiles_utils.known_smiles("CCCCCCO")
+    assert smiles_utils.is_similar_to_known_smiles("CCCCCCO")["similar"] is False
+
+    smiles_utils.known_smiles("CCCCCCCO")
+    result = smiles_utils.is_similar_to_known_smiles("CCCCCCO", threshold=0.5)
+    assert result["similar"] is True
+    assert result["nearest_smiles"] == "CCCCCCCO"
+    assert [r["smiles"] for r in smiles_utils.find_similar_known_smiles("CCCCCCO")] == [
+        "CCCCCCCO"
+    ]
@@ -0,0 +1,87 @@
+import gzip
+import math
+
+import pytest
+
+pytest.importorskip("rdkit")
+
+from charge.servers.vendor_catalog import VendorCatalog, inchikey, iter_catalog_offers
+
+CSV = """smiles,supplier,id,price_usd,amount,unit
+CCO,A,A-1,10,1,g
+OCC,A,A-2,20,5,g
+CCO,B,B-1,5,100,mg
+c1ccccc1,B,B-2,1,1,kg
+C1CC,B,B-3,1,1,g
+CCC,C,C-1,,1,g
+"""
+
+SDF = """
+     RDKit          2D
+
+  2  1  0  0  0  0  0  0  0  0999 V2000
+    0.0000    0.0000    0.0000 C   0  0  0  0  0  0  0  0  0  0  0  0
+    1.2990    0.7500    0.0000 O   0  0  0  0  0  0  0  0  0  0  0  0
+  1  2  1  0
+M  END
+>  <usd_per_g>
+12.5
+
+$$$$
+"""
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    path = tmp_path / "catalog.csv"
+    path.write_text(CSV)
+    catalog = VendorCatalog(str(tmp_path / "catalog.db"))
+    assert catalog.import_file(str(path)) == 4
+    yield catalog
+    catalog.close()
+
+
+def test_keeps_best_price_per_supplier(catalog):
+    ethanol = inchikey("CCO")
+    assert catalog.offers(ethanol) == [
+        {"supplier": "A", "usd_per_g": 4.0, "catalog_id": "A-2"},
+        {"supplier": "B", "usd_per_g": 50.0, "catalog_id": "B-1"},
+    ]
+    assert catalog.best_price(ethanol) == 4.0
+    assert catalog.best_price(inchikey("c1ccccc1")) == 0.001
+    assert catalog.best_price(inchikey("CCC")) is None
+    assert catalog.stats()["molecules"] == 2
+
+
+def test_imports_gzipped_sdf(tmp_path):
+    path = tmp_path / "vendor.sdf.gz"
+    with gzip.open(path, "wt") as f:
+        f.write(SDF)
+    assert list(iter_catalog_offers(str(path), supplier="D")) == [
+        (inchikey("CO"), "D", 12.5, None)
+    ]
+
+
+def test_pricing_modes(catalog, monkeypatch):
+    import charge.servers.molecule_pricer as pricer
+    import charge.servers.vendor_catalog as vendor_catalog
+
+    online = []
+
+    def fake_prices(smiles_list, best_only=True):
+        online.extend(smiles_list)
+        return [9.0] * len(smiles_list)
+
+    monkeypatch.setattr(pricer, "get_chemspace_prices", fake_prices)
+    monkeypatch.setattr(vendor_catalog, "_VENDOR_CATALOG", catalog)
+
+    assert pricer.get_cached_prices(["OCC", "CCC"], mode="catalog") == [4.0, 9.0]
+    assert online == ["CCC"]
+
+    offline = pricer.get_cached_prices(["CCO", "CCC"], mode="offline")
+    assert offline[0] == 4.0 and math.isnan(offline[1])
+    assert online == ["CCC"]
+
+    assert pricer.get_cached_prices(["CCO"], mode="online") == [9.0]
+    with pytest.raises(ValueError):
+        pricer.get_cached_prices(["CCO"], mode="cheap")